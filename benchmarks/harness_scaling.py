@@ -0,0 +1,315 @@
+#!/usr/bin/env python
+""" Measure how the SciATH Harness scales with the number of tests
+
+    For each size, a YAML file with that many trivial tests (``true``
+    commands, alternating exit-code and text-diff verifiers) is generated
+    in a scratch directory, and the main phases of a run are timed
+    separately: listing the tests with ``python -m sciath -l``, which reads
+    the file lazily, without creating tests, in a new process, so including
+    start-up time; and creating the tests from the file, adding them to a
+    Harness, cleaning, executing, verifying, and reporting.
+
+    Each size is measured in its own process, so that its peak memory
+    (maximum resident set size) is not affected by other sizes.
+
+    Results are appended, one JSON record per size, to a results file
+    (by default, harness_scaling.jsonl in the working directory), and
+    printed along with the time per test, the apparent scaling exponent
+    of each phase with respect to the next-smallest size (1 for linear
+    scaling, 2 for quadratic), and the ratio to the last recorded result
+    for the same size from a different SciATH version or git revision.
+
+    Usage, from the root directory:
+
+        python benchmarks/harness_scaling.py
+        python benchmarks/harness_scaling.py --sizes 1000,10000 --phases \\
+          create,add
+"""
+from __future__ import print_function
+
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _ROOT)
+
+import sciath  #pylint: disable=wrong-import-position
+import sciath.harness  #pylint: disable=wrong-import-position
+import sciath.launcher  #pylint: disable=wrong-import-position
+import sciath.test_file  #pylint: disable=wrong-import-position
+
+PHASES = ('list', 'create', 'add', 'clean', 'execute', 'verify', 'report')
+DEFAULT_SIZES = (1000, 10000, 100000)
+DEFAULT_RESULTS = 'harness_scaling.jsonl'
+
+_INPUT_FILENAME = 'scaling.yml'
+_EXPECTED_FILENAME = 'empty.expected'
+
+
+def write_input_file(directory, size):
+    """ Write a test file with trivial tests, returning its path """
+    with open(os.path.join(directory, _EXPECTED_FILENAME), 'w'):
+        pass
+    filename = os.path.join(directory, _INPUT_FILENAME)
+    with open(filename, 'w') as input_file:
+        input_file.write('tests:\n')
+        for index in range(size):
+            input_file.write('  - name: test%d\n' % index)
+            input_file.write('    command: true\n')
+            if index % 2:
+                input_file.write('    expected: %s\n' % _EXPECTED_FILENAME)
+            else:
+                input_file.write('    type: exit_code\n')
+    return filename
+
+
+def _list_tests(input_filename):
+    """ List tests from a file, as a user would, in a new process """
+    paths = [_ROOT]
+    if os.environ.get('PYTHONPATH'):
+        paths.append(os.environ['PYTHONPATH'])
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(paths))
+    with open(os.devnull, 'w') as devnull:
+        subprocess.check_call(
+            [sys.executable, '-m', 'sciath', '-l', input_filename],
+            stdout=devnull,
+            env=environment)
+
+
+def _peak_memory_kb():
+    """ Returns the maximum resident set size of this process, in kB """
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss // 1024 if sys.platform == 'darwin' else maxrss
+
+
+class _Timer(object):  # pylint: disable=bad-option-value,useless-object-inheritance
+    """ Times phases, with their output to stdout suppressed """
+
+    def __init__(self):
+        self.times = {}
+        self.memory = {}
+
+    def run(self, phase, function, *args):
+        """ Call a function, recording its time and the peak memory after """
+        stdout = sys.stdout
+        with open(os.devnull, 'w') as devnull:
+            sys.stdout = devnull
+            try:
+                start = time.time()
+                result = function(*args)
+                self.times[phase] = time.time() - start
+            finally:
+                sys.stdout = stdout
+        self.memory[phase] = _peak_memory_kb()
+        return result
+
+
+def measure(size, phases, parallel):
+    """ Returns a record of times and peak memory for one size """
+    directory = tempfile.mkdtemp(prefix='sciath_scaling_')
+    cwd = os.getcwd()
+    try:
+        os.chdir(directory)
+        input_filename = write_input_file(directory, size)
+        sciath.launcher.Launcher.write_default_definition()
+        timer = _Timer()
+
+        if 'list' in phases:
+            timer.run('list', _list_tests, input_filename)
+        tests = timer.run('create', sciath.test_file.create_tests_from_file,
+                          input_filename)
+        harness = sciath.harness.Harness()
+        harness.quiet = True
+        harness.parallel = parallel
+
+        def _add():
+            for test in tests:
+                harness.add_test(test)
+
+        timer.run('add', _add)
+        for phase, function in (('clean', harness.clean), ('execute',
+                                                           harness.execute),
+                                ('verify', harness.verify), ('report',
+                                                             harness.report)):
+            if phase in phases:
+                timer.run(phase, function)
+        if 'execute' in phases and 'verify' in phases and (
+                not harness.determine_overall_success()):
+            raise Exception('[SciATH] benchmark tests did not all pass')
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(directory)
+    return {
+        'size': size,
+        'times': timer.times,
+        'memory_kb': timer.memory,
+        'peak_memory_kb': _peak_memory_kb(),
+    }
+
+
+def _revision():
+    """ Returns the git revision of the source tree, if available """
+    try:
+        with open(os.devnull, 'w') as devnull:
+            output = subprocess.check_output(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                cwd=_ROOT,
+                stderr=devnull)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.decode().strip()
+
+
+def _measure_in_subprocess(size, phases, parallel):
+    """ Run :func:`measure` in a new process, returning its record """
+    output = subprocess.check_output([
+        sys.executable,
+        os.path.abspath(__file__), '--measure',
+        str(size), '--phases', ','.join(phases), '--parallel',
+        str(parallel)
+    ])
+    return json.loads(output.decode())
+
+
+def _read_results(filename):
+    if not os.path.isfile(filename):
+        return []
+    with open(filename, 'r') as results_file:
+        return [json.loads(line) for line in results_file if line.strip()]
+
+
+def _previous_record(records, record):
+    """ Returns the last record of the same size from another version """
+    for previous in reversed(records):
+        if previous['size'] == record['size'] and (
+                previous['version'] != record['version'] or
+                previous['revision'] != record['revision']):
+            return previous
+    return None
+
+
+def _report(records, previous_records):
+    """ Print a table of phase times for each size """
+    print('%-8s %8s %12s %12s %9s %10s' %
+          ('phase', 'tests', 'time (s)', 'per test', 'exponent', 'vs. prev'))
+    for phase in PHASES + ('total',):
+        smaller = None
+        for record in records:
+            if phase == 'total':
+                value = sum(record['times'].values())
+            elif phase in record['times']:
+                value = record['times'][phase]
+            else:
+                continue
+            exponent = ''
+            if smaller is not None and smaller[1] > 0 and value > 0:
+                exponent = '%.2f' % (math.log(value / smaller[1]) /
+                                     math.log(record['size'] / smaller[0]))
+            previous = _previous_record(previous_records, record)
+            ratio = ''
+            if previous is not None:
+                if phase == 'total':
+                    previous_value = sum(previous['times'].values())
+                else:
+                    previous_value = previous['times'].get(phase)
+                if previous_value:
+                    ratio = '%.2fx' % (value / previous_value)
+            print('%-8s %8d %12.3f %10.1fus %9s %10s' %
+                  (phase, record['size'], value, 1e6 * value / record['size'],
+                   exponent, ratio))
+            smaller = (float(record['size']), value)
+    print()
+    print('%-8s %16s' % ('tests', 'peak memory (kB)'))
+    for record in records:
+        print('%-8d %16s' % (record['size'], record['peak_memory_kb']))
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(
+        description='Measure how the SciATH Harness scales with the number of '
+        'tests')
+    parser.add_argument('--sizes',
+                        default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help='Comma-separated numbers of tests (default: '
+                        '%(default)s)')
+    parser.add_argument('--phases',
+                        default=','.join(PHASES),
+                        help='Comma-separated phases to time, from %s. '
+                        'create and add are always timed' % ', '.join(PHASES))
+    parser.add_argument('-j',
+                        '--parallel',
+                        type=int,
+                        default=1,
+                        help='Cores available to run jobs concurrently')
+    parser.add_argument('--results',
+                        default=DEFAULT_RESULTS,
+                        help='File to append results to (default: '
+                        '%(default)s)')
+    parser.add_argument('--no-record',
+                        action='store_true',
+                        help='Do not append results to the results file')
+    parser.add_argument('--measure', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    for phase in args.phases.split(','):
+        if phase not in PHASES:
+            parser.error('unrecognized phase %s' % phase)
+    return args
+
+
+def main():
+    """ Measure each size, record, and report """
+    args = _parse_args()
+    phases = args.phases.split(',')
+    if args.measure is not None:
+        print(json.dumps(measure(args.measure, phases, args.parallel)))
+        return
+
+    previous_records = _read_results(args.results)
+    version = '.'.join(str(number) for number in sciath.__version__)
+    revision = _revision()
+    date = datetime.datetime.now().isoformat()
+    records = []
+    for size in sorted(int(size) for size in args.sizes.split(',')):
+        print('Measuring %d tests ...' % size)
+        sys.stdout.flush()
+        record = _measure_in_subprocess(size, phases, args.parallel)
+        record.update({
+            'version': version,
+            'revision': revision,
+            'date': date,
+            'python': platform.python_version(),
+            'host': platform.node(),
+            'parallel': args.parallel,
+        })
+        records.append(record)
+    print()
+    print('SciATH %s (%s), Python %s' %
+          (version, revision or 'unknown revision', platform.python_version()))
+    _report(records, previous_records)
+
+    if not args.no_record:
+        with open(args.results, 'a') as results_file:
+            for record in records:
+                results_file.write(json.dumps(record, sort_keys=True) + '\n')
+        print('\nResults appended to file:\n  %s' %
+              os.path.abspath(args.results))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,294 @@
+#!/usr/bin/env python
+""" Compare the YAML-subset parser with the line-by-line parser it replaced
+
+    The parser in :mod:`sciath.yaml_parse` tokenizes each line in one pass
+    and builds the nested structure from plain tuples. The previous parser,
+    kept here for reference, called ``lstrip``, ``rstrip`` and ``split``
+    repeatedly for each line and created a ``DotDict`` for each entry and
+    stack frame.
+
+    By default, both parsers are timed on generated test files, with 1k, 10k
+    and 100k entries. With ``--fuzz N``, both parse N randomly generated
+    inputs, mixing valid and invalid syntax, and any difference in their
+    results or error messages is reported.
+
+    Usage, from the root directory:
+
+        python benchmarks/yaml_parser.py
+        python benchmarks/yaml_parser.py --fuzz 100000
+"""
+from __future__ import print_function
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sciath import yaml_parse  #pylint: disable=wrong-import-position
+from sciath.utility import DotDict  #pylint: disable=wrong-import-position
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+# Fragments of lines for fuzzing, including whitespace and characters which
+# are significant to the parser
+_FRAGMENTS = ('-', '- ', ':', ': ', 'a', 'b', 'key', ' value', '#', ' ', '  ',
+              '\t', '\r', "'x: y'")
+
+
+def reference_parse_yaml_subset(text, filename='<string>'):  #pylint: disable=too-many-branches,too-many-locals
+    """ The line-by-line parser which yaml_parse.parse_yaml_subset replaced """
+    lines = text.split('\n')
+
+    stack = []
+    line_number = 0
+    for line_number, line in enumerate(lines, start=1):  #pylint: disable=too-many-nested-blocks
+        # Add content to nested structure
+        for entry in _reference_parse_line(line, filename, line_number):
+            indent = entry.indent
+            entry_type = entry.entry_type
+            key = entry.key
+            value = entry.value
+            if not stack:
+                # The first entry
+                if entry_type == 's':
+                    data = [value]
+                    prev_key = None
+                elif entry_type == 'm':
+                    data = {key: value}
+                    prev_key = key
+                stack = [
+                    DotDict(entry_type=entry_type, indent=indent, data=data)
+                ]
+            else:
+                curr = stack[-1]
+                if indent != curr.indent:
+                    if indent > curr.indent:
+                        prev = curr
+
+                        # Create a new stack frame with an empty list or dict
+                        new_data = {} if entry_type == 'm' else []
+                        stack.append(
+                            DotDict(entry_type=entry_type,
+                                    indent=indent,
+                                    data=new_data))
+                        curr = stack[-1]
+
+                        # Insert new data as value in preceding item
+                        if prev.entry_type == 's':
+                            if prev.data[-1]:
+                                _reference_parse_error(
+                                    filename, line_number,
+                                    "Data not allowed on previous sequence line, when nesting"
+                                )
+                            prev.data[-1] = new_data
+                        else:
+                            if prev.data[prev_key]:
+                                _reference_parse_error(
+                                    filename, line_number,
+                                    "Data not allowed on previous mapping line, when nesting"
+                                )
+                            prev.data[prev_key] = new_data
+                    else:
+                        # Unwind the stack
+                        while True:
+                            stack.pop()
+                            if not stack:
+                                _reference_parse_error(filename, line_number,
+                                                       "Invalid indentation")
+                            curr = stack[-1]
+                            if indent == curr.indent:
+                                break
+
+                # Add new entry to current list or dict
+                if entry_type != curr.entry_type:
+                    _reference_parse_error(filename, line_number,
+                                           "Invalid entry type")
+                if entry_type == 's':
+                    curr.data.append(value)
+                    prev_key = None
+                else:
+                    if key in curr.data:
+                        _reference_parse_error(filename, line_number,
+                                               "Duplicate key: %s" % key)
+                    curr.data[key] = value
+                    prev_key = key
+
+    return stack[0].data
+
+
+def _reference_parse_error(filename, line_number, message):
+    raise yaml_parse.SciATHYAMLParseException("%s:%d  File parse error: %s" %
+                                              (filename, line_number, message))
+
+
+def _reference_compute_indent(string, filename, line_number):
+    len_string_spaces_stripped = len(string.lstrip(' '))
+    if len(string.lstrip()) != len_string_spaces_stripped:
+        _reference_parse_error(filename, line_number, "Indent with spaces only")
+    return len(string) - len_string_spaces_stripped
+
+
+def _reference_parse_line(line, filename, line_number):
+
+    entries = []
+
+    # Return immediately for whitespace-only or comment lines
+    line_lstrip = line.lstrip()
+    if line_lstrip == '' or line_lstrip.startswith('#'):
+        return entries
+
+    # Remove trailing whitespace
+    content = line.rstrip()
+
+    while content:
+        indent = _reference_compute_indent(content, filename, line_number)
+        if content[indent] == '-':
+            entry_type = 's'
+            key = None
+            if ':' in content:
+                value = ''
+                content = content[:indent] + ' ' + content[indent + 1:]
+            else:
+                value = content[indent + 1:].strip()
+                content = None
+            entries.append(
+                DotDict(indent=indent,
+                        entry_type=entry_type,
+                        key=key,
+                        value=value))
+        elif ':' in content:
+            entry_type = 'm'
+            key, value = content.split(':', 1)
+            key = key.strip()
+            value = value.strip()
+            content = None
+            entries.append(
+                DotDict(indent=indent,
+                        entry_type=entry_type,
+                        key=key,
+                        value=value))
+        elif content.strip():
+            _reference_parse_error(
+                filename, line_number,
+                'Non-empty, non-comment lines must start with - or contain :')
+
+    return entries
+
+
+def generate_test_file(size):
+    """ Returns the text of a test file with a number of entries """
+    lines = ['environment:', '  - SCIATH_EXAMPLE', 'tests:']
+    for index in range(size):
+        lines.extend([
+            '  - name: test%d' % index,
+            '    # A comment',
+            '    commands:',
+            '      - ./setup --case %d' % index,
+            '      - command: ./solve -n %d' % index,
+            '        ranks: 4',
+            '    expected: expected/test%d.expected' % index,
+            '    groups:',
+            '      - solver',
+            '      - group%d' % (index % 10),
+            '',
+        ])
+    return '\n'.join(lines) + '\n'
+
+
+def generate_fuzz_input(rng):
+    """ Returns a short random input, mostly of plausible lines """
+    lines = []
+    for _ in range(rng.randint(0, 6)):
+        indent = ' ' * rng.choice((0, 0, 1, 2, 2, 4, 6))
+        line = ''.join(rng.choice(_FRAGMENTS) for _ in range(rng.randint(0, 4)))
+        if rng.random() < 0.5:
+            line = rng.choice(('- ', 'key: ', '- key: ', '- - ', 'key:')) + line
+        lines.append(indent + line)
+    return '\n'.join(lines)
+
+
+def _outcome(parse, text):
+    """ Returns a parser's result, or the type and message of its error """
+    try:
+        return parse(text, 'input.yml')
+    except Exception as exception:  #pylint: disable=broad-except
+        return (type(exception).__name__, str(exception))
+
+
+def fuzz(count, seed):
+    """ Compare the parsers on random inputs, returning the number differing
+    """
+    rng = random.Random(seed)
+    differences = 0
+    for _ in range(count):
+        text = generate_fuzz_input(rng)
+        expected = _outcome(reference_parse_yaml_subset, text)
+        actual = _outcome(yaml_parse.parse_yaml_subset, text)
+        if expected != actual:
+            differences += 1
+            if differences <= 10:
+                print('Input: %r' % text)
+                print('  reference: %r' % (expected,))
+                print('  parser:    %r' % (actual,))
+    print('%d of %d inputs parsed differently' % (differences, count))
+    return differences
+
+
+def benchmark(sizes, repeat):
+    """ Print the best of several times for each parser, for each size """
+    print('%8s %8s %14s %14s %8s' %
+          ('entries', 'lines', 'reference (s)', 'parser (s)', 'speedup'))
+    for size in sizes:
+        text = generate_test_file(size)
+        times = []
+        for parse in (reference_parse_yaml_subset,
+                      yaml_parse.parse_yaml_subset):
+            best = None
+            for _ in range(repeat):
+                start = time.time()
+                result = parse(text)
+                elapsed = time.time() - start
+                best = elapsed if best is None else min(best, elapsed)
+            times.append(best)
+            if parse is reference_parse_yaml_subset:
+                expected = result
+            elif result != expected:
+                raise Exception('Parsers disagree on a test file of size %d' %
+                                size)
+        print('%8d %8d %14.4f %14.4f %7.1fx' %
+              (size, text.count('\n'), times[0], times[1], times[0] / times[1]))
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(
+        description='Compare the YAML-subset parser with its predecessor')
+    parser.add_argument('--sizes',
+                        default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help='Comma-separated numbers of test entries '
+                        '(default: %(default)s)')
+    parser.add_argument('--repeat',
+                        type=int,
+                        default=3,
+                        help='Take the best of this many times')
+    parser.add_argument('--fuzz',
+                        type=int,
+                        metavar='N',
+                        help='Compare the parsers on N random inputs instead')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for --fuzz')
+    return parser.parse_args()
+
+
+def main():
+    """ Fuzz or benchmark, returning an exit code """
+    args = _parse_args()
+    if args.fuzz is not None:
+        return 1 if fuzz(args.fuzz, args.seed) else 0
+    benchmark([int(size) for size in args.sizes.split(',')], args.repeat)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
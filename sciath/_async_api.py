@@ -0,0 +1,225 @@
+""" asyncio counterparts to blocking :class:`Launcher` and :class:`Harness` methods
+
+    This module requires Python 3.5+, so is only imported by the methods which
+    use it.
+"""
+from __future__ import print_function
+
+import asyncio
+import os
+import time
+
+from sciath._job_files import (TIMEOUT_EXIT_CODE, _check_not_launched,
+                               _pad_exit_codes, _touch, _write_exit_code)
+from sciath._processes import (CANCEL_GRACE_PERIOD, _exit_code_from_os_error,
+                               _exit_code_from_returncode,
+                               _set_blocking_io_stdout,
+                               _terminate_process_group, _time_limit)
+from sciath._sciath_io import print_header
+
+
+async def submit_job_async(submit_data):  # pylint: disable=too-many-locals
+    """ Submit a prepared job, returning success, info, report
+
+        See :meth:`Launcher.submit_job_async`.
+    """
+    job = submit_data.job
+    exec_path = submit_data.exec_path
+    output_path = submit_data.output_path
+    deadline = None
+    if submit_data.wall_time is not None:
+        deadline = time.time() + 60.0 * submit_data.wall_time
+    timed_out = False
+
+    _check_not_launched(job, output_path)
+    _set_blocking_io_stdout()
+    _touch(os.path.join(output_path, job.launched_filename))
+    if submit_data.launch_command:
+        process = await asyncio.create_subprocess_exec(
+            *submit_data.launch_command, cwd=exec_path, start_new_session=True)
+        limit, _ = _time_limit(None, deadline)
+        timed_out = await _wait_within(process, limit) is None
+    else:
+        with open(os.path.join(output_path, job.stdout_filename),
+                  'a') as stdout_file, open(
+                      os.path.join(output_path, job.stderr_filename),
+                      'a') as stderr_file:
+            for command, wall_time in zip(submit_data.task_commands,
+                                          submit_data.task_wall_times):
+                if submit_data.collect_metrics:
+                    command = submit_data.measure_command + command
+                limit, ends_job = _time_limit(wall_time, deadline)
+                try:
+                    process = await asyncio.create_subprocess_exec(
+                        *command,
+                        cwd=exec_path,
+                        stdout=stdout_file,
+                        stderr=stderr_file,
+                        start_new_session=True)
+                    returncode = await _wait_within(process, limit)
+                    if returncode is None:
+                        exit_code = TIMEOUT_EXIT_CODE
+                    else:
+                        exit_code = _exit_code_from_returncode(returncode)
+                except OSError as error:
+                    returncode = 0
+                    exit_code = _exit_code_from_os_error(
+                        error, command, stderr_file)
+                _write_exit_code(job, output_path, exit_code)
+                if returncode is None:
+                    timed_out = True
+                    if ends_job:
+                        break
+    if timed_out:
+        _pad_exit_codes(job, output_path, TIMEOUT_EXIT_CODE)
+        _touch(os.path.join(output_path, job.timeout_filename))
+    if timed_out or not submit_data.launch_command:
+        _touch(os.path.join(output_path, job.complete_filename))
+    _set_blocking_io_stdout()
+    return True, None, None
+
+
+async def _wait_within(process, limit):
+    """ Wait for a process, returning its return code
+
+        If it does not finish within a time limit (in seconds, or None for no
+        limit), its process group is killed and None is returned.
+    """
+    if limit is None:
+        return await process.wait()
+    try:
+        return await asyncio.wait_for(process.wait(), limit)
+    except asyncio.TimeoutError:
+        _terminate_process_group(process, CANCEL_GRACE_PERIOD)
+        await process.wait()
+        return None
+
+
+class _Slots(object):  # pylint: disable=bad-option-value,useless-object-inheritance
+    """ A semaphore counting cores, from which several may be acquired at once """
+
+    def __init__(self, slots):
+        self.slots = slots
+        self._free = slots
+        self._condition = asyncio.Condition()
+
+    async def acquire(self, slots):
+        """ Wait until the requested number of slots is free, and take them """
+        slots = min(slots, self.slots)
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._free >= slots)
+            self._free -= slots
+        return slots
+
+    async def release(self, slots):
+        """ Return slots taken with acquire() """
+        async with self._condition:
+            self._free += slots
+            self._condition.notify_all()
+
+
+class _AsCompleted(object):  # pylint: disable=bad-option-value,useless-object-inheritance,too-few-public-methods
+    """ An asynchronous iterator over the results of a set of coroutines,
+        in the order in which they finish.
+
+        The coroutines are created, by calling ``start()``, on the first
+        iteration, once an event loop is running.
+    """
+
+    def __init__(self, start):
+        self._start = start
+        self._futures = None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._futures is None:
+            self._futures = iter(asyncio.as_completed(self._start()))
+        try:
+            future = next(self._futures)
+        except StopIteration:
+            raise StopAsyncIteration  # pylint: disable=raise-missing-from
+        return await future
+
+
+def execute_async(harness):
+    """ See :meth:`Harness.execute_async` """
+    unsupported = _unsupported_options(harness)
+    if unsupported:
+        raise Exception('[SciATH] execute_async does not support %s' %
+                        ', '.join(unsupported))
+
+    def _start():
+        harness.clean()
+        harness._collect_required_metrics()  # pylint: disable=protected-access
+        if harness.testruns:
+            if not harness.quiet:
+                print()
+                print_header("Executing Tests")
+                print(harness.launcher)
+        slots = _Slots(harness.parallel if harness.launcher.blocking else 1)
+        return [
+            _execute_testrun(harness, testrun, slots)
+            for testrun in harness.testruns
+            if testrun.active
+        ]
+
+    return _AsCompleted(_start)
+
+
+def _unsupported_options(harness):
+    """ Returns the names of options set on a Harness which only
+        :meth:`Harness.execute` supports
+    """
+    benchmark = harness.benchmark_repeat is not None or any(
+        testrun.test.benchmark_repeat is not None
+        for testrun in harness.testruns
+        if testrun.active)
+    return [
+        name for name, enabled in (
+            ('result_cache', harness.result_cache is not None),
+            ('resume', harness.resume),
+            ('benchmark_repeat', benchmark),
+            ('max_failures', harness.max_failures),
+            ('tracer', harness.tracer is not None),
+        ) if enabled
+    ]
+
+
+async def _execute_testrun(harness, testrun, slots):
+    slots_taken = await slots.acquire(testrun.test.job.cores_required())
+    try:
+        submit_data = harness._prepare_testrun(testrun)  # pylint: disable=protected-access
+        if submit_data is not None:
+            success, info, report = await submit_job_async(submit_data)
+            if not success:
+                harness._mark_skipped(testrun, info, report)  # pylint: disable=protected-access
+    finally:
+        await slots.release(slots_taken)
+    return testrun
+
+
+def verify_async(harness):
+    """ See :meth:`Harness.verify_async` """
+    return _VerifyIterator(harness)
+
+
+class _VerifyIterator(object):  # pylint: disable=bad-option-value,useless-object-inheritance,too-few-public-methods
+    """ An asynchronous iterator which verifies a Harness's test runs in turn """
+
+    def __init__(self, harness):
+        self._harness = harness
+        self._testruns = iter(harness.testruns)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            testrun = next(self._testruns)
+        except StopIteration:
+            raise StopAsyncIteration  # pylint: disable=raise-missing-from
+        await asyncio.sleep(0)
+        self._harness._verify_testrun(testrun)  # pylint: disable=protected-access
+        return testrun
@@ -0,0 +1,518 @@
+""" Internal logic to run a Harness from command line options, as
+    :meth:`Harness.run_from_args` does
+
+    This is imported only when needed, so that using SciATH from Python
+    does not import :mod:`argparse`.
+"""
+from __future__ import print_function
+
+import os
+import sys
+import argparse
+
+import sciath
+import sciath.test_file
+from sciath._profile import PROFILERS
+from sciath._run_database import _RunDatabase
+from sciath._sciath_io import (py23input, format_info, print_info, print_header,
+                               print_warning, print_error)
+from sciath._selection import SciATHSelectionException
+from sciath._test_run import _TestRunStatus
+from sciath._trace import _Tracer, trace_span
+
+
+def run_from_args(harness):  #pylint: disable=too-many-branches,too-many-return-statements
+    """ Perform one or more actions with a Harness, based on command line
+        options, returning an exit code
+    """
+    args = _parse_args(harness._discover_pattern)  #pylint: disable=protected-access
+    exit_code = _apply_output_options(harness, args)
+    if exit_code is not None:
+        return exit_code
+
+    if args.update_expected and not _confirm_update_expected():
+        print_info("Aborting.")
+        return 0
+
+    filename = harness._run_database_filename  #pylint: disable=protected-access
+    harness.run_database = _RunDatabase(os.path.join(os.getcwd(), filename))
+    input_files = list(args.input_files or [])
+    if args.rerun_failed and not input_files and not args.discover:
+        input_files = harness.run_database.latest_input_files()
+
+    exit_code = _add_tests(harness, args, input_files)
+    if exit_code is not None:
+        return exit_code
+
+    if args.rerun_failed:
+        failed_names = _failed_names(harness)
+        if not failed_names:
+            print_info("No failed tests to re-run")
+            return 0
+        harness._activate_tests_from_list(failed_names)  #pylint: disable=protected-access
+
+    if args.list:
+        harness.print_all_tests(active_only=True)
+        return 0
+
+    if args.configure_default:
+        from sciath.launcher import Launcher  #pylint: disable=bad-option-value,import-outside-toplevel
+        Launcher.write_default_definition(args.conf_file)
+        return 0
+
+    try:
+        harness.create_active_tests()
+    except sciath.test_file.SciATHTestFileException as exception:
+        print_error("There was a problem reading tests:", file=sys.stderr)
+        print(exception, file=sys.stderr)
+        return 2
+
+    if args.resume:
+        harness.resume = True
+
+    from sciath.launcher import Launcher  #pylint: disable=bad-option-value,import-outside-toplevel
+    harness.launcher = Launcher(args.conf_file)
+
+    if args.configure:
+        harness.launcher.configure()
+
+    if args.purge_output:
+        harness.clean()
+        return 0
+
+    exit_code = _apply_execution_options(harness, args)
+    if exit_code is not None:
+        return exit_code
+
+    _run(harness, args, input_files)
+
+    if harness.tracer is not None:
+        _write_trace(harness, args.trace)
+
+    if args.error_on_test_failure:
+        if not harness.determine_overall_success():
+            return 1
+
+    return 0
+
+
+def _apply_output_options(harness, args):
+    """ Apply options for output, concurrency, and stopping after failures,
+        returning an exit code if they are invalid
+    """
+    if args.no_colors:
+        sciath.no_colors()
+
+    if args.quiet or args.tap:
+        harness.quiet = True
+
+    if args.trace:
+        harness.tracer = _Tracer()
+
+    if args.jobs is not None:
+        if args.jobs < 1:
+            print_error("The number of cores must be positive", file=sys.stderr)
+            return 2
+        harness.parallel = args.jobs
+
+    if args.max_failures is not None:
+        if args.max_failures < 1:
+            print_error("The maximum number of failures must be positive",
+                        file=sys.stderr)
+            return 2
+        if args.execute or args.update_expected:
+            print_error(
+                "--max-failures requires verifying tests as they complete, "
+                "so cannot be used with -e or -u",
+                file=sys.stderr)
+            return 2
+        harness.max_failures = args.max_failures
+    return None
+
+
+def _confirm_update_expected():
+    """ Returns True if the user confirms that expected files are to be
+        overwritten
+    """
+    print_info("You have provided an argument to updated expected files.")
+    print_info("This will attempt to OVERWRITE your expected files!")
+    user_input = None
+    while not user_input:
+        user_input = py23input(
+            format_info("Are you sure? Type 'y' to continue: "))
+    return user_input[0] in ['y', 'Y']
+
+
+def _add_tests(harness, args, input_files):
+    """ Add tests from input files and directories, and select those to run,
+        returning an exit code if this fails
+    """
+    if args.variant_a or args.variant_b:
+        try:
+            harness.variants = [
+                ('a', _parse_assignments(args.variant_a)),
+                ('b', _parse_assignments(args.variant_b)),
+            ]
+        except ValueError as exception:
+            print_error(str(exception), file=sys.stderr)
+            return 2
+
+    if args.parse_cache:
+        from sciath._parse_cache import _ParseCache  #pylint: disable=bad-option-value,import-outside-toplevel
+        harness.parse_cache = _ParseCache()
+
+    for input_file in input_files or []:
+        try:
+            harness.add_tests_from_file(input_file)
+        except sciath.test_file.SciATHTestFileException as exception:
+            print_error("There was a problem reading tests from %s:" %
+                        input_file,
+                        file=sys.stderr)
+            print(exception, file=sys.stderr)
+            return 2
+
+    for directory in args.discover or []:
+        try:
+            input_files.extend(
+                harness.add_tests_from_directory(directory,
+                                                 args.discover_pattern))
+        except sciath.test_file.SciATHTestFileException as exception:
+            print_error("There was a problem discovering tests in %s:" %
+                        directory,
+                        file=sys.stderr)
+            print(exception, file=sys.stderr)
+            return 2
+
+    try:
+        if args.test:
+            harness._activate_tests_from_list(args.test)  #pylint: disable=protected-access
+
+        if args.group or args.exclude_group:
+            harness._activate_test_groups(args.group, args.exclude_group)  #pylint: disable=protected-access
+    except SciATHSelectionException as exception:
+        print_error(str(exception), file=sys.stderr)
+        return 2
+    return None
+
+
+def _failed_names(harness):
+    """ Returns the names of tests which did not pass when last run """
+    results = harness.run_database.latest_results()
+    failed_names = []
+    for testrun in harness.testruns:
+        result = results.get(testrun.name)
+        if result and result['status'] not in [
+                _TestRunStatus.PASS, _TestRunStatus.DEACTIVATED
+        ]:
+            failed_names.append(testrun.name)
+    return failed_names
+
+
+def _apply_execution_options(harness, args):
+    """ Apply options for how jobs are run, returning an exit code if they
+        are invalid
+    """
+    if args.metrics:
+        harness.metrics = True
+        harness.launcher.collect_metrics = True
+
+    if args.profile == 'custom':
+        if '<output>' not in (args.profile_command or ''):
+            print_error(
+                "--profile custom requires a --profile-command "
+                "containing <output>",
+                file=sys.stderr)
+            return 2
+        harness.launcher.profiler = args.profile_command
+    elif args.profile:
+        harness.launcher.profiler = PROFILERS[args.profile]
+    jobs = [testrun.test.job for testrun in harness.testruns if testrun.active]
+    for message in harness.launcher.template_warnings(jobs):
+        print_warning(message)
+
+    if args.cache or args.cache_dir:
+        from sciath._result_cache import _ResultCache  #pylint: disable=bad-option-value,import-outside-toplevel
+        harness.result_cache = _ResultCache(args.cache_dir)
+
+    if args.benchmark is not None:
+        if args.benchmark < 1 or args.warmup < 0:
+            print_error(
+                "The number of benchmark runs must be positive, and of "
+                "warm-up runs not negative",
+                file=sys.stderr)
+            return 2
+        harness.benchmark_repeat = args.benchmark
+        harness.benchmark_warmup = args.warmup
+    if args.max_spread is not None:
+        harness.benchmark_spread = args.max_spread
+    return None
+
+
+def _run(harness, args, input_files):
+    """ Execute, update, verify, and report on tests, as options request """
+    pipeline = ((args.pipeline or args.max_failures) and
+                not args.update_expected and not args.execute)
+    if not args.verify:
+        harness.execute(verify=pipeline)
+
+    if args.update_expected:
+        from sciath.verifier import SciATHVerifierMissingFileException  #pylint: disable=bad-option-value,import-outside-toplevel
+        try:
+            with trace_span(harness.tracer, 'update'):
+                harness.update_expected()
+        except SciATHVerifierMissingFileException as exception:
+            print_warning("Update of expected file failed:")
+            print_info(exception)
+            print_warning("Not updating")
+
+    if args.execute or (not args.verify and not harness.launcher.blocking):
+        if harness.testruns:
+            if not harness.quiet:
+                print_info("Not verifying or reporting")
+    else:
+        if not pipeline or args.verify:
+            harness.verify()
+        with trace_span(harness.tracer, 'report'):
+            harness.report()
+        with trace_span(harness.tracer, 'record'):
+            harness.record_run(input_files)
+        if args.tap:
+            from sciath.report_tap import print_tap  #pylint: disable=bad-option-value,import-outside-toplevel
+            print_tap(harness)
+
+
+def _write_trace(harness, filename):
+    """ Write the trace to a file, and print a summary """
+    harness.tracer.write(filename)
+    if not harness.quiet:
+        print()
+        print_header("Trace")
+        for line in harness.tracer.summary():
+            print(line)
+        print('\nTrace written to file:\n  %s' % os.path.abspath(filename))
+
+
+def _parse_assignments(assignments):
+    """ Returns a dict from a list of strings like VARIABLE=value
+
+        Raises ValueError if the list is empty or a string is not well-formed.
+    """
+    if not assignments:
+        raise ValueError('Both --variant-a and --variant-b are required')
+    environment = {}
+    for assignment in assignments:
+        variable, equals, value = assignment.partition('=')
+        variable = variable.lstrip('$')
+        if not equals or not variable:
+            raise ValueError('Expected VARIABLE=value, not %s' % assignment)
+        environment[variable] = value
+    return environment
+
+
+def _parse_args(discover_pattern):
+    parser = argparse.ArgumentParser(description='SciATH')
+    parser.add_argument('input_files',
+                        help='YAML file[s] to add tests to the harness',
+                        nargs='*',
+                        default=None)
+    parser.add_argument(
+        '--discover',
+        help=('Add tests from all files matching --discover-pattern in this '
+              'directory tree, reading them in parallel'),
+        metavar='DIR',
+        required=False,
+        action='append')
+    parser.add_argument(
+        '--discover-pattern',
+        help=('Glob for the names of files to add tests from, with '
+              '--discover (default: %s)' % discover_pattern),
+        metavar='GLOB',
+        required=False)
+    parser.add_argument('-c',
+                        '--configure',
+                        help='Configure queuing system information',
+                        required=False,
+                        action='store_true')
+    parser.add_argument(
+        '-t',
+        '--test',
+        help=('Run only tests matching this and other -t/--test arguments: '
+              'names, globs (e.g. "solver_*"), or regular expressions '
+              'prefixed with re:'),
+        required=False,
+        action='append')
+    parser.add_argument('-p',
+                        '--purge-output',
+                        help='Delete generated output',
+                        required=False,
+                        action='store_true')
+    parser.add_argument('-f',
+                        '--error-on-test-failure',
+                        help='Return exit code of 1 if any test failed',
+                        required=False,
+                        action='store_true')
+    parser.add_argument('-d',
+                        '--configure-default',
+                        help='Write default queuing system config file',
+                        required=False,
+                        action='store_true')
+    parser.add_argument('-l',
+                        '--list',
+                        help='List all selected tests and exit',
+                        required=False,
+                        action='store_true')
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        help=('Run jobs concurrently on this many cores, with a blocking '
+              'launcher. A job needs (ranks x threads) cores'),
+        required=False,
+        type=int)
+    parser.add_argument(
+        '--pipeline',
+        help=('Verify each test, and print its status, as soon as its job '
+              'completes, with a blocking launcher'),
+        required=False,
+        action='store_true')
+    parser.add_argument(
+        '--max-failures',
+        help=('Stop launching tests, and cancel running tests, after this '
+              'many failures, with a blocking launcher. Implies --pipeline'),
+        required=False,
+        type=int)
+    parser.add_argument(
+        '--parse-cache',
+        help=('Reuse the results of parsing unchanged test files, cached in '
+              '~/.cache/sciath/parsed (or $XDG_CACHE_HOME/sciath/parsed)'),
+        required=False,
+        action='store_true')
+    parser.add_argument(
+        '--cache',
+        help=('Restore the output of tests which have not changed since they '
+              'last passed, instead of running them, with a blocking launcher'),
+        required=False,
+        action='store_true')
+    parser.add_argument(
+        '--cache-dir',
+        help=('Directory for the result cache. Implies --cache. Default: '
+              '$XDG_CACHE_HOME/sciath/results or ~/.cache/sciath/results'),
+        required=False)
+    parser.add_argument(
+        '--rerun-failed',
+        help=('Run only tests which did not pass when last run, as recorded in '
+              'sciath_runs.jsonl. Without input files, use those last used'),
+        required=False,
+        action='store_true')
+    parser.add_argument(
+        '--resume',
+        help=('Keep the output of tests which completed in an interrupted run, '
+              'and only run the others'),
+        required=False,
+        action='store_true')
+    parser.add_argument(
+        '--metrics',
+        help=('Record elapsed time, CPU time, and peak memory use for each '
+              'task, and include them in reports'),
+        required=False,
+        action='store_true')
+    parser.add_argument(
+        '--profile',
+        help=('Run each task under a profiler, inside any MPI launcher, '
+              'writing profiles for each rank to the output directory'),
+        required=False,
+        choices=sorted(PROFILERS) + ['custom'])
+    parser.add_argument(
+        '--profile-command',
+        help=('With --profile custom, a command to prefix each task with, in '
+              'which <output> is replaced with a prefix for profile files, '
+              'for instance "py-spy record -o <output>.svg --"'),
+        required=False)
+    parser.add_argument(
+        '--trace',
+        help=('Record the time spent in each phase of work, for each test, '
+              'and write it to this file, in Chrome trace event format (for '
+              'about://tracing or Perfetto), and print a summary'),
+        required=False)
+    parser.add_argument(
+        '--benchmark',
+        help=('Run each job this many times, after --warmup runs, from fresh '
+              'sandboxes, and report statistics of the run times, with a '
+              'blocking launcher'),
+        required=False,
+        type=int)
+    parser.add_argument(
+        '--warmup',
+        help='With --benchmark, untimed runs of each job. Default: 0',
+        required=False,
+        type=int,
+        default=0)
+    parser.add_argument(
+        '--max-spread',
+        help=('Flag benchmarks whose interquartile range is more than this '
+              'fraction of their median run time. Default: 0.1'),
+        required=False,
+        type=float)
+    parser.add_argument(
+        '--variant-a',
+        help=('With --variant-b, run each test twice, with environment '
+              'variables named in input files set as given, for instance '
+              'APP_DIR=/path/to/build, and compare run times and output. '
+              'May be given more than once'),
+        required=False,
+        action='append')
+    parser.add_argument('--variant-b',
+                        help='See --variant-a. May be given more than once',
+                        required=False,
+                        action='append')
+    parser.add_argument('-w',
+                        '--conf-file',
+                        help='Use provided configuration file',
+                        required=False)
+    parser.add_argument('--no-colors',
+                        help='Deactivate colored output',
+                        required=False,
+                        action='store_true')
+    parser.add_argument(
+        '-u',
+        '--update-expected',
+        help='When well-defined, update reference files with current output',
+        required=False,
+        action='store_true')
+    stage_skip_group = parser.add_mutually_exclusive_group()
+    stage_skip_group.add_argument(
+        '-v',
+        '--verify',
+        help='Perform test verification, and not execution',
+        required=False,
+        action='store_true')
+    stage_skip_group.add_argument(
+        '-e',
+        '--execute',
+        help='Perform test execution, and not verification',
+        required=False,
+        action='store_true')
+    parser.add_argument(
+        '-g',
+        '--group',
+        help=('Exclude tests not matching this or any other -g/--group '
+              'argument: a group, or an expression like "mpi and not slow"'),
+        required=False,
+        action='append')
+    parser.add_argument('-x',
+                        '--exclude-group',
+                        help=('Exclude tests in this group, or matching '
+                              'this group expression'),
+                        required=False,
+                        action='append')
+    parser.add_argument(
+        '--tap',
+        help='Print TAP-compatible output, and activate quiet mode.',
+        required=False,
+        action='store_true')
+    parser.add_argument(
+        '-q',
+        '--quiet',
+        help='Only print information requested by other options',
+        required=False,
+        action='store_true')
+    return parser.parse_args()
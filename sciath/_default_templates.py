@@ -4,7 +4,9 @@ import os
 
 CONTENTS_LOCAL = r"""#!/usr/bin/env sh
 
+$SCIATH_TASK_MEASURE \
 $SCIATH_TASK_MPI_RUN \
+$SCIATH_TASK_PROFILER \
 $SCIATH_TASK_COMMAND 1>>$SCIATH_JOB_STDOUT 2>>$SCIATH_JOB_STDERR; printf "$?\n" >> $SCIATH_JOB_EXITCODE
 
 touch $SCIATH_JOB_COMPLETE
@@ -19,7 +21,11 @@ CONTENTS_LSF = r"""#!/bin/sh
 #BSUB -W $SCIATH_JOB_WALLTIME_HM_OR_REMOVE_LINE
 #BSUB -q $SCIATH_QUEUE_OR_REMOVE_LINE
 
+touch $SCIATH_JOB_STARTED
+
+$SCIATH_TASK_MEASURE \
 $SCIATH_TASK_MPI_RUN \
+$SCIATH_TASK_PROFILER \
 $SCIATH_TASK_COMMAND; printf "$?\n" >> $SCIATH_JOB_EXITCODE
 
 touch $SCIATH_JOB_COMPLETE
@@ -35,7 +41,11 @@ CONTENTS_SLURM = r"""#!/bin/bash -l
 #SBATCH --account=$SCIATH_ACCOUNT_OR_REMOVE_LINE
 #SBATCH --partition=$SCIATH_QUEUE_OR_REMOVE_LINE
 
+touch $SCIATH_JOB_STARTED
+
+$SCIATH_TASK_MEASURE \
 $SCIATH_TASK_MPI_RUN \
+$SCIATH_TASK_PROFILER \
 $SCIATH_TASK_COMMAND; printf "$?\n" >> $SCIATH_JOB_EXITCODE
 
 touch $SCIATH_JOB_COMPLETE
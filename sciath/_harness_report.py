@@ -0,0 +1,269 @@
+""" Internal logic to compile the report of a Harness's test runs """
+
+import collections
+import os
+
+from sciath._sciath_io import (color_okay, color_fail, color_warning,
+                               format_header, format_subheader)
+from sciath._statistics import interquartile_range, mann_whitney_p, median
+from sciath._test_run import _TestRunStatus
+
+
+def color_from_status(status, string):  #pylint: disable=too-many-return-statements
+    """ Returns a string colored according to a test run status """
+    if status == _TestRunStatus.DEACTIVATED:
+        return string
+    if status == _TestRunStatus.PASS:
+        return color_okay(string)
+    if status == _TestRunStatus.FAIL:
+        return color_fail(string)
+    if status == _TestRunStatus.TIMEOUT:
+        return color_fail(string)
+    if status == _TestRunStatus.INCOMPLETE:
+        return color_warning(string)
+    if status == _TestRunStatus.NOT_LAUNCHED:
+        return color_warning(string)
+    if status == _TestRunStatus.UNKNOWN:
+        return color_warning(string)
+    if status == _TestRunStatus.SKIPPED:
+        return color_warning(string)
+    raise Exception("Unhandled status %s" % status)
+
+
+def format_status_line(testrun):
+    """ Returns a line giving the status of a test run """
+    line = [
+        color_from_status(testrun.status,
+                          "[%s]  %s" % (testrun.name, testrun.status))
+    ]
+    if testrun.status_info:
+        line.append(' (' + testrun.status_info + ')')
+    if testrun.cached:
+        line.append(' [cached]')
+    return ''.join(line)
+
+
+def report_lines(harness, pager):
+    """ Returns the lines of a report on a Harness's test runs
+
+        Files to check are given as commands to view them with a pager.
+    """
+    testruns = harness.testruns
+    if not testruns:
+        return ["No tests"]
+    report = verification_reports(testruns, pager)
+    if harness.metrics:
+        report.extend(metrics_report(testruns))
+    if any(testrun.benchmark_times for testrun in testruns):
+        report.extend(benchmark_report(testruns, harness.benchmark_spread))
+    if harness.variants:
+        report.extend(variants_report(testruns, harness.variants))
+    if harness.launcher is not None and harness.launcher.profiler:
+        report.extend(profiles_report(testruns))
+    report.append('')
+    report.append(format_header("Summary"))
+    failed_names = []
+    for testrun in testruns:
+        if testrun.status in [_TestRunStatus.FAIL, _TestRunStatus.TIMEOUT]:
+            failed_names.append(testrun.name)
+        report.append(format_status_line(testrun))
+    report.append('')
+    if any((testrun.active for testrun in testruns)):
+        if harness.determine_overall_success():
+            report.append(color_okay("SUCCESS"))
+        else:
+            report.append(color_fail("FAILURE"))
+            if failed_names:
+                report.append('To re-run failed tests, use e.g.')
+                report.append('  -t ' + ','.join(failed_names))
+    else:
+        report.append("No tests active")
+    return report
+
+
+def verification_reports(testruns, pager):
+    """ Returns lines giving the verification report of each test run which
+        has one, with the output files to check
+    """
+    report = []
+    for testrun in testruns:
+        if not testrun.report:
+            continue
+        if not report:
+            report.append('')
+            report.append(format_header("Verification Reports"))
+        report.append(format_subheader("Report for %s" % testrun.name))
+        report.extend(testrun.report)
+        stdout_filename = os.path.join(testrun.output_path,
+                                       testrun.test.job.stdout_filename)
+        if os.path.isfile(stdout_filename) and os.stat(
+                stdout_filename).st_size != 0:
+            report.append('check stdout file:')
+            report.append('    %s %s' % (pager, stdout_filename))
+        stderr_filename = os.path.join(testrun.output_path,
+                                       testrun.test.job.stderr_filename)
+        if os.path.isfile(stderr_filename) and os.stat(
+                stderr_filename).st_size != 0:
+            report.append(color_warning("check non-empty stderr file:"))
+            report.append('    %s %s' % (pager, stderr_filename))
+    return report
+
+
+def metrics_report(testruns):
+    """ Returns lines reporting the resource usage of each task """
+    from sciath.launcher import job_metrics  #pylint: disable=bad-option-value,import-outside-toplevel
+    report = ['', format_header("Resource Usage")]
+    for testrun in testruns:
+        if not testrun.active:
+            continue
+        metrics = job_metrics(testrun.test.job, testrun.output_path)
+        if not metrics:
+            report.append('%s: no metrics recorded' % testrun.name)
+            continue
+        report.append(testrun.name)
+        for index, entry in enumerate(metrics):
+            report.append(
+                '  task %d: %.2f s elapsed, %.2f s user, %.2f s system, '
+                '%.1f MB max RSS' %
+                (index + 1, entry['elapsed'], entry['user'], entry['system'],
+                 entry['maxrss_kb'] / 1024.0))
+    return report
+
+
+def profiles_report(testruns):
+    """ Returns lines listing the profile files written by each test """
+    from sciath.launcher import job_profiles  #pylint: disable=bad-option-value,import-outside-toplevel
+    report = ['', format_header("Profiles")]
+    for testrun in testruns:
+        if not testrun.active:
+            continue
+        profiles = job_profiles(testrun.test.job, testrun.output_path)
+        if not profiles:
+            report.append('%s: no profiles written' % testrun.name)
+            continue
+        report.append(testrun.name)
+        for profile in profiles:
+            report.append('  %s' % profile)
+    return report
+
+
+def benchmark_report(testruns, max_spread):
+    """ Returns lines reporting statistics of benchmarked run times,
+        flagging those with an IQR above a fraction of the median
+    """
+    report = ['', format_header("Benchmark Results")]
+    for testrun in testruns:
+        times = testrun.benchmark_times
+        if not times:
+            continue
+        middle = median(times)
+        spread = interquartile_range(times)
+        report.append('%s: median %.3f s, min %.3f s, IQR %.3f s (%d runs)' %
+                      (testrun.name, middle, min(times), spread, len(times)))
+        if middle > 0 and spread > max_spread * middle:
+            report.append(
+                color_warning(
+                    '  noisy: IQR is %.0f%% of the median, above %.0f%%' %
+                    (100.0 * spread / middle, 100.0 * max_spread)))
+    return report
+
+
+def variants_report(testruns, variants):
+    """ Returns lines comparing the run times and output of each test's
+        two variants, given as two (label, environment) pairs
+    """
+    report = ['', format_header("Variant Comparison")]
+    for label, environment in variants:
+        report.append('%s: %s' % (label, ' '.join(
+            '$%s=%s' % item for item in sorted(environment.items()))))
+    pairs = collections.OrderedDict()
+    for testrun in testruns:
+        if testrun.active and testrun.variant:
+            name, label = testrun.variant
+            pairs.setdefault(name, {})[label] = testrun
+    label_a, label_b = [label for label, _ in variants]
+    rows = [('Test', '%s (s)' % label_a, '%s (s)' % label_b, 'Speedup',
+             'Output')]
+    differences = []
+    for name, variant_runs in pairs.items():
+        if label_a not in variant_runs or label_b not in variant_runs:
+            continue
+        cells, difference = _compare_variants(variant_runs[label_a],
+                                              variant_runs[label_b])
+        rows.append((name,) + cells)
+        if difference:
+            differences.append((name, difference))
+    report.extend(_format_variants_table(rows))
+    report.append('Speedup is %s time / %s time. Significance from the '
+                  'Mann-Whitney U test on benchmark times: '
+                  '* p < 0.05, ** p < 0.01' % (label_a, label_b))
+    for name, difference in differences:
+        report.append(
+            format_subheader('Output of %s@%s compared to %s@%s' %
+                             (name, label_b, name, label_a)))
+        report.extend(difference)
+    return report
+
+
+def _run_time(testrun):
+    """ Returns the median benchmarked time, or the time, of a test run """
+    if testrun.benchmark_times:
+        return median(testrun.benchmark_times)
+    return testrun.elapsed
+
+
+def _significance_marker(times_a, times_b):
+    """ Returns a marker for a significant difference between run times """
+    if not times_a or not times_b:
+        return ''
+    p_value = mann_whitney_p(times_a, times_b)
+    if p_value < 0.01:
+        return ' **'
+    if p_value < 0.05:
+        return ' *'
+    return ''
+
+
+def _compare_variants(run_a, run_b):
+    """ Returns the cells of a row comparing the run times and output
+        of two variants of a test, and a report of any difference in
+        their output
+    """
+    time_a, time_b = _run_time(run_a), _run_time(run_b)
+    speedup = '-'
+    if time_a is not None and time_b:
+        speedup = '%.2fx%s' % (time_a / time_b,
+                               _significance_marker(run_a.benchmark_times,
+                                                    run_b.benchmark_times))
+    same, difference = _compare_variant_output(run_a, run_b)
+    return ('-' if time_a is None else '%.3f' % time_a,
+            '-' if time_b is None else '%.3f' % time_b, speedup,
+            '-' if same is None else ('same' if same else 'differ')), difference
+
+
+def _compare_variant_output(run_a, run_b):
+    """ Returns whether the output of two variants of a test is the same,
+        as determined by the test's verifier, or None if it cannot
+        be compared, and a report of any difference
+    """
+    verifier = run_b.test.verifier
+    completed = (_TestRunStatus.PASS, _TestRunStatus.FAIL)
+    if (not hasattr(verifier, 'compare_output') or
+            run_a.status not in completed or run_b.status not in completed):
+        return None, []
+    return verifier.compare_output(run_b.output_path, run_b.exec_path,
+                                   run_a.output_path, run_a.exec_path)
+
+
+def _format_variants_table(rows):
+    """ Returns lines of a table of variant comparisons, with the name and
+        output comparison left-aligned and the times right-aligned
+    """
+    widths = [max(len(row[column]) for row in rows) for column in range(5)]
+    lines = []
+    for row in rows:
+        cells = [row[0].ljust(widths[0])]
+        cells.extend(row[column].rjust(widths[column]) for column in (1, 2, 3))
+        cells.append(row[4])
+        lines.append('  '.join(cells).rstrip())
+    return lines
@@ -0,0 +1,39 @@
+""" Internal logic to record a Job's progress in files in its output path,
+    shared by the blocking and asyncio launch code
+"""
+
+import os
+
+# The exit code recorded for a Task killed for exceeding a wall time,
+#  matching the convention of coreutils' timeout(1)
+TIMEOUT_EXIT_CODE = 124
+
+
+def _check_not_launched(job, output_path):
+    if os.path.isfile(os.path.join(output_path, job.complete_filename)):
+        raise Exception('[SciATH] trying to launch an already-complete Job')
+    if os.path.isfile(os.path.join(output_path, job.launched_filename)):
+        raise Exception('[SciATH] trying to launch an already-launched Job')
+
+
+def _touch(filename):
+    with open(filename, 'w'):
+        pass
+
+
+def _write_exit_code(job, output_path, exit_code):
+    """ Append an exit code to a Job's exit code file """
+    with open(os.path.join(output_path, job.exitcode_filename),
+              'a') as exitcode_file:
+        exitcode_file.write('%d\n' % exit_code)
+
+
+def _pad_exit_codes(job, output_path, exit_code):
+    """ Record an exit code for each of a Job's Tasks without one """
+    recorded = 0
+    exitcode_filename = os.path.join(output_path, job.exitcode_filename)
+    if os.path.isfile(exitcode_filename):
+        with open(exitcode_filename, 'r') as exitcode_file:
+            recorded = len(exitcode_file.readlines())
+    for _ in range(job.number_tasks() - recorded):
+        _write_exit_code(job, output_path, exit_code)
@@ -0,0 +1,80 @@
+""" Run a command, appending its resource usage to a metrics file
+
+    Usage: python _measure.py METRICS_FILE COMMAND [ARGUMENT ...]
+
+    This is used in launch scripts, in place of ``$SCIATH_TASK_MEASURE``,
+    so is run by path, and uses only the standard library.
+    It exits with the exit code a shell would report for the command.
+"""
+from __future__ import print_function
+
+import errno
+import os
+import sys
+import time
+
+METRICS_KEYS = ('elapsed', 'user', 'system', 'maxrss_kb')
+
+
+def format_metrics(elapsed, rusage=None):
+    """ Returns a line for a metrics file, from a time and resource usage
+
+        If no resource usage is given (for a process which could not be
+        started), zero usage is recorded.
+    """
+    if rusage is None:
+        return 'elapsed=%.3f user=0.000 system=0.000 maxrss_kb=0\n' % elapsed
+    maxrss_kb = rusage.ru_maxrss
+    if sys.platform == 'darwin':  # reported in bytes, not kilobytes
+        maxrss_kb //= 1024
+    return 'elapsed=%.3f user=%.3f system=%.3f maxrss_kb=%d\n' % (
+        elapsed, rusage.ru_utime, rusage.ru_stime, maxrss_kb)
+
+
+def parse_metrics(filename):
+    """ Returns a list of dicts, one for each line of a metrics file """
+    metrics = []
+    with open(filename, 'r') as metrics_file:
+        for line in metrics_file:
+            entry = {}
+            for field in line.split():
+                key, _, value = field.partition('=')
+                if key in METRICS_KEYS:
+                    entry[key] = float(value)
+            if entry:
+                metrics.append(entry)
+    return metrics
+
+
+def exit_code_from_status(status):
+    """ Returns the exit code a shell reports, from a status from wait() """
+    if os.WIFSIGNALED(status):
+        return 128 + os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def main(argv):
+    """ Run a command, returning its exit code """
+    if len(argv) < 2:
+        print(
+            'Usage: python _measure.py METRICS_FILE COMMAND '
+            '[ARGUMENT ...]',
+            file=sys.stderr)
+        return 2
+    metrics_filename, command = argv[0], argv[1:]
+    start_time = time.time()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.execvp(command[0], command)
+        except OSError as error:
+            print('%s: %s' % (command[0], error.strerror), file=sys.stderr)
+            os._exit(127 if error.errno == errno.ENOENT else 126)  #pylint: disable=protected-access
+    _, status, rusage = os.wait4(pid, 0)
+    with open(metrics_filename, 'a') as metrics_file:
+        metrics_file.write(format_metrics(time.time() - start_time, rusage))
+    return exit_code_from_status(status)
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
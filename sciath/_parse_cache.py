@@ -0,0 +1,103 @@
+""" Internal logic to cache the parsed contents of test files """
+
+import hashlib
+import os
+import pickle
+import sys
+import time
+
+import sciath
+from sciath import yaml_parse
+from sciath._sciath_io import _default_cache_directory
+
+# Errors from reading a missing or corrupt entry. Python 2's pickle reports
+# an unknown opcode as a KeyError, rather than an UnpicklingError.
+_ENTRY_ERRORS = (OSError, IOError, EOFError, pickle.UnpicklingError) + (
+    (KeyError,) if sys.version_info[0] == 2 else ())
+
+
+class _ParseCache(object):  # pylint: disable=bad-option-value,too-few-public-methods,useless-object-inheritance
+    """ A private class which stores the parsed contents of test files,
+        so that unchanged files need not be parsed again.
+
+        Entries are keyed on a hash of a file's contents, the SciATH version,
+        and the Python version, so are invalidated whenever any of these
+        change. Values of environment variables are substituted only when
+        Tests are created, after reading this cache, so do not affect it.
+
+        Entries are pickled, one per file, and removed when older (since last
+        used) than ``max_age`` seconds. As unpickling can run arbitrary code,
+        the cache directory should only be writable by its owner. A missing,
+        unreadable, or corrupt entry only means that the file is parsed as
+        usual, as does any problem writing the cache.
+
+        The cached data is the parsed file, before its entries are checked,
+        as entries are only fully checked when their Tests are created.
+    """
+
+    _version = '1'  # Change to invalidate existing entries
+
+    def __init__(self, directory=None, max_age=30 * 24 * 60 * 60):
+        if directory is None:
+            directory = _default_cache_directory('parsed')
+        self.directory = os.path.abspath(directory)
+        self.max_age = max_age
+        self._evicted = False
+
+    def parse_yaml_subset_from_file(self, filename):
+        """ Returns what :func:`yaml_parse.parse_yaml_subset_from_file`
+            returns for a file, from the cache if possible
+        """
+        with open(filename, 'r') as input_file:
+            text = input_file.read()
+        entry = os.path.join(self.directory, self._key(text) + '.pickle')
+        try:
+            with open(entry, 'rb') as entry_file:
+                data = pickle.load(entry_file)
+            os.utime(entry, None)  # Mark as recently used
+            return data
+        except _ENTRY_ERRORS:
+            pass
+        data = yaml_parse.parse_yaml_subset(text, filename)
+        self._store(entry, data)
+        return data
+
+    def _key(self, text):
+        digest = hashlib.sha256()
+        for item in (self._version, sciath.__version__, sys.version_info[:2]):
+            digest.update(repr(item).encode('utf-8'))
+            digest.update(b'\0')
+        digest.update(text if isinstance(text, bytes) else text.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _store(self, entry, data):
+        """ Write an entry, under a temporary name and then renamed,
+            so that other processes never see a partial entry
+        """
+        temporary = '%s.%d.tmp' % (entry, os.getpid())
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            self._evict()
+            with open(temporary, 'wb') as entry_file:
+                pickle.dump(data, entry_file, pickle.HIGHEST_PROTOCOL)
+            os.rename(temporary, entry)
+        except (OSError, IOError, pickle.PicklingError):
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+
+    def _evict(self):
+        """ Remove old entries, once for each instance """
+        if self._evicted:
+            return
+        self._evicted = True
+        now = time.time()
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if now - os.stat(path).st_mtime > self.max_age:
+                    os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,117 @@
+""" Internal logic to run processes, each in its own process group, so that
+    it can be stopped along with any processes it starts, and to report their
+    exit codes as a shell would
+"""
+
+import atexit
+import errno
+import fcntl
+import os
+import signal
+import sys
+import threading
+import time
+
+CANCEL_GRACE_PERIOD = 2.0  # seconds between SIGTERM and SIGKILL
+
+
+def _time_limit(wall_time, deadline):
+    """ Returns the time limit, in seconds, for a process, or None
+
+        The limit is the smaller of a wall time (in minutes) and the time
+        remaining before a deadline (from time.time()), either of which may
+        be None. Also returns whether the deadline is the limiting factor.
+    """
+    limit = None
+    ends_job = False
+    if wall_time is not None:
+        limit = 60.0 * wall_time
+    if deadline is not None:
+        remaining = max(deadline - time.time(), 0.0)
+        if limit is None or remaining <= limit:
+            limit = remaining
+            ends_job = True
+    return limit, ends_job
+
+
+def _new_process_group_kwargs():
+    """ Returns keyword arguments for subprocess.Popen to start a new session
+
+        This makes the new process the leader of a new process group.
+    """
+    if sys.version_info[0] >= 3:
+        return {'start_new_session': True}
+    return {'preexec_fn': os.setsid}
+
+
+# Timers to kill process groups after a grace period. Any still waiting
+#  on exit kill their groups at once, as Python 2 reports errors from
+#  daemon threads still running as the interpreter shuts down.
+_KILL_TIMERS = {}
+_KILL_TIMERS_LOCK = threading.Lock()
+
+
+def _terminate_process_group(process, grace_period):
+    """ Send SIGTERM to a process's group, then SIGKILL after a grace period """
+    _signal_process_group(process, signal.SIGTERM)
+    timer = threading.Timer(grace_period, _kill_process_group, args=(process,))
+    timer.daemon = True
+    with _KILL_TIMERS_LOCK:
+        _KILL_TIMERS[process] = timer
+    timer.start()
+
+
+def _kill_process_group(process):
+    with _KILL_TIMERS_LOCK:
+        _KILL_TIMERS.pop(process, None)
+    _signal_process_group(process, signal.SIGKILL)
+
+
+@atexit.register
+def _kill_pending_process_groups():
+    with _KILL_TIMERS_LOCK:
+        pending = list(_KILL_TIMERS.items())
+    for process, timer in pending:
+        timer.cancel()
+        timer.join()
+        _kill_process_group(process)
+
+
+def _signal_process_group(process, signal_number):
+    """ Send a signal to the process group led by a process, if it exists """
+    try:
+        os.killpg(process.pid, signal_number)
+    except OSError:
+        pass
+
+
+def _exit_code_from_os_error(error, command, stderr_file):
+    """ Report a command which cannot be executed, as a shell would
+
+        Writes a message to stderr and returns the exit code a shell reports.
+    """
+    stderr_file.write('%s: %s\n' % (command[0], error.strerror))
+    stderr_file.flush()
+    return 127 if error.errno == errno.ENOENT else 126
+
+
+def _exit_code_from_returncode(returncode):
+    """ Convert a subprocess return code to the exit status a shell reports
+
+        A process terminated by signal N has a negative return code, which
+        a shell reports as 128+N.
+    """
+    if returncode < 0:
+        return 128 - returncode
+    return returncode
+
+
+# mpiexec has been observed to set non-blocking I/O, which
+#  has been observed to cause problems on OS X with errors like
+#  "BlockingIOError: [Errno 35] write could not complete without blocking"
+# We use this function to (re)set blocking I/O when launching
+def _set_blocking_io_stdout():
+    descriptor = sys.stdout
+    flags = fcntl.fcntl(descriptor, fcntl.F_GETFL)
+    if flags & os.O_NONBLOCK:
+        fcntl.fcntl(descriptor, fcntl.F_SETFL, flags & ~os.O_NONBLOCK)
@@ -0,0 +1,67 @@
+""" Run a command under a profiler, writing a profile named for its MPI rank
+
+    Usage: python _profile.py PREFIX PROFILER COMMAND [ARGUMENT ...]
+
+    PROFILER is a single string, giving a command to prefix COMMAND with,
+    in which ``<output>`` is replaced by PREFIX, followed by ``.rank`` and
+    the MPI rank of the process, if run by an MPI launcher.
+
+    This is used in launch scripts, in place of ``$SCIATH_TASK_PROFILER``,
+    so that each MPI rank writes its own profile. It is run by path, so uses
+    only the standard library.
+"""
+from __future__ import print_function
+
+import errno
+import os
+import shlex
+import sys
+
+# Commands for named profilers
+PROFILERS = {
+    'perf-stat':
+        'perf stat -o <output>.perf-stat.txt --',
+    'perf-record':
+        'perf record -o <output>.perf.data --',
+    'valgrind-massif':
+        'valgrind --tool=massif --massif-out-file=<output>.massif',
+}
+
+# Environment variables giving the MPI rank, for various MPI implementations
+_RANK_VARIABLES = ('OMPI_COMM_WORLD_RANK', 'PMI_RANK', 'PMIX_RANK',
+                   'MV2_COMM_WORLD_RANK', 'SLURM_PROCID')
+
+
+def output_prefix(prefix, environ=None):
+    """ Returns a prefix for profile files, unique to the current MPI rank """
+    if environ is None:
+        environ = os.environ
+    for variable in _RANK_VARIABLES:
+        if environ.get(variable):
+            return '%s.rank%s' % (prefix, environ[variable])
+    return prefix
+
+
+def main(argv):
+    """ Run a command under a profiler, returning an exit code on failure """
+    if len(argv) < 3:
+        print(
+            'Usage: python _profile.py PREFIX PROFILER COMMAND '
+            '[ARGUMENT ...]',
+            file=sys.stderr)
+        return 2
+    prefix = output_prefix(argv[0])
+    command = [
+        argument.replace('<output>', prefix)
+        for argument in shlex.split(argv[1])
+    ] + argv[2:]
+    try:
+        os.execvp(command[0], command)
+    except OSError as error:
+        print('%s: %s' % (command[0], error.strerror), file=sys.stderr)
+        return 127 if error.errno == errno.ENOENT else 126
+    return 0  # not reached
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
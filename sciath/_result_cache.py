@@ -0,0 +1,192 @@
+""" Internal logic to cache the output of passing test runs """
+
+import hashlib
+import os
+import shutil
+import threading
+import time
+
+from sciath._sciath_io import _default_cache_directory
+
+
+def _directory_size(path):
+    """ Returns the total size in bytes of the files in a directory tree """
+    size = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                size += os.lstat(os.path.join(dirpath, filename)).st_size
+            except OSError:
+                pass
+    return size
+
+
+class _ResultCache(object):  # pylint: disable=bad-option-value,useless-object-inheritance
+    """ A private class which stores the output of passing test runs,
+        so that unchanged tests need not be run again.
+
+        Entries are keyed on a hash of everything which determines a Job's
+        output: each Task's command and resources, the contents of the
+        executable it runs and of any existing files named by its arguments
+        (absolute, such as those given with ``HERE``, or relative to the
+        path the Job is run from), and the Launcher's configuration,
+        including whether metrics are collected and any profiler.
+        Other inputs are not tracked: files which the executable opens
+        without being named on its command line, and environment variables.
+        Changes to these do not invalidate an entry.
+        Only the output of a Job is cached, not its verdict, so a restored
+        test run is verified as usual, against the current expected output.
+
+        Each entry is a copy of a test run's output directory, including its
+        sandbox. Entries are evicted when older (since last used) than
+        ``max_age`` seconds, and then least-recently used first, while the
+        cache is larger than ``max_bytes``.
+    """
+
+    _version = '1'  # Change to invalidate existing entries
+
+    def __init__(self,
+                 directory=None,
+                 max_bytes=1024 * 1024 * 1024,
+                 max_age=30 * 24 * 60 * 60):
+        if directory is None:
+            directory = _default_cache_directory()
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._file_hashes = {}
+        self._lock = threading.Lock()
+
+    def key(self, job, exec_path, launcher):
+        """ Returns a key identifying the output of a Job run by a Launcher """
+        digest = hashlib.sha256()
+
+        def _update(item):
+            digest.update(repr(item).encode('utf-8'))
+            digest.update(b'\0')
+
+        _update(self._version)
+        _update(launcher.job_submission_command)
+        for item in (launcher.blocking, launcher.has_job_level_ranks,
+                     launcher.mpi_launch, launcher.direct_launch,
+                     launcher.queue_name, launcher.account_name,
+                     launcher.collect_metrics, launcher.profiler,
+                     launcher.python_command):
+            _update(item)
+        if not launcher.direct_launch:
+            _update(self._hash_file(launcher._template_path()))  #pylint: disable=protected-access
+        _update(job.name)
+        _update(job.wall_time)
+        for task in job.tasks:
+            _update(task.command)
+            _update(sorted(task.resources.items()))
+            _update(task.wall_time)
+            executable = self._find_executable(task.command[0], exec_path)
+            _update(self._hash_file(executable) if executable else None)
+            for argument in task.command[1:]:
+                # Also consider values in arguments like --option=path
+                paths = [argument]
+                if '=' in argument:
+                    paths.append(argument.split('=', 1)[1])
+                for path in paths:
+                    # Relative paths are interpreted as from the Task's
+                    #  working directory, as the Task itself would
+                    resolved = os.path.normpath(os.path.join(exec_path, path))
+                    if path and os.path.isfile(resolved):
+                        _update((path, self._hash_file(resolved)))
+        return digest.hexdigest()
+
+    def restore(self, key, output_path):
+        """ Copy cached output into an output path, returning success """
+        entry = os.path.join(self.directory, key)
+        if not os.path.isdir(entry):
+            return False
+        try:
+            os.utime(entry, None)  # Mark as recently used
+        except OSError:
+            pass
+        if not os.path.exists(output_path):
+            os.makedirs(output_path)
+        for name in os.listdir(entry):
+            source = os.path.join(entry, name)
+            destination = os.path.join(output_path, name)
+            if os.path.isdir(source):
+                shutil.copytree(source, destination, symlinks=True)
+            else:
+                shutil.copy2(source, destination)
+        return True
+
+    def store(self, key, output_path):
+        """ Copy output into the cache
+
+            The entry is copied under a temporary name and then renamed,
+            so that other processes never see a partial entry.
+        """
+        entry = os.path.join(self.directory, key)
+        if os.path.isdir(entry):
+            return
+        with self._lock:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            temporary = '%s.%d.tmp' % (entry, os.getpid())
+            shutil.rmtree(temporary, ignore_errors=True)
+            shutil.copytree(output_path, temporary, symlinks=True)
+            try:
+                os.rename(temporary, entry)
+            except OSError:  # Another process stored the same entry
+                shutil.rmtree(temporary, ignore_errors=True)
+
+    def evict(self):
+        """ Remove old entries, and then the least-recently used
+            entries while the cache is too large
+        """
+        if not os.path.isdir(self.directory):
+            return
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                last_used = os.stat(path).st_mtime
+            except OSError:
+                continue
+            if now - last_used > self.max_age:
+                shutil.rmtree(path, ignore_errors=True)
+            elif not name.endswith('.tmp'):
+                entries.append((last_used, path, _directory_size(path)))
+        total = sum(size for _, _, size in entries)
+        for _, path, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def _hash_file(self, path):
+        """ Returns a hash of a file's contents, reusing a previous hash of an
+            unmodified file
+        """
+        try:
+            status = os.stat(path)
+        except OSError:
+            return None
+        signature = (path, status.st_mtime, status.st_size)
+        if signature not in self._file_hashes:
+            digest = hashlib.sha256()
+            with open(path, 'rb') as file:
+                for block in iter(lambda: file.read(1024 * 1024), b''):
+                    digest.update(block)
+            self._file_hashes[signature] = digest.hexdigest()
+        return self._file_hashes[signature]
+
+    @staticmethod
+    def _find_executable(name, exec_path):
+        """ Returns the path to an executable, as a shell would find it, or None
+        """
+        if os.sep in name:
+            path = os.path.join(exec_path, name)
+            return path if os.path.isfile(path) else None
+        for directory in os.environ.get('PATH', os.defpath).split(os.pathsep):
+            path = os.path.join(directory, name)
+            if os.path.isfile(path) and os.access(path, os.X_OK):
+                return path
+        return None
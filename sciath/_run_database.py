@@ -0,0 +1,112 @@
+""" Internal logic to keep a record of the results of each run """
+
+import json
+import os
+
+from sciath._statistics import median
+from sciath._test_run import _TestRunStatus
+
+
+class _RunDatabase(object):  # pylint: disable=bad-option-value,useless-object-inheritance
+    """ A private class which stores a history of runs, in a JSON-lines file
+
+        Each line records one run of the Harness, as a dict with keys
+
+        * ``date``: when the run finished, in ISO 8601 format
+        * ``input_files``: absolute paths of the files tests were read from
+        * ``launcher``: the Launcher's configuration
+        * ``parallel``: the number of cores used to run jobs
+        * ``tests``: a list of dicts, one for each active test, with keys
+          ``name``, ``status``, ``elapsed`` (wall-clock time in seconds
+          for the test's job, or None if not recorded, or for a batch job
+          which did not complete within its requested wall time, that
+          wall time), ``cached``, and
+          ``benchmark_times`` (the time for each timed run, if benchmarked)
+
+        Only the last ``max_records`` records are kept, so the file does not
+        grow without bound. Records are appended, so an interrupted write can
+        at worst leave a partial last line, which is ignored. When older
+        records are removed, the file is rewritten under a temporary name
+        and then renamed.
+    """
+
+    def __init__(self, filename, max_records=20):
+        self.filename = filename
+        self.max_records = max_records
+
+    def append(self, record):
+        """ Add a record to the end of the file, removing the oldest
+            records if there are more than ``max_records``
+        """
+        with open(self.filename, 'a') as database_file:
+            database_file.write(json.dumps(record, sort_keys=True) + '\n')
+        self._truncate()
+
+    def _truncate(self):
+        with open(self.filename, 'r') as database_file:
+            lines = database_file.readlines()
+        if len(lines) <= self.max_records:
+            return
+        temporary = '%s.%d.tmp' % (self.filename, os.getpid())
+        with open(temporary, 'w') as database_file:
+            database_file.writelines(lines[-self.max_records:])
+        os.rename(temporary, self.filename)
+
+    def records(self):
+        """ Yield each record, oldest first """
+        if not os.path.isfile(self.filename):
+            return
+        with open(self.filename, 'r') as database_file:
+            for line in database_file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict):
+                    yield record
+
+    def latest_results(self):
+        """ Returns a dict from test names to the most recent result for each
+
+            Each result is a dict as in the ``tests`` list of a record.
+        """
+        results = {}
+        for record in self.records():
+            for result in record.get('tests', []):
+                results[result['name']] = result
+        return results
+
+    def runtime_estimates(self, samples=5, timeout_scale=2.0):
+        """ Returns a dict from test names to estimated job times in seconds
+
+            The estimate is the median of the most recent recorded times,
+            from up to ``samples`` runs. Tests with no recorded times
+            are omitted.
+
+            A time recorded for a test which timed out is only a lower bound,
+            so if a test's most recent recorded time is from a timeout, the
+            estimate is at least that time multiplied by ``timeout_scale``.
+        """
+        times = {}
+        timed_out = {}
+        for record in self.records():
+            for result in record.get('tests', []):
+                elapsed = result.get('elapsed')
+                if elapsed is not None:
+                    times.setdefault(result['name'], []).append(elapsed)
+                    timed_out[result['name']] = (
+                        result.get('status') == _TestRunStatus.TIMEOUT)
+        estimates = {}
+        for name, elapsed in times.items():
+            estimates[name] = median(elapsed[-samples:])
+            if timed_out[name]:
+                estimates[name] = max(estimates[name],
+                                      timeout_scale * elapsed[-1])
+        return estimates
+
+    def latest_input_files(self):
+        """ Returns the input files for the most recent run, or None """
+        input_files = None
+        for record in self.records():
+            input_files = record.get('input_files')
+        return input_files
@@ -0,0 +1,166 @@
+""" Internal logic to run a number of jobs concurrently """
+
+import heapq
+import threading
+
+
+class _Scheduler(object):  # pylint: disable=bad-option-value,too-few-public-methods,useless-object-inheritance
+    """ A private class which runs work for a set of items concurrently,
+        treating the machine as a pool of "slots" (typically, cores).
+
+        Each item requires some number of slots, and is only started when
+        that many slots are free. Items are considered in order of decreasing
+        priority (typically, expected duration, so that the longest items
+        do not start last and determine the finishing time), and then
+        largest-first, so that large items are not left waiting behind a long
+        tail of small ones. Any item which fits is started while an earlier one
+        waits for slots to be freed ("backfilling"). An item requiring more
+        slots than exist is run on its own.
+
+        Each item is first "started" from the calling thread, which
+        returns a callable to do the (blocking) work for that item, or None if
+        there is no work to do. Starting from a single thread means that any
+        output produced when starting an item is grouped and appears in a
+        deterministic order.
+
+        With a single slot, items are processed in order, and all work is
+        done in the calling thread.
+
+        Calling stop(), from any thread, prevents any further items from
+        being started.
+    """
+
+    def __init__(self, slots=1):
+        if slots < 1:
+            raise ValueError('[SciATH] at least one slot is required')
+        self.slots = slots
+        self._condition = threading.Condition()
+        self._slots_free = slots
+        self._exception = None
+        self._stopped = False
+
+    def stop(self):
+        """ Start no further items """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+
+    def run(self, items, start, slots_required=None, priority=None):
+        """ Start each item and run its work, returning when all work is done
+
+            ``slots_required`` is a function returning the number of slots
+            required by an item. By default, each item requires one slot.
+
+            ``priority`` is a function returning a number for an item, with
+            higher-priority items considered first. By default, all items
+            have the same priority.
+
+            Exceptions raised by work done in other threads are re-raised here.
+        """
+        if self.slots == 1:
+            for item in items:
+                if self._stopped:
+                    break
+                work = start(item)
+                if work is not None:
+                    work()
+            return
+
+        # Pending (slots, item) pairs, in order (sorted() is stable)
+        pending = []
+        for item in items:
+            pending.append(
+                (self.clamp(slots_required(item) if slots_required else 1),
+                 item))
+
+        def _order(entry):
+            return (-priority(entry[1]) if priority else 0, -entry[0])
+
+        pending = sorted(pending, key=_order)
+
+        threads = []
+        while pending:
+            with self._condition:
+                index = None
+                while (index is None and self._exception is None and
+                       not self._stopped):
+                    index = self._first_fit(pending)
+                    if index is None:
+                        self._condition.wait()
+                if self._exception is not None or self._stopped:
+                    break
+                slots, item = pending.pop(index)
+                self._slots_free -= slots
+            work = start(item)
+            if work is None:
+                self._release(slots)
+                continue
+            thread = threading.Thread(target=self._do_work, args=(work, slots))
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+
+        for thread in threads:
+            thread.join()
+
+        if self._exception is not None:
+            exception = self._exception
+            self._exception = None
+            raise exception
+
+    def clamp(self, slots):
+        """ Returns the number of slots an item requiring ``slots`` will use """
+        return min(max(slots, 1), self.slots)
+
+    def predict_makespan(self, items, slots_required, duration):
+        """ Returns the time to run all items, given their durations
+
+            This simulates the order in which run() would start items, if
+            each took the time given by the ``duration`` function,
+            with ``duration`` also used as the priority.
+        """
+        if self.slots == 1:
+            return sum(duration(item) for item in items)
+        pending = [
+            (self.clamp(slots_required(item)), duration(item)) for item in items
+        ]
+        pending.sort(key=lambda entry: (-entry[1], -entry[0]))
+        now = 0.0
+        slots_free = self.slots
+        running = []  # a heap of (end time, slots) pairs
+        while pending:
+            index = 0
+            while index < len(pending):
+                slots, item_duration = pending[index]
+                if slots <= slots_free:
+                    del pending[index]
+                    slots_free -= slots
+                    heapq.heappush(running, (now + item_duration, slots))
+                else:
+                    index += 1
+            if pending:
+                now, slots = heapq.heappop(running)
+                slots_free += slots
+        return max([end for end, _ in running] + [now])
+
+    def _first_fit(self, pending):
+        """ Returns the index of the first pending item which fits, or None """
+        for index, (slots, _) in enumerate(pending):
+            if slots <= self._slots_free:
+                return index
+        return None
+
+    def _release(self, slots):
+        with self._condition:
+            self._slots_free += slots
+            self._condition.notify()
+
+    def _do_work(self, work, slots):
+        try:
+            work()
+        except Exception as exception:  # pylint: disable=broad-except
+            with self._condition:
+                if self._exception is None:
+                    self._exception = exception
+        finally:
+            self._release(slots)
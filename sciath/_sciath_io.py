@@ -22,14 +22,22 @@ def _remove_file_if_it_exists(filename):
         pass
 
 
+def _quote(term):
+    """ Returns a term single-quoted for a shell, if it contains spaces or
+        single quotes
+    """
+    if ' ' in term or "'" in term:
+        return "'" + term.replace("'", "'\"'\"'") + "'"
+    return term
+
+
 def command_join(command):
     """ Converts a command (as for subprocess.run()) to a copy-pasteable string
 
     Do something similar to shlex.join (Python 3.8+), attempting to quote arguments
-    that contain spaces, and escape newlines in the result. """
+    that contain spaces or single quotes, and escape newlines in the result. """
 
-    joined = ' '.join(
-        ["'" + term + "'" if ' ' in term else term for term in command])
+    joined = ' '.join([_quote(term) for term in command])
     joined = joined.replace('\n', '\\n')
     return joined
 
@@ -120,3 +128,14 @@ def print_subheader(string, **kwargs):
 def print_warning(string, **kwargs):
     """ Prints a string as a SciATH warning """
     print(format_warning(string), **kwargs)
+
+
+def _default_cache_directory(name='results'):
+    """ Returns the default directory for a cache, by default of results
+
+        This follows the XDG Base Directory specification.
+    """
+    cache_home = os.environ.get('XDG_CACHE_HOME')
+    if not cache_home:
+        cache_home = os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'sciath', name)
@@ -0,0 +1,214 @@
+""" Internal logic to register test runs and select them by name or group """
+
+import bisect
+import fnmatch
+import re
+
+_GLOB_CHARACTERS = '*?['
+_REGEX_PREFIX = 're:'
+_OPERATORS = ('and', 'or', 'not')
+
+
+class SciATHSelectionException(Exception):
+    """ Exception for a malformed test name pattern or group expression """
+
+
+class _TestRegistry(object):  # pylint: disable=bad-option-value,useless-object-inheritance
+    """ A private class holding test runs, in the order they were added,
+        indexed by name and by group
+
+        Selections are sets of positions in :attr:`testruns`. Names and
+        groups are looked up in dicts, so selecting a few tests takes time
+        independent of how many are registered.
+
+        A name pattern is one of
+
+        * a test name
+        * a glob, as understood by :mod:`fnmatch`, if it contains any of
+          ``*?[``. Only names sharing the glob's literal prefix are matched
+          against it.
+        * a regular expression, prefixed with ``re:``, which must match
+          the whole name
+
+        A test run for a variant of a test also matches patterns which match
+        the test's name without the variant's label.
+
+        A group expression combines group names with ``and``, ``or``, ``not``,
+        and parentheses, e.g. ``mpi and not (slow or gpu)``.
+    """
+
+    def __init__(self):
+        self.testruns = []
+        self._by_name = {}  # name -> position
+        self._by_base_name = {}  # variant's test name -> positions
+        self._sorted_names = None  # names and variants' names, when needed
+        self._by_group = None  # group -> set of positions, built when needed
+
+    def add(self, testrun):
+        """ Add a test run, whose Test's name must not already be registered """
+        name = testrun.name
+        if name in self._by_name:
+            raise Exception("Duplicate test name %s" % name)
+        self._by_name[name] = len(self.testruns)
+        if testrun.variant:
+            self._by_base_name.setdefault(testrun.variant[0],
+                                          []).append(len(self.testruns))
+        self.testruns.append(testrun)
+        self._sorted_names = None
+        self._by_group = None
+
+    def __contains__(self, name):
+        return name in self._by_name
+
+    def select_names(self, patterns):
+        """ Returns the set of positions of test runs matching any pattern """
+        selected = set()
+        for pattern in patterns:
+            selected.update(self._match_name(pattern))
+        return selected
+
+    def select_groups(self, expressions):
+        """ Returns the set of positions of test runs matching any group
+            expression
+        """
+        if self._by_group is None:
+            self._by_group = {}
+            for position, testrun in enumerate(self.testruns):
+                for group in testrun.groups:
+                    self._by_group.setdefault(group, set()).add(position)
+        selected = set()
+        for expression in expressions:
+            selected.update(_GroupExpression(expression).evaluate(self))
+        return selected
+
+    def group(self, group):
+        """ Returns the set of positions of test runs in a group """
+        return self._by_group.get(group, set())
+
+    def all(self):
+        """ Returns the set of positions of all test runs """
+        return set(range(len(self.testruns)))
+
+    def _match_name(self, pattern):
+        if pattern in self._by_name:
+            return [self._by_name[pattern]]
+        if pattern in self._by_base_name:
+            return self._by_base_name[pattern]
+        if pattern.startswith(_REGEX_PREFIX):
+            try:
+                regex = re.compile('(?:%s)\\Z' % pattern[len(_REGEX_PREFIX):])
+            except re.error as error:
+                #pylint: disable=bad-option-value,raise-missing-from
+                raise SciATHSelectionException(
+                    'Invalid regular expression %s: %s' % (pattern, error))
+            return self._match_sorted_names('', regex.match)
+        if any(character in pattern for character in _GLOB_CHARACTERS):
+            prefix = re.split('[%s]' % re.escape(_GLOB_CHARACTERS), pattern)[0]
+            regex = re.compile(fnmatch.translate(pattern))
+            return self._match_sorted_names(prefix, regex.match)
+        return []
+
+    def _match_sorted_names(self, prefix, match):
+        """ Returns the positions of test runs with names (or variants' test
+            names) starting with a prefix, and matched by a function
+        """
+        if self._sorted_names is None:
+            self._sorted_names = sorted(
+                set(self._by_name).union(self._by_base_name))
+        positions = []
+        index = bisect.bisect_left(self._sorted_names, prefix)
+        while index < len(self._sorted_names):
+            name = self._sorted_names[index]
+            if not name.startswith(prefix):
+                break
+            if match(name):
+                if name in self._by_name:
+                    positions.append(self._by_name[name])
+                positions.extend(self._by_base_name.get(name, []))
+            index += 1
+        return positions
+
+
+class _GroupExpression(object):  # pylint: disable=bad-option-value,too-few-public-methods,useless-object-inheritance
+    """ A private class to parse and evaluate a boolean expression of groups
+
+        ``not`` binds most tightly, then ``and``, then ``or``.
+        Terms are evaluated as sets of positions, and a negated term within
+        a conjunction is subtracted, rather than complemented, so that
+        e.g. ``mpi and not slow`` takes time independent of the number of
+        tests not in ``mpi``.
+    """
+
+    def __init__(self, expression):
+        self.expression = expression
+        self._tokens = re.findall(r'\(|\)|[^\s()]+', expression)
+        self._index = 0
+        if not self._tokens:
+            self._error('empty expression')
+
+    def evaluate(self, registry):
+        """ Returns the set of positions of test runs matching the expression
+        """
+        self._index = 0
+        result = self._disjunction(registry)
+        if self._index < len(self._tokens):
+            self._error('unexpected %s' % self._tokens[self._index])
+        return result
+
+    def _peek(self):
+        if self._index < len(self._tokens):
+            return self._tokens[self._index]
+        return None
+
+    def _next(self):
+        token = self._peek()
+        if token is None:
+            self._error('unexpected end')
+        self._index += 1
+        return token
+
+    def _disjunction(self, registry):
+        result = self._conjunction(registry)
+        while self._peek() == 'or':
+            self._next()
+            result.update(self._conjunction(registry))
+        return result
+
+    def _conjunction(self, registry):
+        included = []
+        excluded = []
+        while True:
+            negated = False
+            while self._peek() == 'not':
+                self._next()
+                negated = not negated
+            term = self._term(registry)
+            (excluded if negated else included).append(term)
+            if self._peek() != 'and':
+                break
+            self._next()
+        if included:
+            included.sort(key=len)
+            result = set(included[0])
+            for term in included[1:]:
+                result.intersection_update(term)
+        else:
+            result = registry.all()
+        for term in excluded:
+            result.difference_update(term)
+        return result
+
+    def _term(self, registry):
+        token = self._next()
+        if token == '(':
+            result = self._disjunction(registry)
+            if self._next() != ')':
+                self._error('expected )')
+            return result
+        if token == ')' or token in _OPERATORS:
+            self._error('unexpected %s' % token)
+        return registry.group(token)
+
+    def _error(self, message):
+        raise SciATHSelectionException('Invalid group expression "%s": %s' %
+                                       (self.expression, message))
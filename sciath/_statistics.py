@@ -0,0 +1,75 @@
+""" Internal functions to summarize samples, such as run times """
+
+import math
+
+
+def quantile(values, fraction):
+    """ Returns a quantile of a non-empty sequence of values
+
+        This interpolates linearly between the closest ranks, so that
+        ``quantile(values, 0.5)`` is the median.
+    """
+    ordered = sorted(values)
+    position = fraction * (len(ordered) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (position - lower) * (ordered[upper] -
+                                                  ordered[lower])
+
+
+def median(values):
+    """ Returns the median of a non-empty sequence of values """
+    return quantile(values, 0.5)
+
+
+def interquartile_range(values):
+    """ Returns the difference between the upper and lower quartiles """
+    return quantile(values, 0.75) - quantile(values, 0.25)
+
+
+def mann_whitney_p(sample_a, sample_b):
+    """ Returns a two-sided p-value from the Mann-Whitney U test
+
+        This tests whether values in one sample tend to be larger than in the
+        other, without assuming that they are normally distributed. For small
+        samples, the exact distribution of U is used (ignoring ties). Otherwise,
+        its normal approximation is used.
+    """
+    size_a, size_b = len(sample_a), len(sample_b)
+    statistic = 0.0
+    for value_a in sample_a:
+        for value_b in sample_b:
+            if value_a > value_b:
+                statistic += 1.0
+            elif value_a == value_b:
+                statistic += 0.5
+    if size_a <= 20 and size_b <= 20:
+        counts = _u_counts(size_a, size_b)
+        lower = sum(counts[:int(math.floor(statistic)) + 1])
+        upper = sum(counts[int(math.ceil(statistic)):])
+        return min(1.0, 2.0 * min(lower, upper) / sum(counts))
+    mean = 0.5 * size_a * size_b
+    deviation = math.sqrt(size_a * size_b * (size_a + size_b + 1) / 12.0)
+    score = max(abs(statistic - mean) - 0.5, 0.0) / deviation
+    return math.erfc(score / math.sqrt(2.0))
+
+
+def _u_counts(size_a, size_b):
+    """ Returns, for each value of U, the number of orderings of two samples
+        of the given sizes for which the Mann-Whitney statistic takes it
+    """
+    # counts[m][n] is the list of counts for samples of sizes m and n
+    counts = [[None] * (size_b + 1) for _ in range(size_a + 1)]
+    for size_m in range(size_a + 1):
+        for size_n in range(size_b + 1):
+            if size_m == 0 or size_n == 0:
+                counts[size_m][size_n] = [1]
+                continue
+            # The largest value is from the first sample, adding n to U,
+            # or from the second
+            first = [0] * size_n + counts[size_m - 1][size_n]
+            second = counts[size_m][size_n - 1]
+            counts[size_m][size_n] = [(first[u] if u < len(first) else 0) +
+                                      (second[u] if u < len(second) else 0)
+                                      for u in range(size_m * size_n + 1)]
+    return counts[size_a][size_b]
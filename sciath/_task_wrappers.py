@@ -0,0 +1,62 @@
+""" Internal logic to form commands which wrap each Task's command
+
+    Launch scripts prefix a Task's command with these, in place of
+    ``$SCIATH_TASK_MEASURE`` and ``$SCIATH_TASK_PROFILER``, to enforce its
+    wall time, to record its resource usage, and to run it under a profiler.
+
+    The wrappers, :mod:`sciath._timeout`, :mod:`sciath._measure`, and
+    :mod:`sciath._profile`, use only
+    the standard library, and are run as scripts, by path, so that SciATH
+    need not be importable where jobs run, for example on the compute nodes
+    of a batch system. They are run with a Python interpreter given by the
+    Launcher, which should be available there.
+"""
+
+import os
+import shlex
+import sys
+
+# Python interpreter for wrappers in batch jobs, if not configured
+DEFAULT_BATCH_PYTHON = 'python3'
+
+_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+def wrapper_python(python_command, local):
+    """ Returns the command, as a list, to run the wrappers with
+
+        This is the configured command, if any, or else the current
+        interpreter, for jobs run on this machine, or
+        ``DEFAULT_BATCH_PYTHON``, for jobs run elsewhere.
+    """
+    if python_command:
+        return shlex.split(python_command)
+    if local:
+        return [sys.executable]
+    return [DEFAULT_BATCH_PYTHON]
+
+
+def timeout_command(python, wall_time, sentinel_filename):
+    """ Returns a command prefix which kills a Task after its wall time (in
+        minutes), creating a sentinel file
+    """
+    return python + [
+        _script('_timeout.py'),
+        repr(60.0 * wall_time), sentinel_filename
+    ]
+
+
+def measure_command(python, metrics_filename):
+    """ Returns a command prefix which records a Task's resource usage """
+    return python + [_script('_measure.py'), metrics_filename]
+
+
+def profile_command(python, profiler, prefix):
+    """ Returns a command prefix which runs a Task under a profiler, writing
+        profiles for each rank, named starting with a prefix
+    """
+    return python + [_script('_profile.py'), prefix, profiler]
+
+
+def _script(name):
+    return os.path.join(_DIRECTORY, name)
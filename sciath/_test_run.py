@@ -11,23 +11,63 @@ class _TestRunStatus:  #pylint: disable=too-few-public-methods
     SKIPPED = 'skipped'  # Test skipped: Launcher reports of lack of resources
     PASS = 'pass'  # Verifier confirms pass
     FAIL = 'fail'  # Verifier confirms fail
+    TIMEOUT = 'timeout'  # Launcher killed the job for exceeding a wall time
 
 
-class _TestRun:  #pylint: disable=too-few-public-methods, too-many-instance-attributes
+class _TestRun(object):  #pylint: disable=bad-option-value,useless-object-inheritance,too-many-instance-attributes
     """ A private class which adds state about a specific "run" of a Test.
 
         It contains a Test object, which should be thought of as the stateless
         information about a test case, provided by a user. In addition, it
         contains information managed by the Harness, such as a location to run
         from, information collected from the Launcher (to use for output), etc.
+
+        It may instead be created from a record with only the Test's name
+        and groups, and a ``create_test()`` method, such as an entry from
+        a test file, so that the Test (and its Job and Verifier) need not be
+        created unless the test run is selected. The Test is created when
+        :attr:`test` is first accessed.
         """
 
+    __slots__ = ('active', '_test', '_entry', 'output_path', 'exec_path',
+                 'sandbox', 'status', 'status_info', 'report', 'submitted_job',
+                 'cache_key', 'cached', 'elapsed', 'benchmark_times', 'variant')
+
     def __init__(self, test):
         self.active = True
-        self.test = test
+        if hasattr(test, 'create_test'):
+            self._test = None
+            self._entry = test
+        else:
+            self._test = test
+            self._entry = None
         self.output_path = os.path.join(os.getcwd(), test.name + '_output')
         self.exec_path = os.path.join(self.output_path, 'sandbox')
         self.sandbox = True
         self.status = _TestRunStatus.UNKNOWN
         self.status_info = ''
         self.report = []
+        self.submitted_job = None  # Launcher handle, while the job is running
+        self.cache_key = None  # Key for the result cache, once executed
+        self.cached = False  # Output restored from the result cache
+        self.elapsed = None  # Seconds taken by the job, if run locally
+        self.benchmark_times = None  # Seconds for each timed run, if benchmarked
+        self.variant = None  # (test name, label), for one variant of a test
+
+    @property
+    def test(self):
+        """ The Test, created from its record if not yet created """
+        if self._test is None:
+            self._test = self._entry.create_test()
+            self._entry = None
+        return self._test
+
+    @property
+    def name(self):
+        """ The Test's name, without creating the Test """
+        return (self._test or self._entry).name
+
+    @property
+    def groups(self):
+        """ The Test's groups, without creating the Test """
+        return (self._test or self._entry).groups
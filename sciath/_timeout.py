@@ -0,0 +1,111 @@
+""" Run a command with a time limit, as coreutils' timeout(1) does
+
+    Usage: python _timeout.py SECONDS SENTINEL_FILE COMMAND [ARGUMENT ...]
+
+    This is used in launch scripts, in place of ``$SCIATH_TASK_MEASURE``,
+    to enforce a Task's wall time, so is run by path, and uses only the
+    standard library.
+
+    The command is run in its own process group. If it runs for longer than
+    the time limit, the group is sent SIGTERM, and SIGKILL after a grace
+    period, the sentinel file is created, and the exit code is 124.
+    Otherwise, it exits with the exit code a shell would report for the
+    command. SIGTERM, SIGINT, and SIGHUP are passed on to the group, and
+    after passing on SIGTERM, the group is sent SIGKILL after a shorter grace
+    period. The group is not otherwise reached when the launch script is
+    killed, so this stops a task which ignores SIGTERM from outliving its job.
+"""
+from __future__ import print_function
+
+import errno
+import os
+import signal
+import sys
+
+TIMEOUT_EXIT_CODE = 124
+GRACE_PERIOD = 2.0  # seconds between SIGTERM and SIGKILL
+# Seconds between passing on SIGTERM and SIGKILL, less than the launcher's
+#  grace period, so that the task is killed before this script is
+FORWARDED_GRACE_PERIOD = 1.0
+
+
+def _signal_group(pid, signal_number):
+    try:
+        os.killpg(pid, signal_number)
+    except OSError:
+        pass
+
+
+def _wait(pid):
+    """ Returns the status of a child process, waiting through signals """
+    while True:
+        try:
+            return os.waitpid(pid, 0)[1]
+        except OSError as error:
+            if error.errno != errno.EINTR:
+                raise
+
+
+def _exit_code_from_status(status):
+    if os.WIFSIGNALED(status):
+        return 128 + os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def main(argv):
+    """ Run a command, returning its exit code """
+    if len(argv) < 3:
+        print(
+            'Usage: python _timeout.py SECONDS SENTINEL_FILE COMMAND '
+            '[ARGUMENT ...]',
+            file=sys.stderr)
+        return 2
+    limit, sentinel_filename, command = float(argv[0]), argv[1], argv[2:]
+    pid = os.fork()
+    if pid == 0:
+        os.setpgid(0, 0)
+        try:
+            os.execvp(command[0], command)
+        except OSError as error:
+            print('%s: %s' % (command[0], error.strerror), file=sys.stderr)
+            os._exit(127 if error.errno == errno.ENOENT else 126)  #pylint: disable=protected-access
+    try:
+        os.setpgid(pid, pid)  # as the child may not have done so yet
+    except OSError:
+        pass
+    timed_out = []
+    terminating = []  # SIGTERM sent, so SIGKILL follows when the timer expires
+
+    def _terminate(grace_period):
+        _signal_group(pid, signal.SIGTERM)
+        terminating.append(True)
+        signal.setitimer(signal.ITIMER_REAL, grace_period)
+
+    def _expire(_signal_number, _frame):
+        if terminating:
+            _signal_group(pid, signal.SIGKILL)
+            return
+        timed_out.append(True)
+        _terminate(GRACE_PERIOD)
+
+    def _forward(signal_number, _frame):
+        if signal_number != signal.SIGTERM:
+            _signal_group(pid, signal_number)
+        elif not terminating:
+            _terminate(FORWARDED_GRACE_PERIOD)
+
+    signal.signal(signal.SIGALRM, _expire)
+    for signal_number in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+        signal.signal(signal_number, _forward)
+    signal.setitimer(signal.ITIMER_REAL, max(limit, 0.001))
+    status = _wait(pid)
+    signal.setitimer(signal.ITIMER_REAL, 0)
+    if timed_out:
+        with open(sentinel_filename, 'w'):
+            pass
+        return TIMEOUT_EXIT_CODE
+    return _exit_code_from_status(status)
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,117 @@
+""" Internal logic to record a timeline of what the Harness spends time on """
+
+import contextlib
+import json
+import os
+import threading
+import time
+
+# Category for spans in which a Job runs, rather than the Harness working
+JOB_CATEGORY = 'job'
+
+
+class _Tracer(object):  # pylint: disable=bad-option-value,useless-object-inheritance
+    """ A private class which records spans of time, from any thread, and
+        writes them in the Chrome trace event format
+
+        The resulting JSON file can be loaded in ``about://tracing``
+        in Chromium-based browsers, or in https://ui.perfetto.dev .
+        Each thread appears as a row, with spans for each phase of work,
+        such as parsing an input file or verifying a test run.
+    """
+
+    def __init__(self):
+        self._events = []
+        self._thread_ids = {}
+        self._lock = threading.Lock()
+        self._start_time = time.time()
+
+    @contextlib.contextmanager
+    def span(self, name, category='harness', **args):
+        """ A context manager recording a span of time """
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.time(), category, **args)
+
+    def add(self, name, start, end, category='harness', **args):
+        """ Record a span of time, between two values of time.time() """
+        thread = threading.current_thread()
+        with self._lock:
+            if thread.ident not in self._thread_ids:
+                self._thread_ids[thread.ident] = (len(self._thread_ids),
+                                                  thread.name)
+            self._events.append({
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'ts': int(1e6 * (start - self._start_time)),
+                'dur': int(1e6 * (end - start)),
+                'pid': os.getpid(),
+                'tid': self._thread_ids[thread.ident][0],
+                'args': args,
+            })
+
+    def write(self, filename):
+        """ Write all recorded spans to a file """
+        with self._lock:
+            metadata = [{
+                'name': 'thread_name',
+                'ph': 'M',
+                'pid': os.getpid(),
+                'tid': thread_id,
+                'args': {
+                    'name': thread_name
+                },
+            } for thread_id, thread_name in sorted(self._thread_ids.values())]
+            with open(filename, 'w') as trace_file:
+                json.dump(
+                    {
+                        'traceEvents': metadata + self._events,
+                        'displayTimeUnit': 'ms',
+                    }, trace_file)
+
+    def summary(self):
+        """ Returns lines summarizing the time spent in each phase
+
+            Times are summed over all threads, so with jobs running
+            concurrently, job time can exceed the elapsed time.
+        """
+        totals = {}
+        counts = {}
+        end = 0
+        with self._lock:
+            for event in self._events:
+                key = (event['cat'] == JOB_CATEGORY, event['name']
+                       if event['cat'] != JOB_CATEGORY else 'jobs')
+                totals[key] = totals.get(key, 0) + event['dur']
+                counts[key] = counts.get(key, 0) + 1
+                end = max(end, event['ts'] + event['dur'])
+        harness_total = sum(
+            total for (is_job, _), total in totals.items() if not is_job)
+        job_total = totals.get((True, 'jobs'), 0)
+        lines = ['Elapsed: %.3f s' % (end / 1e6)]
+        lines.append('Harness: %.3f s' % (harness_total / 1e6))
+        for key in sorted(totals, key=lambda key: -totals[key]):
+            if not key[0]:
+                lines.append('  %-10s %10.3f s  %6d span(s)' %
+                             (key[1], totals[key] / 1e6, counts[key]))
+        lines.append('Jobs:    %.3f s  %6d job(s)' %
+                     (job_total / 1e6, counts.get((True, 'jobs'), 0)))
+        if harness_total + job_total > 0:
+            lines.append('Harness overhead: %.1f%% of traced time' %
+                         (100.0 * harness_total / (harness_total + job_total)))
+        return lines
+
+
+@contextlib.contextmanager
+def _no_span():
+    yield
+
+
+def trace_span(tracer, name, category='harness', **args):
+    """ Returns a context manager recording a span with a tracer, if any """
+    if tracer is None:
+        return _no_span()
+    return tracer.span(name, category, **args)
@@ -2,46 +2,35 @@
 from __future__ import print_function
 
 import os
-import sys
-import argparse
-import shutil
-import datetime
+import fnmatch
+import threading
+import time
 
 import sciath
-import sciath.launcher
 import sciath.test_file
-from sciath._sciath_io import (py23input, command_join, color_okay, color_fail,
-                               color_warning, format_header, format_info,
-                               format_subheader, print_info, print_header,
-                               print_subheader, print_warning, print_error)
-from sciath.verifier import SciATHVerifierMissingFileException
+from sciath._harness_report import format_status_line, report_lines
+from sciath._sciath_io import (command_join, print_info, print_header,
+                               print_subheader, print_warning)
 from sciath._test_run import _TestRun, _TestRunStatus
-import sciath.report_tap
+from sciath._scheduler import _Scheduler
+from sciath._selection import _TestRegistry
+from sciath._statistics import median
+from sciath._trace import JOB_CATEGORY, trace_span
 
 
 class SciATHHarnessInconsistentStateException(Exception):
     """ Exception for unexpected filesystem state """
 
 
-def _color_from_status(status, string):  #pylint: disable=too-many-return-statements
-    if status == _TestRunStatus.DEACTIVATED:
-        return string
-    if status == _TestRunStatus.PASS:
-        return color_okay(string)
-    if status == _TestRunStatus.FAIL:
-        return color_fail(string)
-    if status == _TestRunStatus.INCOMPLETE:
-        return color_warning(string)
-    if status == _TestRunStatus.NOT_LAUNCHED:
-        return color_warning(string)
-    if status == _TestRunStatus.UNKNOWN:
-        return color_warning(string)
-    if status == _TestRunStatus.SKIPPED:
-        return color_warning(string)
-    raise Exception("Unhandled status %s" % status)
-
-
-class Harness:
+def _cores_required(testrun):
+    return testrun.test.job.cores_required()
+
+
+def _requires_metrics(testrun):
+    return getattr(testrun.test.verifier, 'requires_metrics', False)
+
+
+class Harness(object):  # pylint: disable=bad-option-value,useless-object-inheritance,too-many-instance-attributes
     """ :class:`Harness` is the central user-facing class in SciATH.
 
     It manages a set of tests, and thus includes:
@@ -63,52 +52,241 @@ class Harness:
 
     _pager = 'less'
     _report_filename = 'sciath_test_report.txt'
+    _run_database_filename = 'sciath_runs.jsonl'
     _sandbox_sentinel_filename = '.sciath_sandbox'
+    _discover_pattern = '*tests.yml'
 
     def __init__(self, tests=None):
         self.launcher = None  # Created when needed
-        self.testruns = []
+        self._registry = _TestRegistry()
         if tests:
             for test in tests:
                 self.add_test(test)
         self.report_filename_full = os.path.join(os.getcwd(),
                                                  self._report_filename)
         self.quiet = False  # quiet means only print specifically-requested output
+        self.parallel = 1  # number of cores for concurrently-running jobs
+        self.max_failures = None  # with pipelined execution, stop after this many
+        self._lock = threading.Lock()  # for printing and counting from threads
+        self._failure_count = 0
+        self._scheduler = None  # only during execution
+        self._recorded_times = {}  # estimated job times, only during execution
+        self.result_cache = None  # a _ResultCache, to reuse unchanged output
+        self.parse_cache = None  # a _ParseCache, to reuse parsed test files
+        self.run_database = None  # a _RunDatabase, to record results
+        self.resume = False  # keep output from completed jobs, not re-running them
+        self.metrics = False  # report resource usage recorded for each task
+        self.benchmark_repeat = None  # timed runs of each job, when benchmarking
+        self.benchmark_warmup = 0  # untimed runs of each job, before those timed
+        self.benchmark_spread = 0.1  # flag IQRs above this fraction of the median
+        self.variants = None  # two (label, environment) pairs, to compare
+        self.tracer = None  # a _Tracer, to record time spent in each phase
+
+    @property
+    def testruns(self):
+        """ The list of test runs, in the order their Tests were added
+
+            To add test runs, use :meth:`add_test` or assign a new list,
+            rather than changing this one, so that they are indexed.
+        """
+        return self._registry.testruns
+
+    @testruns.setter
+    def testruns(self, testruns):
+        self._registry = _TestRegistry()
+        for testrun in testruns:
+            self._registry.add(testrun)
 
     def add_test(self, test):
         """ Add a Test to be run with the harness """
-        if test.name in [testrun.test.name for testrun in self.testruns]:
-            raise Exception("Duplicate test name %s" % test.name)
-        self.testruns.append(_TestRun(test))
+        self._registry.add(_TestRun(test))
 
     def add_tests_from_file(self, filename):
-        """ Read a file to add Tests to be run with the harness """
-        for test in sciath.test_file.create_tests_from_file(filename):
-            self.add_test(test)
+        """ Read a file to add Tests to be run with the harness
+
+            Each Test, with its Job and Verifier, is only created when first
+            needed, so errors in a test's entry in the file, other than in
+            its name or groups, are not found until then.
+            Call :meth:`create_active_tests` to find them.
+
+            If ``variants`` is set, each test is added once for each
+            variant, with environment variables named in the file taking
+            the values in the variant's environment, and with ``@`` and
+            the variant's label appended to its name (but not to the name
+            of its Job, so that output files have the same names).
+
+            If ``parse_cache`` is set, the results of parsing unchanged files
+            are reused.
+        """
+        with trace_span(self.tracer, 'parse', file=filename):
+            self._add_tests_from_file(filename)
+
+    def _add_tests_from_file(self, filename):
+        data = sciath.test_file.read_test_file(filename, self.parse_cache)
+        for testrun in self._testruns_from_data(data, filename):
+            self._registry.add(testrun)
+
+    def _testruns_from_data(self, data, filename):
+        """ Returns test runs for the contents of a test file, with one
+            for each variant of each test, if ``variants`` is set
+        """
+        if not self.variants:
+            return [
+                _TestRun(entry)
+                for entry in sciath.test_file.create_test_entries(
+                    data, filename)
+            ]
+        variants = list(self.variants)  # (label, environment) pairs
+        variant_entries = [
+            sciath.test_file.create_test_entries(data, filename, environment)
+            for _, environment in variants
+        ]
+        testruns = []
+        for entries in zip(*variant_entries):
+            for (label, _), entry in zip(variants, entries):
+                name = entry.name
+                entry.name = '%s@%s' % (name, label)
+                testrun = _TestRun(entry)
+                testrun.variant = (name, label)
+                testruns.append(testrun)
+        return testruns
+
+    def add_tests_from_directory(self, directory, pattern=None):
+        """ Find test files in a directory tree, and add their Tests
+
+            Files whose names match the glob ``pattern`` (by default,
+            ``*tests.yml``) are found, skipping hidden directories and
+            sandboxes. They are read in parallel, by a pool of processes,
+            and their Tests added in order of their paths, as by
+            :meth:`add_tests_from_file`.
+
+            If any file cannot be read, or any test name is used more than
+            once, or has already been added, no Tests are added, and
+            :class:`SciATHTestFileException` is raised, listing each problem
+            and the files involved.
+
+            Returns the paths of the files found.
+        """
+        filenames = self._find_test_files(directory, pattern or
+                                          self._discover_pattern)
+        with trace_span(self.tracer, 'parse', directory=directory):
+            problems = []
+            testruns = []
+            sources = {}
+            results = self._read_test_files(filenames)
+            for filename, (data, error) in zip(filenames, results):
+                if error is not None:
+                    problems.append('%s: %s' % (filename, error))
+                    continue
+                try:
+                    file_testruns = self._testruns_from_data(data, filename)
+                except sciath.test_file.SciATHTestFileException as exception:
+                    problems.append('%s: %s' % (filename, exception))
+                    continue
+                for testrun in file_testruns:
+                    if testrun.name in sources:
+                        problems.append(
+                            'Duplicate test name %s in %s and %s' %
+                            (testrun.name, sources[testrun.name], filename))
+                    elif testrun.name in self._registry:
+                        problems.append(
+                            'Duplicate test name %s in %s, already added' %
+                            (testrun.name, filename))
+                    else:
+                        sources[testrun.name] = filename
+                        testruns.append(testrun)
+            if problems:
+                raise sciath.test_file.SciATHTestFileException(
+                    '\n'.join(problems))
+            for testrun in testruns:
+                self._registry.add(testrun)
+        return filenames
+
+    def _find_test_files(self, directory, pattern):
+        """ Returns the sorted paths of files matching a glob in a directory
+            tree, skipping hidden directories and sandboxes
+        """
+        filenames = []
+        for dirpath, dirnames, names in os.walk(directory):
+            dirnames[:] = [
+                name for name in dirnames
+                if not name.startswith('.') and not os.path.exists(
+                    os.path.join(dirpath, name,
+                                 self._sandbox_sentinel_filename))
+            ]
+            filenames.extend(
+                os.path.join(dirpath, name)
+                for name in fnmatch.filter(names, pattern))
+        return sorted(filenames)
+
+    def _read_test_files(self, filenames):
+        """ Returns (data, error) for each test file, reading several files
+            in parallel, if there are several cores
+        """
+        import multiprocessing  #pylint: disable=bad-option-value,import-outside-toplevel
+        arguments = [(filename, self.parse_cache) for filename in filenames]
+        processes = min(len(filenames), multiprocessing.cpu_count())
+        if processes < 2:
+            return [_read_test_file(argument) for argument in arguments]
+        # As Pool is not a context manager in Python 2, do what its __exit__
+        # does: terminate the workers, even if reading is interrupted
+        pool = multiprocessing.Pool(processes)  #pylint: disable=bad-option-value,consider-using-with
+        try:
+            return pool.map(_read_test_file, arguments)
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def create_active_tests(self):
+        """ Create the Tests of all active test runs, if not yet created
+
+            This raises :class:`SciATHTestFileException` for an invalid
+            entry for an active test in a file read by
+            :meth:`add_tests_from_file`.
+        """
+        for testrun in self.testruns:
+            if testrun.active:
+                testrun.test  #pylint: disable=pointless-statement
 
     def clean(self):
-        """ Remove all output from all Tests, preparing or a re-run """
+        """ Remove all output from all Tests, preparing or a re-run
+
+            If ``resume`` is set, output from Jobs which completed is kept.
+        """
         if self.launcher is None:
-            self.launcher = sciath.launcher.Launcher()
+            from sciath.launcher import Launcher  #pylint: disable=bad-option-value,import-outside-toplevel
+            self.launcher = Launcher()
 
         if self.testruns:
             if not self.quiet:
                 print_header("Cleanup")
         for testrun in self.testruns:
             if testrun.active:
+                testrun.status = _TestRunStatus.UNKNOWN
+                testrun.status_info = ''
+                testrun.report = []
+                testrun.cache_key = None
+                testrun.cached = False
+                testrun.elapsed = None
+                testrun.benchmark_times = None
+                if self._resumable(testrun):
+                    continue
                 if not self.quiet:
-                    print_info("Removing output for Test: %s" %
-                               testrun.test.name)
-                self.launcher.clean(testrun.test.job,
-                                    output_path=testrun.output_path)
-                if testrun.sandbox and os.path.exists(testrun.exec_path):
-                    sentinel_file = os.path.join(
-                        testrun.exec_path, self._sandbox_sentinel_filename)
-                    if not os.path.exists(sentinel_file):
-                        raise SciATHHarnessInconsistentStateException(
-                            'Did not find expected sentinel file ' +
-                            sentinel_file)
-                    shutil.rmtree(testrun.exec_path)
+                    print_info("Removing output for Test: %s" % testrun.name)
+                with trace_span(self.tracer, 'clean', test=testrun.name):
+                    self._remove_output(testrun)
+
+    def _remove_output(self, testrun):
+        """ Remove the Launcher's files and the sandbox for a test run """
+        self.launcher.clean(testrun.test.job, output_path=testrun.output_path)
+        if testrun.sandbox and os.path.exists(testrun.exec_path):
+            sentinel_file = os.path.join(testrun.exec_path,
+                                         self._sandbox_sentinel_filename)
+            if not os.path.exists(sentinel_file):
+                raise SciATHHarnessInconsistentStateException(
+                    'Did not find expected sentinel file ' + sentinel_file)
+            import shutil  #pylint: disable=bad-option-value,import-outside-toplevel
+            shutil.rmtree(testrun.exec_path)
 
     def determine_overall_success(self):
         """ Returns a boolean value to denote overall success of the test suite """
@@ -119,119 +297,444 @@ class Harness:
                 return False
         return True
 
-    def execute(self):  #pylint: disable=too-many-branches
-        """ Execute all tests """
+    def execute(self, verify=False):
+        """ Execute all tests
+
+            If the Launcher is blocking, jobs are run concurrently
+            when enough of the ``parallel`` available cores are free.
+            A Job requires as many cores as its largest Task's MPI ranks
+            times threads.
+
+            If ``verify`` is True and the Launcher is blocking, each test run
+            is also verified as soon as its job completes, and its status
+            printed, so verification overlaps with running jobs and
+            :meth:`verify` need not be called. In this case, if
+            ``max_failures`` is set, once that many tests have failed,
+            no further jobs are launched, running jobs are cancelled,
+            and the remaining test runs are marked as not launched.
+
+            If ``result_cache`` is set and the Launcher is blocking, the
+            output of a sandboxed test run whose inputs have not changed since
+            it last passed is restored from the cache, instead of running
+            its job, unless it is benchmarked or its verifier requires
+            metrics.
+
+            If ``run_database`` is set and the Launcher is blocking, jobs
+            with the longest recorded run times are launched first, and
+            the total time to run them is predicted and printed. On a batch
+            system, recorded run times are used to choose wall times for jobs
+            which do not specify them (see :meth:`Launcher.prepare_job`).
+
+            If ``benchmark_repeat`` is set, or a Test sets its own, and the
+            Launcher is blocking, each such Job is run that many times, after
+            ``benchmark_warmup`` untimed runs, each from a fresh sandbox,
+            and the output of the last run is verified. Statistics of the
+            run times are included in the report.
+        """
         self.clean()
 
         if self.launcher is None:
-            self.launcher = sciath.launcher.Launcher()
+            from sciath.launcher import Launcher  #pylint: disable=bad-option-value,import-outside-toplevel
+            self.launcher = Launcher()
+        self._collect_required_metrics()
+
+        if self.testruns and not self.quiet:
+            self._print_execution_header()
+        verify = verify and self.launcher.blocking
+        if verify:
+            for testrun in self.testruns:
+                if not testrun.active:
+                    self._verify_testrun(testrun)
+        if self.result_cache is not None and self.launcher.blocking:
+            self.result_cache.evict()
+        self._failure_count = 0
+        self._scheduler = _Scheduler(
+            self.parallel if self.launcher.blocking else 1)
+        testruns = [testrun for testrun in self.testruns if testrun.active]
+        if self.run_database is not None:
+            self._recorded_times = self.run_database.runtime_estimates()
+        estimates = self._runtime_estimates(testruns)
+        if estimates and not self.quiet:
+            self._print_predicted_time(testruns, estimates)
+        try:
+            self._scheduler.run(
+                testruns,
+                lambda testrun: self._start_testrun(testrun, verify),
+                slots_required=_cores_required,
+                priority=estimates.get if estimates else None)
+        except KeyboardInterrupt:
+            # Jobs run in their own process groups, so must be stopped here
+            self._stop_execution()
+            raise
+        finally:
+            self._scheduler = None
+            self._recorded_times = {}
+
+        if verify and self._too_many_failures():
+            self._mark_unlaunched_stopped()
+
+    def _print_execution_header(self):
+        print()
+        print_header("Executing Tests")
+        print(self.launcher)
+        if not self.launcher.blocking and (
+                self.benchmark_repeat is not None or
+                any(testrun.test.benchmark_repeat is not None
+                    for testrun in self.testruns
+                    if testrun.active)):
+            print_warning("Benchmarking requires a blocking launcher. "
+                          "Running each job once")
+
+    def _print_predicted_time(self, testruns, estimates):
+        """ Print the time predicted to run test runs, from estimated job times
+        """
+        import datetime  #pylint: disable=bad-option-value,import-outside-toplevel
+        print_info('Predicted time: %s on %d core(s), from recorded times' %
+                   (datetime.timedelta(seconds=int(
+                       self._scheduler.predict_makespan(
+                           testruns, _cores_required, estimates.get))),
+                    self._scheduler.slots))
+
+    def _collect_required_metrics(self):
+        """ Have the Launcher record metrics, if any active test's
+            verifier requires them
+        """
+        for testrun in self.testruns:
+            if testrun.active and _requires_metrics(testrun):
+                self.launcher.collect_metrics = True
+                return
+
+    def _runtime_estimates(self, testruns):
+        """ Returns a dict from test runs to their estimated job times
+
+            Estimates are from times recorded in ``run_database``. Test runs
+            with no recorded time are assumed to take the mean estimated
+            time, and benchmarked test runs to take that time for each
+            run. Returns an empty dict if there are no recorded times,
+            or if jobs are not run concurrently.
+        """
+        if not self.launcher.blocking or self.parallel == 1:
+            return {}
+        recorded = self._recorded_times
+        known = [
+            recorded[testrun.name]
+            for testrun in testruns
+            if testrun.name in recorded
+        ]
+        if not known:
+            return {}
+        mean = sum(known) / len(known)
+        estimates = {}
+        for testrun in testruns:
+            warmup, repeat = self._benchmark_runs(testrun)
+            estimates[testrun] = (warmup + (repeat or 1)) * recorded.get(
+                testrun.name, mean)
+        return estimates
+
+    def _stop_execution(self):
+        """ Launch no further jobs, and cancel those which are running """
+        if self._scheduler is not None:
+            self._scheduler.stop()
+        for testrun in self.testruns:
+            submitted_job = testrun.submitted_job
+            if submitted_job is not None:
+                submitted_job.cancel()
 
-        if self.testruns:
-            if not self.quiet:
-                print()
-                print_header("Executing Tests")
-                print(self.launcher)
+    def _mark_unlaunched_stopped(self):
+        """ Mark active test runs which were not launched as stopped """
         for testrun in self.testruns:
-            if testrun.active:
-                if not os.path.exists(testrun.output_path):
-                    os.makedirs(testrun.output_path)
-                if not os.path.exists(testrun.exec_path):
-                    os.makedirs(testrun.exec_path)
-                if testrun.sandbox:
-                    sentinel_file = os.path.join(
-                        testrun.exec_path, self._sandbox_sentinel_filename)
-                    if os.path.exists(sentinel_file):
-                        raise SciATHHarnessInconsistentStateException(
-                            "Unexpected sentinel file %s" % sentinel_file)
-                    with open(sentinel_file, 'w'):
-                        pass
-                if not self.quiet:
-                    print_subheader("Executing %s" % testrun.test.job.name,
+            if testrun.active and testrun.status == _TestRunStatus.UNKNOWN:
+                self._mark_stopped(testrun)
+                self._print_status(testrun)
+
+    def _mark_stopped(self, testrun):
+        testrun.status = _TestRunStatus.NOT_LAUNCHED
+        testrun.status_info = 'stopped after %d failures' % self._failure_count
+        testrun.report = []
+
+    def _record_failure(self):
+        """ Count a failed test, stopping execution if there are too many """
+        with self._lock:
+            self._failure_count += 1
+            stop = self._failure_count == self.max_failures
+            if stop and not self.quiet:
+                print_warning("Stopping after %d failures" %
+                              self._failure_count)
+        if stop:
+            self._stop_execution()
+
+    def _too_many_failures(self):
+        if not self.max_failures:
+            return False
+        return self._failure_count >= self.max_failures
+
+    def _start_testrun(self, testrun, verify=False):
+        """ Prepare to execute a test run, returning a callable to launch it
+
+            The callable optionally also verifies the test run, printing its
+            status.
+
+            Returns None if the test run could not be prepared, in which case
+            it is marked as skipped, or if its output was restored from the
+            result cache or kept from a previous run, with ``resume``.
+
+            When benchmarking, the callable runs the job several times,
+            each from a fresh sandbox, and the test run is verified after
+            the last run.
+        """
+        warmup, repeat = self._benchmark_runs(testrun)
+        if self._reuse_output(testrun, repeat is not None):
+            if verify:
+                self._verify_testrun(testrun)
+                self._report_status(testrun)
+            return None
+        with trace_span(self.tracer, 'prepare', test=testrun.name):
+            submit_data = self._prepare_testrun(testrun)
+        if submit_data is None:
+            if verify:
+                self._print_status(testrun)
+            return None
+
+        def _submit():
+            cancelled = self._run_job(testrun, submit_data, warmup, repeat)
+            if verify:
+                if not cancelled:
+                    self._verify_testrun(testrun)
+                    self._store_in_cache(testrun)
+                self._report_status(testrun)
+
+        return _submit
+
+    def _reuse_output(self, testrun, benchmarked):
+        """ Returns True if a test run's output is kept, with ``resume``, or
+            restored from the result cache, so its job need not run
+        """
+        if self._resumable(testrun):
+            if not self.quiet:
+                with self._lock:
+                    print_subheader("Resuming %s" % testrun.test.job.name,
                                     end="")
-                    print("from %s" % testrun.exec_path)
-                success, info, report, submit_data = self.launcher.prepare_job(
-                    testrun.test.job,
-                    output_path=testrun.output_path,
-                    exec_path=testrun.exec_path)
-                if success:
-                    if not self.quiet:
-                        print(command_join(submit_data.launch_command))
-                    success, info, report = self.launcher.submit_job(
-                        submit_data)
+                    print("already complete")
+            return True
+        if benchmarked or _requires_metrics(testrun):
+            return False  # Jobs must run to be timed or measured
+        return self._restore_from_cache(testrun)
+
+    def _run_job(self, testrun, submit_data, warmup, repeat):
+        """ Run a test run's job, marking it if it is not run successfully
+
+            If ``repeat`` is not None, the job is run ``warmup`` times and
+            then ``repeat`` times, each from a fresh sandbox, recording
+            the time of the latter runs in ``benchmark_times``.
+
+            Returns True if the job was cancelled.
+        """
+        if repeat is not None:
+            testrun.benchmark_times = []
+        data = submit_data
+        for run in range(warmup + (repeat or 1)):
+            if run > 0:
+                with trace_span(self.tracer, 'prepare', test=testrun.name):
+                    data = self._prepare_rerun(testrun)
+                if data is None:
+                    break
+            success, info, report, stopped = self._run_job_once(testrun, data)
+            if stopped or not success:
+                break
+            if repeat is not None and run >= warmup:
+                testrun.benchmark_times.append(testrun.elapsed)
+        if testrun.benchmark_times:
+            testrun.elapsed = median(testrun.benchmark_times)
+        cancelled = data is not None and stopped == 'cancelled'
+        if cancelled:
+            self._mark_stopped(testrun)
+        elif data is not None and not success:
+            self._mark_skipped(testrun, info, report)
+        return cancelled
+
+    def _run_job_once(self, testrun, submit_data):
+        """ Run a test run's job, returning success, info, and report, as
+            from :meth:`SubmittedJob.wait`, and 'cancelled' or 'timed out'
+            if the job was stopped, or otherwise None
+        """
+        start_time = time.time()
+        testrun.submitted_job = self.launcher.start_job(submit_data)
+        if self._too_many_failures():
+            testrun.submitted_job.cancel()  # stopped while starting
+        success, info, report = testrun.submitted_job.wait()
+        stopped = None
+        if testrun.submitted_job.cancelled:
+            stopped = 'cancelled'
+        elif testrun.submitted_job.timed_out:
+            stopped = 'timed out'
+        testrun.submitted_job = None
+        if self.launcher.blocking:
+            testrun.elapsed = time.time() - start_time
+        if self.tracer is not None:
+            self.tracer.add(testrun.name, start_time, time.time(), JOB_CATEGORY)
+        return success, info, report, stopped
+
+    def _report_status(self, testrun):
+        """ Print a verified test run's status, counting it if it failed """
+        self._print_status(testrun)
+        if testrun.status in [_TestRunStatus.FAIL, _TestRunStatus.TIMEOUT]:
+            self._record_failure()
+
+    def _benchmark_runs(self, testrun):
+        """ Returns the numbers of warm-up and timed runs of a test run's job
+
+            The number of timed runs is None if the test is not benchmarked.
+            Tests are only benchmarked with a blocking Launcher.
+        """
+        test = testrun.test
+        repeat = (test.benchmark_repeat if test.benchmark_repeat is not None
+                  else self.benchmark_repeat)
+        if repeat is None or not self.launcher.blocking:
+            return 0, None
+        warmup = (test.benchmark_warmup if test.benchmark_warmup is not None
+                  else self.benchmark_warmup)
+        return warmup, repeat
+
+    def _prepare_rerun(self, testrun):
+        """ Prepare to run a test run's job again, from a fresh sandbox
+
+            Returns data to submit the job, or None if it could not be
+            prepared, in which case the test run is marked as skipped.
+        """
+        with self._lock:
+            self._remove_output(testrun)
+            self._create_directories(testrun)
+            success, info, report, submit_data = self.launcher.prepare_job(
+                testrun.test.job,
+                output_path=testrun.output_path,
+                exec_path=testrun.exec_path)
+        if not success:
+            self._mark_skipped(testrun, info, report)
+            return None
+        return submit_data
+
+    def _resumable(self, testrun):
+        """ Returns True if a test run's output should be kept and its job
+            not re-run, because it completed before the harness was stopped
+        """
+        from sciath.launcher import job_complete  #pylint: disable=bad-option-value,import-outside-toplevel
+        return self.resume and job_complete(testrun.test.job,
+                                            testrun.output_path)
+
+    def _restore_from_cache(self, testrun):
+        """ Restore a test run's output from the result cache, if possible
+
+            Otherwise, records the key with which to store its output.
+        """
+        if (self.result_cache is None or not self.launcher.blocking or
+                not testrun.sandbox):
+            return False
+        with trace_span(self.tracer, 'cache', test=testrun.name):
+            testrun.cache_key = self.result_cache.key(testrun.test.job,
+                                                      testrun.exec_path,
+                                                      self.launcher)
+            restored = self.result_cache.restore(testrun.cache_key,
+                                                 testrun.output_path)
+        if not restored:
+            return False
+        testrun.cached = True
+        if not self.quiet:
+            with self._lock:
+                print_subheader("Restored %s" % testrun.test.job.name, end="")
+                print("from %s" % self.result_cache.directory)
+        return True
+
+    def _store_in_cache(self, testrun):
+        """ Store the output of a newly-passing test run in the result cache """
+        if (testrun.cache_key is not None and not testrun.cached and
+                testrun.status == _TestRunStatus.PASS):
+            with trace_span(self.tracer, 'cache', test=testrun.name):
+                self.result_cache.store(testrun.cache_key, testrun.output_path)
+
+    def _print_status(self, testrun):
+        if not self.quiet:
+            with self._lock:
+                print(format_status_line(testrun))
+
+    def _prepare_testrun(self, testrun):
+        """ Prepare to execute a test run, returning data to submit its job
+
+            Returns None if the test run could not be prepared, in which case
+            it is marked as skipped.
+        """
+        with self._lock:
+            self._create_directories(testrun)
+            if not self.quiet:
+                print_subheader("Executing %s" % testrun.test.job.name, end="")
+                print("from %s" % testrun.exec_path)
+            estimated_time = self._recorded_times.get(testrun.name)
+            if estimated_time is not None:
+                estimated_time /= 60.0
+            success, info, report, submit_data = self.launcher.prepare_job(
+                testrun.test.job,
+                output_path=testrun.output_path,
+                exec_path=testrun.exec_path,
+                estimated_time=estimated_time)
+            if not success:
+                print("# skipped (%s)" % info)
+                self._mark_skipped(testrun, info, report)
+                return None
+            if not self.quiet:
+                if submit_data.wall_time_estimated:
+                    print('# wall time %g minutes, from recorded times' %
+                          submit_data.requested_wall_time)
+                if submit_data.queue_name != self.launcher.queue_name:
+                    print('# queue %s' % submit_data.queue_name)
+                if submit_data.launch_command:
+                    print(command_join(submit_data.launch_command))
                 else:
-                    print("# skipped (%s)" % info)
-                if not success:
-                    testrun.status = _TestRunStatus.SKIPPED
-                    testrun.status_info = info
-                    testrun.report = report
-
-    def print_all_tests(self):
-        """ Display information about all tests """
+                    for command in submit_data.task_commands:
+                        print(command_join(command))
+            return submit_data
+
+    def _create_directories(self, testrun):
+        """ Create a test run's output path and execution path """
+        if not os.path.exists(testrun.output_path):
+            os.makedirs(testrun.output_path)
+        if not os.path.exists(testrun.exec_path):
+            os.makedirs(testrun.exec_path)
+        if testrun.sandbox:
+            sentinel_file = os.path.join(testrun.exec_path,
+                                         self._sandbox_sentinel_filename)
+            if os.path.exists(sentinel_file):
+                raise SciATHHarnessInconsistentStateException(
+                    "Unexpected sentinel file %s" % sentinel_file)
+            with open(sentinel_file, 'w'):
+                pass
+
+    @staticmethod
+    def _mark_skipped(testrun, info, report):
+        testrun.status = _TestRunStatus.SKIPPED
+        testrun.status_info = info
+        testrun.report = report
+
+    def print_all_tests(self, active_only=False):
+        """ Display information about all tests, or only active ones
+
+            This uses only names and groups, so Tests read from files
+            are not created. Groups are listed in sorted order.
+        """
+        lines = []
         for testrun in self.testruns:
-            info_string = [testrun.test.name]
-            if testrun.test.groups:
+            if active_only and not testrun.active:
+                continue
+            info_string = [testrun.name]
+            if testrun.groups:
                 info_string.append(' (')
-                info_string.append(', '.join(testrun.test.groups))
+                info_string.append(', '.join(sorted(testrun.groups)))
                 info_string.append(')')
-            print(''.join(info_string))
+            lines.append(''.join(info_string))
+        if lines:
+            print('\n'.join(lines))
 
-    def report(self):  #pylint: disable=too-many-branches
+    def report(self):
         """ Compile results into a report and print to stdout and file """
-        report = []
-        failed_names = []
-        if self.testruns:
-            report_header_printed = False
-            for testrun in self.testruns:
-                if testrun.report:
-                    if not report_header_printed:
-                        report.append('')
-                        report.append(format_header("Verification Reports"))
-                        report_header_printed = True
-                    report.append(
-                        format_subheader("Report for %s" % testrun.test.name))
-                    for line in testrun.report:
-                        report.append(line)
-                    stdout_filename = os.path.join(
-                        testrun.output_path, testrun.test.job.stdout_filename)
-                    if os.path.isfile(stdout_filename) and os.stat(
-                            stdout_filename).st_size != 0:
-                        report.append('check stdout file:')
-                        report.append('    %s %s' %
-                                      (self._pager, stdout_filename))
-                    stderr_filename = os.path.join(
-                        testrun.output_path, testrun.test.job.stderr_filename)
-                    if os.path.isfile(stderr_filename) and os.stat(
-                            stderr_filename).st_size != 0:
-                        report.append(
-                            color_warning("check non-empty stderr file:"))
-                        report.append('    %s %s' %
-                                      (self._pager, stderr_filename))
-            report.append('')
-            report.append(format_header("Summary"))
-            for testrun in self.testruns:
-                if testrun.status == _TestRunStatus.FAIL:
-                    failed_names.append(testrun.test.name)
-                line = [
-                    _color_from_status(
-                        testrun.status,
-                        "[%s]  %s" % (testrun.test.name, testrun.status))
-                ]
-                if testrun.status_info:
-                    line.append(' (' + testrun.status_info + ')')
-                report.append(''.join(line))
-            report.append('')
-            if any((testrun.active for testrun in self.testruns)):
-                if self.determine_overall_success():
-                    report.append(color_okay("SUCCESS"))
-                else:
-                    report.append(color_fail("FAILURE"))
-                    if failed_names:
-                        report.append('To re-run failed tests, use e.g.')
-                        report.append('  -t ' + ','.join(failed_names))
-            else:
-                report.append("No tests active")
-        else:
-            report.append("No tests")
+        report = report_lines(self, self._pager)
         if not self.quiet:
             for line in report:
                 print(line)
@@ -241,19 +744,56 @@ class Harness:
             print('\nReport written to file:\n  %s' %
                   (self.report_filename_full))
 
+    def record_run(self, input_files=None):
+        """ Append the results of the current run to ``run_database``
+
+            Records each active test's status and elapsed time, along with
+            the Launcher configuration and any input files given.
+        """
+        import datetime  #pylint: disable=bad-option-value,import-outside-toplevel
+        launcher = self.launcher
+        record = {
+            'date':
+                datetime.datetime.now().isoformat(),
+            'input_files': [
+                os.path.abspath(input_file) for input_file in input_files or []
+            ],
+            'launcher': {
+                'submitCommand': command_join(launcher.job_submission_command),
+                'blocking': launcher.blocking,
+                'jobLevelRanks': launcher.has_job_level_ranks,
+                'mpiLaunch': launcher.mpi_launch,
+                'directLaunch': launcher.direct_launch,
+                'accountName': launcher.account_name,
+                'queueName': launcher.queue_name,
+                'template': launcher.template_filename,
+            },
+            'parallel':
+                self.parallel,
+            'tests': [{
+                'name': testrun.name,
+                'status': testrun.status,
+                'elapsed': testrun.elapsed,
+                'cached': testrun.cached,
+                'benchmark_times': testrun.benchmark_times,
+            } for testrun in self.testruns if testrun.active],
+        }
+        self.run_database.append(record)
+
     def _report_to_file(self, report):
         """ Dumps a report, as a list of lines (no new-lines) to file
 
             Prepends additional information, so that the file can be
             sent elsewhere or referred to later
         """
+        import datetime  #pylint: disable=bad-option-value,import-outside-toplevel
         with open(self.report_filename_full, 'w') as handle:
             handle.write(
                 datetime.datetime.now().strftime('%m/%d/%Y, %H:%M:%S') + '\n')
             handle.write(str(self.launcher) + '\n')
             handle.write('\n'.join(report) + '\n')
 
-    def run_from_args(self):  #pylint: disable=too-many-branches, too-many-return-statements, too-many-statements
+    def run_from_args(self):
         """ Perform one or more actions, based on command line options
 
         This essentially defines the "main" function for the typical
@@ -261,86 +801,8 @@ class Harness:
 
         Returns an exit code, with 0 indicating success.
         """
-        args = _parse_args()
-
-        if args.no_colors:
-            sciath.no_colors()
-
-        if args.quiet or args.tap:
-            self.quiet = True
-
-        if args.update_expected:
-            print_info(
-                "You have provided an argument to updated expected files.")
-            print_info("This will attempt to OVERWRITE your expected files!")
-            user_input = None
-            while not user_input:
-                user_input = py23input(
-                    format_info("Are you sure? Type 'y' to continue: "))
-            if user_input[0] not in ['y', 'Y']:
-                print_info("Aborting.")
-                return 0
-
-        if args.input_files:
-            for input_file in args.input_files:
-                try:
-                    self.add_tests_from_file(input_file)
-                except sciath.test_file.SciATHTestFileException as exception:
-                    print_error("There was a problem reading tests from %s:" %
-                                input_file,
-                                file=sys.stderr)
-                    print(exception, file=sys.stderr)
-                    return 2
-
-        if args.list:
-            self.print_all_tests()
-            return 0
-
-        if args.test:
-            self._activate_tests_from_list(args.test)
-
-        if args.group or args.exclude_group:
-            self._activate_test_groups(args.group, args.exclude_group)
-
-        if args.configure_default:
-            sciath.launcher.Launcher.write_default_definition(args.conf_file)
-            return 0
-
-        self.launcher = sciath.launcher.Launcher(args.conf_file)
-
-        if args.configure:
-            self.launcher.configure()
-
-        if args.purge_output:
-            self.clean()
-            return 0
-
-        if not args.verify:
-            self.execute()
-
-        if args.update_expected:
-            try:
-                self.update_expected()
-            except SciATHVerifierMissingFileException as exception:
-                print_warning("Update of expected file failed:")
-                print_info(exception)
-                print_warning("Not updating")
-
-        if args.execute or (not args.verify and not self.launcher.blocking):
-            if self.testruns:
-                if not self.quiet:
-                    print_info("Not verifying or reporting")
-        else:
-            self.verify()
-            self.report()
-            if args.tap:
-                sciath.report_tap.print_tap(self)
-
-        if args.error_on_test_failure:
-            if not self.determine_overall_success():
-                return 1
-
-        return 0
+        from sciath import _command_line  #pylint: disable=bad-option-value,import-outside-toplevel
+        return _command_line.run_from_args(self)
 
     def update_expected(self):
         """ Give each active test the chance to update its reference output """
@@ -352,142 +814,137 @@ class Harness:
                 if hasattr(testrun.test.verifier, 'update_expected'):
                     if not self.quiet:
                         print_info("Updating output for Test: %s" %
-                                   testrun.test.name)
+                                   testrun.name)
                     testrun.test.verifier.update_expected(
                         testrun.output_path, testrun.exec_path)
                 else:
                     if not self.quiet:
                         print_info("Output updated not supported for Test: %s" %
-                                   testrun.test.name)
+                                   testrun.name)
 
     def verify(self):
         """ Updates the status of all test runs """
         for testrun in self.testruns:
-            if not testrun.active:
-                testrun.status = _TestRunStatus.DEACTIVATED
-                continue
-            if testrun.status == _TestRunStatus.SKIPPED:
-                continue
-            if not sciath.launcher.job_launched(testrun.test.job,
-                                                testrun.output_path):
-                testrun.status = _TestRunStatus.NOT_LAUNCHED
-                continue
-            if not sciath.launcher.job_complete(testrun.test.job,
-                                                testrun.output_path):
-                testrun.status = _TestRunStatus.INCOMPLETE
-                continue
-
+            self._verify_testrun(testrun)
+            self._store_in_cache(testrun)
+
+    def _verify_testrun(self, testrun):
+        """ Updates the status of a test run """
+        if not testrun.active:
+            testrun.status = _TestRunStatus.DEACTIVATED
+            return
+        if testrun.status == _TestRunStatus.SKIPPED:
+            return
+        from sciath import launcher  #pylint: disable=bad-option-value,import-outside-toplevel
+        if not launcher.job_launched(testrun.test.job, testrun.output_path):
+            testrun.status = _TestRunStatus.NOT_LAUNCHED
+            return
+        job, output_path = testrun.test.job, testrun.output_path
+        if launcher.job_exceeded_wall_time(job, output_path):
+            # Killed by the batch system, so record the wall time as a lower
+            #  bound on the time needed, from which to request more next time
+            wall_time = launcher.job_requested_wall_time(job, output_path)
+            testrun.elapsed = 60.0 * wall_time
+            testrun.status = _TestRunStatus.TIMEOUT
+            testrun.report = [
+                '[Timeout] Did not complete within the requested wall time '
+                'of %g minutes' % wall_time
+            ]
+            return
+        if not launcher.job_complete(job, output_path):
+            testrun.status = _TestRunStatus.INCOMPLETE
+            return
+        if testrun.elapsed is None:
+            testrun.elapsed = launcher.job_elapsed(job, output_path)
+        if launcher.job_timed_out(job, output_path):
+            testrun.status = _TestRunStatus.TIMEOUT
+            testrun.report = [
+                '[Timeout] Killed after exceeding the wall time. Exit code %d '
+                'is recorded for each unfinished task.' %
+                launcher.TIMEOUT_EXIT_CODE
+            ]
+            return
+
+        with trace_span(self.tracer, 'verify', test=testrun.name):
             passing, testrun.status_info, testrun.report = testrun.test.verify(
                 testrun.output_path, testrun.exec_path)
-            testrun.status = _TestRunStatus.PASS if passing else _TestRunStatus.FAIL
+        testrun.status = _TestRunStatus.PASS if passing else _TestRunStatus.FAIL
+
+    def execute_async(self):
+        """ asyncio counterpart to :meth:`execute` (Python 3.5+)
+
+            Returns an asynchronous iterator, to use with ``async for``,
+            which yields each active test run as its job finishes. Jobs are
+            submitted with :meth:`Launcher.submit_job_async`, and (with
+            a blocking Launcher) run concurrently while enough of the
+            ``parallel`` available cores are free.
+
+            Test runs have attributes including ``test``, ``output_path``,
+            ``exec_path``, and (once verified) ``status``. They are yielded
+            before they are verified, so use :meth:`verify_async` to verify
+            them.
+
+            Only jobs are run, so ``result_cache``, ``resume``,
+            ``benchmark_repeat`` (for the Harness or any Test),
+            ``max_failures``, and ``tracer`` are not supported, and an
+            exception is raised if any is set. Recorded run times are not
+            used to order jobs.
+        """
+        from sciath import _async_api  #pylint: disable=bad-option-value,import-outside-toplevel
+        return _async_api.execute_async(self)
+
+    def verify_async(self):
+        """ asyncio counterpart to :meth:`verify` (Python 3.5+)
+
+            Returns an asynchronous iterator, to use with ``async for``,
+            which yields each test run once its status has been updated,
+            giving control back to the event loop between test runs.
+        """
+        from sciath import _async_api  #pylint: disable=bad-option-value,import-outside-toplevel
+        return _async_api.verify_async(self)
 
     def _activate_tests_from_list(self, tests):
-        """ Deactivate test runs not named in a list
+        """ Deactivate test runs not matching a list of names, globs,
+        or regular expressions prefixed with ``re:``
 
         For backwards compatibility, each entry may be a comma-separated list.
         """
         tests_flat = []
         for test in tests:
             tests_flat.extend(test.split(","))
-        for testrun in self.testruns:
-            if testrun.test.name not in tests_flat:
-                testrun.active = False
+        self._deactivate_unselected(self._registry.select_names(tests_flat))
 
     def _activate_test_groups(self, only_groups, exclude_groups):
-        """ Deactivate tests not in only_groups and all tests in exclude_groups
+        """ Deactivate tests not matching any of the group expressions
+        only_groups, and all tests matching any of exclude_groups
         """
-        for testrun in self.testruns:
-            if only_groups and not testrun.test.groups.intersection(
-                    only_groups):
-                testrun.active = False
-            if testrun.test.groups.intersection(exclude_groups):
+        if only_groups:
+            selected = self._registry.select_groups(only_groups)
+        else:
+            selected = self._registry.all()
+        if exclude_groups:
+            selected.difference_update(
+                self._registry.select_groups(exclude_groups))
+        self._deactivate_unselected(selected)
+
+    def _deactivate_unselected(self, selected):
+        """ Deactivate test runs not at the given positions """
+        for position, testrun in enumerate(self.testruns):
+            if position not in selected:
                 testrun.active = False
 
 
-def _parse_args():
-    parser = argparse.ArgumentParser(description='SciATH')
-    parser.add_argument('input_files',
-                        help='YAML file[s] to add tests to the harness',
-                        nargs='*',
-                        default=None)
-    parser.add_argument('-c',
-                        '--configure',
-                        help='Configure queuing system information',
-                        required=False,
-                        action='store_true')
-    parser.add_argument(
-        '-t',
-        '--test',
-        help='Run only this test and those from other -t/--test arguments',
-        required=False,
-        action='append')
-    parser.add_argument('-p',
-                        '--purge-output',
-                        help='Delete generated output',
-                        required=False,
-                        action='store_true')
-    parser.add_argument('-f',
-                        '--error-on-test-failure',
-                        help='Return exit code of 1 if any test failed',
-                        required=False,
-                        action='store_true')
-    parser.add_argument('-d',
-                        '--configure-default',
-                        help='Write default queuing system config file',
-                        required=False,
-                        action='store_true')
-    parser.add_argument('-l',
-                        '--list',
-                        help='List all registered tests and exit',
-                        required=False,
-                        action='store_true')
-    parser.add_argument('-w',
-                        '--conf-file',
-                        help='Use provided configuration file',
-                        required=False)
-    parser.add_argument('--no-colors',
-                        help='Deactivate colored output',
-                        required=False,
-                        action='store_true')
-    parser.add_argument(
-        '-u',
-        '--update-expected',
-        help='When well-defined, update reference files with current output',
-        required=False,
-        action='store_true')
-    stage_skip_group = parser.add_mutually_exclusive_group()
-    stage_skip_group.add_argument(
-        '-v',
-        '--verify',
-        help='Perform test verification, and not execution',
-        required=False,
-        action='store_true')
-    stage_skip_group.add_argument(
-        '-e',
-        '--execute',
-        help='Perform test execution, and not verification',
-        required=False,
-        action='store_true')
-    parser.add_argument(
-        '-g',
-        '--group',
-        help='Exclude tests not in this or any other -g/--group argument',
-        required=False,
-        action='append')
-    parser.add_argument('-x',
-                        '--exclude-group',
-                        help='Exclude tests in this group',
-                        required=False,
-                        action='append')
-    parser.add_argument(
-        '--tap',
-        help='Print TAP-compatible output, and activate quiet mode.',
-        required=False,
-        action='store_true')
-    parser.add_argument(
-        '-q',
-        '--quiet',
-        help='Only print information requested by other options',
-        required=False,
-        action='store_true')
-    return parser.parse_args()
+def _read_test_file(arguments):
+    """ Returns (data, None) for the parsed contents of a test file, or
+        (None, message) if it cannot be read
+
+        This is used by :meth:`Harness.add_tests_from_directory` in a pool
+        of processes, so takes a single tuple of arguments, the filename and
+        a parse cache (or None), and returns errors rather than raising them.
+    """
+    filename, parse_cache = arguments
+    try:
+        return sciath.test_file.read_test_file(filename, parse_cache), None
+    except (sciath.test_file.SciATHTestFileException, IOError,
+            OSError) as exception:
+        return None, str(exception)
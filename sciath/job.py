@@ -66,11 +66,36 @@ class Job:
         """ Returns a filename to use for exit codes """
         return self.name + '.exitcode'
 
+    @property
+    def metrics_filename(self):
+        """ Returns a filename to use for resource usage metrics """
+        return self.name + '.metrics'
+
+    @property
+    def profile_prefix(self):
+        """ Returns a prefix for the names of profile files """
+        return self.name + '.profile'
+
     @property
     def launched_filename(self):
         """ Returns a filename for a sentinel signifying launching """
         return '.%s.launched' % self.name
 
+    @property
+    def started_filename(self):
+        """ Returns a filename for a sentinel signifying a launch script started """
+        return '.%s.started' % self.name
+
+    @property
+    def timeout_filename(self):
+        """ Returns a filename for a sentinel signifying a wall time exceeded """
+        return '.%s.timeout' % self.name
+
+    @property
+    def wall_time_filename(self):
+        """ Returns a filename to record the wall time requested in a launch script """
+        return '.%s.walltime' % self.name
+
     @property
     def stdout_filename(self):
         """ Returns a filename to use for stdout """
@@ -111,6 +136,19 @@ class Job:
                     maximum = max(maximum, current)
         return maximum
 
+    def cores_required(self):
+        """ Returns the maximum number of cores required by any Task
+
+            A Task requires (MPI ranks) x (threads) cores, where an unspecified
+            or zero count is taken as one.
+        """
+        cores = 1
+        for task in self.tasks:
+            ranks = task.get_resource('mpiranks') or 1
+            threads = task.get_resource('threads') or 1
+            cores = max(cores, ranks * threads)
+        return cores
+
     def number_tasks(self):
         """ Returns the number of tasks within the Job """
         return len(self.tasks)
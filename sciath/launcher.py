@@ -1,9 +1,10 @@
 """ SciATH Launcher class """
 
 import os
+import math
 import shlex
-import sys
-import fcntl
+import threading
+import time
 import subprocess
 import re
 
@@ -12,18 +13,16 @@ from sciath import yaml_parse
 from sciath.utility import DotDict
 from sciath._sciath_io import _remove_file_if_it_exists, command_join
 from sciath._default_templates import _generate_default_template
-from sciath._conf_wizard import _launcher_interactive_configure
-
-
-# mpiexec has been observed to set non-blocking I/O, which
-#  has been observed to cause problems on OS X with errors like
-#  "BlockingIOError: [Errno 35] write could not complete without blocking"
-# We use this function to (re)set blocking I/O when launching
-def _set_blocking_io_stdout():
-    descriptor = sys.stdout
-    flags = fcntl.fcntl(descriptor, fcntl.F_GETFL)
-    if flags & os.O_NONBLOCK:
-        fcntl.fcntl(descriptor, fcntl.F_SETFL, flags & ~os.O_NONBLOCK)
+from sciath._measure import format_metrics, parse_metrics
+from sciath._job_files import (TIMEOUT_EXIT_CODE, _check_not_launched,
+                               _pad_exit_codes, _touch, _write_exit_code)
+from sciath._processes import (CANCEL_GRACE_PERIOD, _exit_code_from_os_error,
+                               _exit_code_from_returncode,
+                               _new_process_group_kwargs,
+                               _set_blocking_io_stdout,
+                               _terminate_process_group, _time_limit)
+from sciath._task_wrappers import (measure_command, profile_command,
+                                   timeout_command, wrapper_python)
 
 
 class SciATHLoadException(Exception):
@@ -51,24 +50,78 @@ def job_launched(job, output_path):
     return os.path.isfile(os.path.join(output_path, job.launched_filename))
 
 
-def _subprocess_run(command, **kwargs):
-    """ Wrapper for subprocess.run, to allow usage from Python 2
+def job_elapsed(job, output_path):
+    """ Returns the time in seconds a Job took to run, if recorded, or None
 
-        It returns the error code.
+        This uses the sentinel files written by the launch script when
+        it starts and completes, if its template includes both.
+    """
+    try:
+        return os.path.getmtime(os.path.join(
+            output_path, job.complete_filename)) - os.path.getmtime(
+                os.path.join(output_path, job.started_filename))
+    except OSError:
+        return None
 
-        This is to avoid a dependency like subprocess32.
+
+def job_requested_wall_time(job, output_path):
+    """ Returns the wall time in minutes requested in a Job's launch script,
+        or None if none was requested
     """
-    if sys.version_info[0] >= 3:
-        ctx = subprocess.run(command, check=False, **kwargs)  #pylint: disable=no-member
-        returncode = ctx.returncode
-    else:
-        for key in ['stdout', 'stderr']:
-            if key in kwargs and kwargs[key] == 'PIPE':
-                raise Exception(
-                    ('The current implementation cannot handle pipes. '
-                     'See the subprocess documentation for an alternative.'))
-        returncode = subprocess.call(command, **kwargs)
-    return returncode
+    try:
+        with open(os.path.join(output_path, job.wall_time_filename),
+                  'r') as wall_time_file:
+            return float(wall_time_file.read())
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def job_exceeded_wall_time(job, output_path):
+    """ Returns True if a Job started but did not complete within the wall
+        time requested in its launch script
+
+        This is taken to mean that the batch system killed the Job. It
+        requires the template to include the ``$SCIATH_JOB_STARTED``
+        sentinel.
+    """
+    wall_time = job_requested_wall_time(job, output_path)
+    if wall_time is None or job_complete(job, output_path):
+        return False
+    try:
+        started = os.path.getmtime(
+            os.path.join(output_path, job.started_filename))
+    except OSError:
+        return False
+    return time.time() - started > 60.0 * wall_time
+
+
+def job_metrics(job, output_path):
+    """ Returns resource usage for each of a Job's Tasks which recorded it
+
+        Returns a list of dicts with keys ``elapsed``, ``user``, and
+        ``system`` (in seconds) and ``maxrss_kb`` (peak resident set size,
+        in kilobytes), or None if no metrics were recorded.
+    """
+    filename = os.path.join(output_path, job.metrics_filename)
+    if not os.path.isfile(filename):
+        return None
+    return parse_metrics(filename)
+
+
+def job_profiles(job, output_path):
+    """ Returns the paths of profile files written by a Job's Tasks """
+    if not os.path.isdir(output_path):
+        return []
+    prefix = job.profile_prefix + '.'
+    return sorted(
+        os.path.join(output_path, filename)
+        for filename in os.listdir(output_path)
+        if filename.startswith(prefix))
+
+
+def job_timed_out(job, output_path):
+    """ Returns True if a Job was killed for exceeding a wall time """
+    return os.path.isfile(os.path.join(output_path, job.timeout_filename))
 
 
 class Launcher:  #pylint: disable=too-many-instance-attributes
@@ -83,6 +136,7 @@ class Launcher:  #pylint: disable=too-many-instance-attributes
     :class:`Launcher` include methods to operate on a combination of a :class:`Job` and a path:
 
     * Run the job from that path. If not on a batch system, blocks until the job completes.
+    * Start to run the job from that path, returning a handle to poll or wait on
     * Check the status of the job as run from that path
     * Clean up after a job, removing configuration-specific generated files
 
@@ -110,6 +164,7 @@ class Launcher:  #pylint: disable=too-many-instance-attributes
             conf_file.write('blocking: True\n')
             conf_file.write('jobLevelRanks: False\n')
             conf_file.write('mpiLaunch: none\n')
+            conf_file.write('directLaunch: False\n')
             conf_file.write('template: %s\n' % template_filename)
 
     def __init__(self, conf_filename=None):
@@ -119,6 +174,13 @@ class Launcher:  #pylint: disable=too-many-instance-attributes
         self.job_submission_command = None
         self.has_job_level_ranks = None
         self.blocking = None
+        self.direct_launch = False
+        self.collect_metrics = False  # record resource usage for each Task
+        self.profiler = None  # command, with <output>, to profile each Task
+        self.wall_time_margin = None  # factor to apply to estimated times
+        self.short_queue_name = None
+        self.short_queue_max_time = None  # minutes
+        self.python_command = None  # Python to run Task wrappers in jobs
         if conf_filename:
             self.conf_filename = conf_filename
         else:
@@ -128,7 +190,11 @@ class Launcher:  #pylint: disable=too-many-instance-attributes
 
         self._setup()
 
-    def _create_launch_script(self, job, output_path):  #pylint: disable=too-many-locals
+    def _create_launch_script(self,
+                              job,
+                              output_path,
+                              wall_time=None,
+                              queue_name=None):
         if not os.path.isabs(output_path):
             raise ValueError(
                 '[SciATH] Unsupported: output paths must be absolute')
@@ -136,42 +202,17 @@ class Launcher:  #pylint: disable=too-many-instance-attributes
         # Lazily populate the template information from file
         self._populate_template()
 
-        # Apply replacements at the Job level
-        replace_job = {
-            '$SCIATH_JOB_NAME':
-                job.name,
-            '$SCIATH_JOB_STDOUT':
-                os.path.join(output_path, job.stdout_filename),
-            '$SCIATH_JOB_STDERR':
-                os.path.join(output_path, job.stderr_filename),
-            '$SCIATH_JOB_EXITCODE':
-                os.path.join(output_path, job.exitcode_filename),
-            '$SCIATH_JOB_COMPLETE':
-                os.path.join(output_path, job.complete_filename),
-        }
-        delete_job = set()
-
-        job_ranks = job.resource_max('ranks')
-        if job_ranks is None or job_ranks == 0:
-            delete_job.add('$SCIATH_JOB_MAX_RANKS_OR_REMOVE_LINE')
-        else:
-            replace_job['$SCIATH_JOB_MAX_RANKS_OR_REMOVE_LINE'] = str(job_ranks)
-
-        if job.wall_time is None:
-            delete_job.add('$SCIATH_JOB_WALLTIME_HM_OR_REMOVE_LINE')
-            delete_job.add('$SCIATH_JOB_WALLTIME_HMS_OR_REMOVE_LINE')
-        else:
-            hours_str, minutes_str, seconds_str = _formatted_split_time(
-                60.0 * job.wall_time)
-            replace_job[r'$SCIATH_JOB_WALLTIME_HM_OR_REMOVE_LINE'] = '%s:%s' % (
-                hours_str, minutes_str)
-            replace_job[
-                r'$SCIATH_JOB_WALLTIME_HMS_OR_REMOVE_LINE'] = '%s:%s:%s' % (
-                    hours_str, minutes_str, seconds_str)
+        replace_job, delete_job = self._job_replacements(
+            job, output_path, wall_time, queue_name)
 
         # Assemble the script, applying task-level replacements
         script_filename = os.path.join(output_path, self._batch_filename(job))
 
+        if wall_time is not None:
+            with open(os.path.join(output_path, job.wall_time_filename),
+                      'w') as wall_time_file:
+                wall_time_file.write('%r\n' % float(wall_time))
+
         with open(script_filename, 'w') as script_file:
             # Pre
             script_file.writelines(
@@ -180,24 +221,11 @@ class Launcher:  #pylint: disable=too-many-instance-attributes
                                delete=delete_job))
 
             # Task
-            first = True
-            for task in job.tasks:
-                if first:
-                    first = False
-                else:
+            for index, task in enumerate(job.tasks):
+                if index > 0:
                     script_file.write('\n')
-                task_ranks = task.get_resource('ranks')
-                replace_task = {
-                    '$SCIATH_TASK_COMMAND': command_join(task.command),
-                    '$SCIATH_TASK_RANKS': str(task_ranks),
-                }
-                delete_task = set()
-                if self.mpi_launch == 'none' or task_ranks is None or task_ranks <= 0:
-                    delete_task.add('$SCIATH_TASK_MPI_RUN')
-                else:
-                    replace_task['$SCIATH_TASK_MPI_RUN'] = command_join(
-                        _format_mpi_launch_command(self.mpi_launch, task_ranks))
-
+                replace_task, delete_task = self._task_replacements(
+                    job, task, index, output_path)
                 task_lines_specific = _process_lines(
                     self.template.task,
                     replace=replace_task,
@@ -217,6 +245,83 @@ class Launcher:  #pylint: disable=too-many-instance-attributes
 
         return script_filename
 
+    @staticmethod
+    def _job_replacements(job, output_path, wall_time, queue_name):
+        """ Returns replacements and deletions to apply at the Job level """
+        replace_job = {
+            '$SCIATH_JOB_NAME':
+                job.name,
+            '$SCIATH_JOB_STDOUT':
+                os.path.join(output_path, job.stdout_filename),
+            '$SCIATH_JOB_STDERR':
+                os.path.join(output_path, job.stderr_filename),
+            '$SCIATH_JOB_EXITCODE':
+                os.path.join(output_path, job.exitcode_filename),
+            '$SCIATH_JOB_COMPLETE':
+                os.path.join(output_path, job.complete_filename),
+            '$SCIATH_JOB_STARTED':
+                os.path.join(output_path, job.started_filename),
+            '$SCIATH_JOB_METRICS':
+                os.path.join(output_path, job.metrics_filename),
+        }
+        delete_job = set()
+
+        if queue_name:
+            replace_job['$SCIATH_QUEUE_OR_REMOVE_LINE'] = queue_name
+        else:
+            delete_job.add('$SCIATH_QUEUE_OR_REMOVE_LINE')
+
+        job_ranks = job.resource_max('ranks')
+        if job_ranks is None or job_ranks == 0:
+            delete_job.add('$SCIATH_JOB_MAX_RANKS_OR_REMOVE_LINE')
+        else:
+            replace_job['$SCIATH_JOB_MAX_RANKS_OR_REMOVE_LINE'] = str(job_ranks)
+
+        if wall_time is None:
+            delete_job.add('$SCIATH_JOB_WALLTIME_HM_OR_REMOVE_LINE')
+            delete_job.add('$SCIATH_JOB_WALLTIME_HMS_OR_REMOVE_LINE')
+        else:
+            hours_str, minutes_str, seconds_str = _formatted_split_time(
+                60.0 * wall_time)
+            replace_job[r'$SCIATH_JOB_WALLTIME_HM_OR_REMOVE_LINE'] = '%s:%s' % (
+                hours_str, minutes_str)
+            replace_job[
+                r'$SCIATH_JOB_WALLTIME_HMS_OR_REMOVE_LINE'] = '%s:%s:%s' % (
+                    hours_str, minutes_str, seconds_str)
+        return replace_job, delete_job
+
+    def _task_replacements(self, job, task, index, output_path):
+        """ Returns replacements and deletions to apply for a Task """
+        task_ranks = task.get_resource('ranks')
+        replace_task = {
+            '$SCIATH_TASK_COMMAND': command_join(task.command),
+            '$SCIATH_TASK_RANKS': str(task_ranks),
+        }
+        delete_task = set()
+        measure = []
+        if task.wall_time is not None:
+            measure.extend(
+                timeout_command(self._wrapper_python(), task.wall_time,
+                                os.path.join(output_path,
+                                             job.timeout_filename)))
+        if self.collect_metrics:
+            measure.extend(self._measure_command(job, output_path))
+        if measure:
+            replace_task['$SCIATH_TASK_MEASURE'] = command_join(measure)
+        else:
+            delete_task.add('$SCIATH_TASK_MEASURE')
+        if self.profiler:
+            replace_task['$SCIATH_TASK_PROFILER'] = command_join(
+                self._profile_command(job, output_path, index))
+        else:
+            delete_task.add('$SCIATH_TASK_PROFILER')
+        if self.mpi_launch == 'none' or task_ranks is None or task_ranks <= 0:
+            delete_task.add('$SCIATH_TASK_MPI_RUN')
+        else:
+            replace_task['$SCIATH_TASK_MPI_RUN'] = command_join(
+                _format_mpi_launch_command(self.mpi_launch, task_ranks))
+        return replace_task, delete_task
+
     def _populate_template(self):  #pylint: disable=too-many-branches
         """ Process the template file, interpreting a relative path
         with respect to the location of the configuration file
@@ -226,21 +331,15 @@ class Launcher:  #pylint: disable=too-many-instance-attributes
         """
         if self.template is not None:
             return
-        filename = self.template_filename
-        if not os.path.isabs(filename):
-            filename = os.path.join(os.path.dirname(self.conf_filename),
-                                    filename)
         self.template = DotDict()
-        with open(filename, 'r') as file:
+        with open(self._template_path(), 'r') as file:
             lines = file.readlines()
 
         # Launcher-level replacements and deletions
         replace_launcher = {}
         delete_launcher = set()
-        for (term, setting) in (
-            ('$SCIATH_QUEUE_OR_REMOVE_LINE', self.queue_name),
-            ('$SCIATH_ACCOUNT_OR_REMOVE_LINE', self.account_name),
-        ):
+        for (term, setting) in (('$SCIATH_ACCOUNT_OR_REMOVE_LINE',
+                                 self.account_name),):
             if not setting:
                 delete_launcher.add(term)
             else:
@@ -255,6 +354,7 @@ class Launcher:  #pylint: disable=too-many-instance-attributes
         self.template.mpi = False
         self.template.threads = False
         self.template.command = False
+        self.template.profiler = False
         self.template.task = []
         self.template.post = []
         preamble_finished = False
@@ -274,6 +374,13 @@ class Launcher:  #pylint: disable=too-many-instance-attributes
                 self.template.threads = True
                 if self.mpi_launch != 'none':
                     self.template.task.append(line)
+            elif '$SCIATH_TASK_MEASURE' in line:
+                preamble_finished = True
+                self.template.task.append(line)
+            elif '$SCIATH_TASK_PROFILER' in line:
+                preamble_finished = True
+                self.template.profiler = True
+                self.template.task.append(line)
             elif '$SCIATH_TASK_COMMAND' in line:
                 preamble_finished = True
                 if self.template.command:
@@ -314,16 +421,26 @@ class Launcher:  #pylint: disable=too-many-instance-attributes
                      command_join(self.job_submission_command))
         lines.append('  Blocking:          %s' % self.blocking)
         lines.append('  Job-level ranks:   %s' % self.has_job_level_ranks)
+        if self.direct_launch:
+            lines.append('  Direct launch:     %s' % self.direct_launch)
         if self.account_name:
             lines.append('  Account:           %s' % self.account_name)
         if self.queue_name:
             lines.append('  Queue:             %s' % self.queue_name)
+        if self.short_queue_name:
+            lines.append('  Short queue:       %s (up to %g minutes)' %
+                         (self.short_queue_name, self.short_queue_max_time))
+        if self.wall_time_margin:
+            lines.append('  Wall time margin:  %g' % self.wall_time_margin)
+        if self.python_command:
+            lines.append('  Python command:    %s' % self.python_command)
         if self.queue_name:
             lines.append('  Template:          %s' % self.template_filename)
         return '\n'.join(lines)
 
     def configure(self):
         """ Interactively configure the Launcher """
+        from sciath._conf_wizard import _launcher_interactive_configure  #pylint: disable=bad-option-value,import-outside-toplevel
         _launcher_interactive_configure(self)
 
     def _setup(self):
@@ -345,8 +462,17 @@ class Launcher:  #pylint: disable=too-many-instance-attributes
             conf_file.write('blocking: %s\n' % self.blocking)
             conf_file.write('jobLevelRanks: %s\n' % self.has_job_level_ranks)
             conf_file.write('mpiLaunch: %s\n' % self.mpi_launch)
+            conf_file.write('directLaunch: %s\n' % self.direct_launch)
             conf_file.write('accountName: %s\n' % self.account_name)
             conf_file.write('queueName: %s\n' % self.queue_name)
+            if self.short_queue_name:
+                conf_file.write('shortQueueName: %s\n' % self.short_queue_name)
+                conf_file.write('shortQueueMaxTime: %s\n' %
+                                self.short_queue_max_time)
+            if self.wall_time_margin:
+                conf_file.write('wallTimeMargin: %s\n' % self.wall_time_margin)
+            if self.python_command:
+                conf_file.write('pythonCommand: %s\n' % self.python_command)
             conf_file.write('template: %s\n' % self.template_filename)
 
     def load_definition(self, filename):  #pylint: disable=too-many-branches
@@ -370,10 +496,20 @@ class Launcher:  #pylint: disable=too-many-instance-attributes
                 self.has_job_level_ranks = data['jobLevelRanks'] == "True"
             if 'mpiLaunch' in data:
                 self.set_mpi_launch(data['mpiLaunch'])
+            if 'directLaunch' in data:
+                self.direct_launch = data['directLaunch'] == "True"
             if 'queueName' in data:
                 self.queue_name = data['queueName']
             if 'accountName' in data:
                 self.account_name = data['accountName']
+            if 'shortQueueName' in data:
+                self.short_queue_name = data['shortQueueName']
+            if 'shortQueueMaxTime' in data:
+                self.short_queue_max_time = float(data['shortQueueMaxTime'])
+            if 'wallTimeMargin' in data:
+                self.wall_time_margin = float(data['wallTimeMargin'])
+            if 'pythonCommand' in data:
+                self.python_command = data['pythonCommand']
             if 'template' in data:
                 self.template_filename = data['template']
         except (IOError, OSError):  # Would be FileNotFoundError for Python >3.5
@@ -382,6 +518,14 @@ class Launcher:  #pylint: disable=too-many-instance-attributes
                                        'You must execute configure(), and/or '
                                        'write_definition() first'))
 
+        if self.direct_launch:
+            self.blocking = True
+
+        if self.short_queue_name and self.short_queue_max_time is None:
+            raise RuntimeError(
+                '[SciATH] configuration file %s defines shortQueueName '
+                'but not shortQueueMaxTime' % self.conf_filename)
+
         major, minor = sciath.__version__[:2]
         if major_file is None or minor_file is None or patch_file is None:
             raise RuntimeError(
@@ -394,12 +538,26 @@ class Launcher:  #pylint: disable=too-many-instance-attributes
                 'detected. Please delete it and re-run to reconfigure.' %
                 self.conf_filename)
 
-    def prepare_job(self, job, output_path=None, exec_path=None):
+    def prepare_job(self,
+                    job,
+                    output_path=None,
+                    exec_path=None,
+                    estimated_time=None):
         """ Prepare to submit a job.
 
             Prepares a launch script and forms the launch command.
             Returns information about jobs that cannot be launched.
 
+            On a batch system, if the Job does not define a wall time,
+            and ``estimated_time`` (in minutes, for example from previous
+            runs) is given, the wall time requested is the estimate times
+            the configured ``wall_time_margin``, rounded up to a whole minute.
+            If a short queue is configured and the wall time fits within its
+            limit, the job is submitted to it.
+
+            With direct launch, no script is created. Instead, the
+            commands for each Task are formed, to be run directly.
+
             Returns success, info, report, submit_data
 
             If success is false, the job could not be prepared,
@@ -430,37 +588,72 @@ class Launcher:  #pylint: disable=too-many-instance-attributes
         submit_data.job = job
         submit_data.exec_path = exec_path
         submit_data.output_path = output_path
-        script_filename = self._create_launch_script(job,
-                                                     output_path=output_path)
-        submit_data.launch_command = self.job_submission_command + [
-            script_filename
-        ]
+        # Wall times (in minutes) are enforced by the batch system, if any
+        submit_data.wall_time = job.wall_time if self.blocking else None
+        submit_data.requested_wall_time = job.wall_time
+        submit_data.wall_time_estimated = False
+        if (not self.blocking and job.wall_time is None and
+                estimated_time is not None and self.wall_time_margin):
+            submit_data.requested_wall_time = max(
+                math.ceil(estimated_time * self.wall_time_margin), 1.0)
+            submit_data.wall_time_estimated = True
+        submit_data.queue_name = self.queue_name
+        if (self.short_queue_name and
+                submit_data.requested_wall_time is not None and
+                submit_data.requested_wall_time <= self.short_queue_max_time):
+            submit_data.queue_name = self.short_queue_name
+        submit_data.collect_metrics = self.collect_metrics
+        if self.direct_launch:
+            submit_data.launch_command = None
+            submit_data.task_commands = [
+                self._task_command(task, job, output_path, index)
+                for index, task in enumerate(job.tasks)
+            ]
+            submit_data.task_wall_times = [task.wall_time for task in job.tasks]
+            submit_data.measure_command = self._measure_command(
+                job, output_path)
+        else:
+            script_filename = self._create_launch_script(
+                job,
+                output_path=output_path,
+                wall_time=submit_data.requested_wall_time,
+                queue_name=submit_data.queue_name)
+            submit_data.launch_command = self.job_submission_command + [
+                script_filename
+            ]
 
         return True, None, None, submit_data
 
-    def submit_job(self, submit_data):  #pylint: disable=no-self-use
-        """ Submit a prepared job from data prepared by ``prepare_job`` """
-        job = submit_data.job
-        exec_path = submit_data.exec_path
-        output_path = submit_data.output_path
-        launch_command = submit_data.launch_command
+    def submit_job(self, submit_data):
+        """ Submit a prepared job from data prepared by ``prepare_job``
 
-        if job_complete(job, output_path):
-            raise Exception('[SciATH] trying to launch an already-complete Job')
-        if job_launched(job, output_path):
-            raise Exception('[SciATH] trying to launch an already-launched Job')
+            If not on a batch system, blocks until the job completes.
 
-        _set_blocking_io_stdout()
+            Returns success, info, report
+        """
+        return self.start_job(submit_data).wait()
 
-        cwd_back = os.getcwd()
-        os.chdir(exec_path)
-        _subprocess_run(launch_command, universal_newlines=True)
-        os.chdir(cwd_back)
-        _set_blocking_io_stdout()
-        with open(os.path.join(output_path, job.launched_filename), 'w'):
-            pass
+    def start_job(self, submit_data):  #pylint: disable=no-self-use
+        """ Start to submit a prepared job, without waiting for it
+
+            Returns a :class:`SubmittedJob` handle, which can be polled or
+            waited on. This allows a caller to overlap many jobs.
 
-        return True, None, None
+            Processes are started from the job's execution path, without
+            changing the working directory of the calling process, so
+            jobs may be started from multiple threads.
+        """
+        _check_not_launched(submit_data.job, submit_data.output_path)
+        return SubmittedJob(submit_data)
+
+    def submit_job_async(self, submit_data):  #pylint: disable=no-self-use
+        """ asyncio counterpart to ``submit_job`` (Python 3.5+)
+
+            Returns an awaitable giving success, info, report. Processes are
+            created with :func:`asyncio.create_subprocess_exec`.
+        """
+        from sciath import _async_api  #pylint: disable=bad-option-value,import-outside-toplevel
+        return _async_api.submit_job_async(submit_data)
 
     def clean(self, job, output_path=None):
         """ Remove all files created by the Launcher itself
@@ -488,12 +681,285 @@ class Launcher:  #pylint: disable=too-many-instance-attributes
             os.path.join(output_path, job.launched_filename))
         _remove_file_if_it_exists(
             os.path.join(output_path, job.complete_filename))
+        _remove_file_if_it_exists(
+            os.path.join(output_path, job.timeout_filename))
+        _remove_file_if_it_exists(
+            os.path.join(output_path, job.started_filename))
+        _remove_file_if_it_exists(
+            os.path.join(output_path, job.wall_time_filename))
+        _remove_file_if_it_exists(
+            os.path.join(output_path, job.metrics_filename))
+        for filename in job_profiles(job, output_path):
+            _remove_file_if_it_exists(filename)
+
+    def _task_command(self, task, job, output_path, index):
+        """ Returns the full command to run a Job's Task directly """
+        command = list(task.command)
+        if self.profiler:
+            command = self._profile_command(job, output_path, index) + command
+        task_ranks = task.get_resource('ranks')
+        if self.mpi_launch == 'none' or task_ranks is None or task_ranks <= 0:
+            return command
+        return _format_mpi_launch_command(self.mpi_launch, task_ranks) + command
+
+    def _profile_command(self, job, output_path, index):
+        """ Returns a command prefix which runs a Task under the profiler,
+            writing profiles for each rank to the output path
+        """
+        return profile_command(
+            self._wrapper_python(), self.profiler,
+            os.path.join(output_path,
+                         '%s.task%d' % (job.profile_prefix, index + 1)))
+
+    def _measure_command(self, job, output_path):
+        """ Returns a command prefix which records a Task's resource usage """
+        return measure_command(self._wrapper_python(),
+                               os.path.join(output_path, job.metrics_filename))
+
+    def _wrapper_python(self):
+        """ Returns the Python command to run Task wrappers in jobs, which
+            run on this machine if the Launcher is blocking
+        """
+        return wrapper_python(self.python_command, self.blocking)
+
+    def template_warnings(self, jobs=None):
+        """ Returns messages about requested options which the template
+            does not support, so which are ignored
+
+            If Jobs are given, this includes wall times set for their Tasks.
+        """
+        if self.direct_launch:
+            return []
+        self._populate_template()
+        messages = []
+        measure = any(
+            '$SCIATH_TASK_MEASURE' in line for line in self.template.task)
+        if self.collect_metrics and not measure:
+            messages.append('No metrics are recorded, as the template has no '
+                            '$SCIATH_TASK_MEASURE line: %s' %
+                            self._template_path())
+        if not measure and any(task.wall_time is not None
+                               for job in jobs or []
+                               for task in job.tasks):
+            messages.append('Task wall times are not enforced, as the '
+                            'template has no $SCIATH_TASK_MEASURE line: %s' %
+                            self._template_path())
+        if self.profiler and not self.template.profiler:
+            messages.append('Tasks are not profiled, as the template has no '
+                            '$SCIATH_TASK_PROFILER line: %s' %
+                            self._template_path())
+        return messages
+
+    def _template_path(self):
+        """ Returns the path to the template file, interpreting a relative
+            path with respect to the location of the configuration file
+        """
+        if os.path.isabs(self.template_filename):
+            return self.template_filename
+        return os.path.join(os.path.dirname(self.conf_filename),
+                            self.template_filename)
 
     def _batch_filename(self, job):
         """ Returns the filename of the submission script, with respect to the output path """
         return job.name + os.path.splitext(self.template_filename)[1]
 
 
+class SubmittedJob(object):  # pylint: disable=bad-option-value,useless-object-inheritance,too-many-instance-attributes
+    """ A handle for a :class:`Job` submitted with :meth:`Launcher.start_job`
+
+        For a batch system, this represents the submission command, not the
+        job itself, so finishes once the job has been queued.
+
+        With direct launch, the Job's Tasks are run in turn, each time the
+        handle is polled or waited on. Otherwise, the launch command is run.
+
+        Each process is started in its own process group, so that it can be
+        cancelled along with any processes it has started.
+
+        When not on a batch system, wall times are enforced here. If the
+        Job's wall time (or with direct launch, a Task's) is exceeded, the
+        process group is killed and ``TIMEOUT_EXIT_CODE`` is recorded for
+        each Task which did not finish. The Job is then marked complete,
+        with an additional sentinel file recording the timeout.
+
+        With direct launch, if the Launcher collects metrics, each Task's
+        process is waited on with :func:`os.wait4`, to record its resource
+        usage.
+    """
+
+    _cancel_grace_period = CANCEL_GRACE_PERIOD
+
+    def __init__(self, submit_data):
+        self.job = submit_data.job
+        self.exec_path = submit_data.exec_path
+        self.output_path = submit_data.output_path
+        self.cancelled = False
+        self.timed_out = False
+        self._direct = not submit_data.launch_command
+        self._measure = self._direct and submit_data.collect_metrics
+        self._process_start_time = None
+        if self._direct:
+            self._pending = list(
+                zip(submit_data.task_commands, submit_data.task_wall_times))
+        else:
+            self._pending = [(submit_data.launch_command, None)]
+        self._deadline = None
+        if submit_data.wall_time is not None:
+            self._deadline = time.time() + 60.0 * submit_data.wall_time
+        self._process = None
+        self._process_timed_out = False
+        self._job_timed_out = False
+        self._timer = None
+        self._stdout_file = None
+        self._stderr_file = None
+        self._result = None
+        self._lock = threading.Lock()
+
+        _set_blocking_io_stdout()
+        if self._direct:
+            # Output files are closed when the job finishes, in _finish
+            #pylint: disable=bad-option-value,consider-using-with
+            self._stdout_file = open(
+                os.path.join(self.output_path, self.job.stdout_filename), 'a')
+            self._stderr_file = open(
+                os.path.join(self.output_path, self.job.stderr_filename), 'a')
+        _touch(os.path.join(self.output_path, self.job.launched_filename))
+        self._advance(block=False)
+
+    def poll(self):
+        """ Returns None if still running, otherwise success, info, report """
+        self._advance(block=False)
+        return self._result
+
+    def wait(self):
+        """ Waits for completion, returning success, info, report """
+        self._advance(block=True)
+        return self._result
+
+    def cancel(self):
+        """ Stop the job, terminating the process group of any running process
+
+            This may be called from a thread other than the one polling or
+            waiting, which will see a failed result once the process has
+            ended. No further Tasks are started, and the job is not
+            marked as complete.
+        """
+        with self._lock:
+            if self._result is not None or self.cancelled:
+                return
+            self.cancelled = True
+            process = self._process
+        if process is not None:
+            _terminate_process_group(process, self._cancel_grace_period)
+
+    def _advance(self, block):
+        """ Start processes in turn, as the current one (if any) finishes """
+        while self._result is None:
+            process = self._process
+            if process is not None:
+                returncode = self._wait_for(process, block)
+                if returncode is None:
+                    return
+            with self._lock:
+                if process is not None:
+                    self._process = None
+                    if self._timer is not None:
+                        self._timer.cancel()
+                        self._timer = None
+                    if self._direct and not self.cancelled:
+                        if self._process_timed_out:
+                            exit_code = TIMEOUT_EXIT_CODE
+                        else:
+                            exit_code = _exit_code_from_returncode(returncode)
+                        _write_exit_code(self.job, self.output_path, exit_code)
+                if self.cancelled or self._job_timed_out or not self._pending:
+                    self._finish()
+                else:
+                    self._start(*self._pending.pop(0))
+
+    def _wait_for(self, process, block):
+        """ Returns a process's return code, or None if it is still running """
+        if not self._measure:
+            return process.wait() if block else process.poll()
+        pid, status, rusage = os.wait4(process.pid, 0 if block else os.WNOHANG)
+        if pid == 0:
+            return None
+        if os.WIFSIGNALED(status):
+            process.returncode = -os.WTERMSIG(status)
+        else:
+            process.returncode = os.WEXITSTATUS(status)
+        self._write_metrics(time.time() - self._process_start_time, rusage)
+        return process.returncode
+
+    def _write_metrics(self, elapsed, rusage=None):
+        with open(os.path.join(self.output_path, self.job.metrics_filename),
+                  'a') as metrics_file:
+            metrics_file.write(format_metrics(elapsed, rusage))
+
+    def _start(self, command, wall_time):
+        # Processes are waited on as the job advances, not within this method
+        #pylint: disable=bad-option-value,consider-using-with
+        self._process_timed_out = False
+        self._process_start_time = time.time()
+        if not self._direct:
+            self._process = subprocess.Popen(command,
+                                             cwd=self.exec_path,
+                                             universal_newlines=True,
+                                             **_new_process_group_kwargs())
+        else:
+            try:
+                self._process = subprocess.Popen(command,
+                                                 cwd=self.exec_path,
+                                                 stdout=self._stdout_file,
+                                                 stderr=self._stderr_file,
+                                                 **_new_process_group_kwargs())
+            except OSError as error:
+                _write_exit_code(
+                    self.job, self.output_path,
+                    _exit_code_from_os_error(error, command, self._stderr_file))
+                if self._measure:
+                    self._write_metrics(0.0)
+                return
+        self._start_timer(wall_time)
+
+    def _start_timer(self, wall_time):
+        """ Arrange for the current process to be killed at its time limit """
+        limit, ends_job = _time_limit(wall_time, self._deadline)
+        if limit is not None:
+            self._timer = threading.Timer(limit,
+                                          self._time_out,
+                                          args=(self._process, ends_job))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _time_out(self, process, ends_job):
+        with self._lock:
+            if process is not self._process or self.cancelled:
+                return
+            self.timed_out = True
+            self._process_timed_out = True
+            self._job_timed_out = ends_job
+        _terminate_process_group(process, self._cancel_grace_period)
+
+    def _finish(self):
+        if self._direct:
+            self._stdout_file.close()
+            self._stderr_file.close()
+        if not self.cancelled:
+            if self.timed_out:
+                _pad_exit_codes(self.job, self.output_path, TIMEOUT_EXIT_CODE)
+                _touch(os.path.join(self.output_path,
+                                    self.job.timeout_filename))
+            if self._direct or self.timed_out:
+                _touch(
+                    os.path.join(self.output_path, self.job.complete_filename))
+        _set_blocking_io_stdout()
+        if self.cancelled:
+            self._result = (False, 'cancelled', ['Job cancelled'])
+        else:
+            self._result = (True, None, None)
+
+
 def _process_lines(lines_in, replace=None, delete=None):
     """ Process a list of lines based on sets of keys to replace and delete """
     if not delete:
@@ -1,5 +1,6 @@
 """ Generate a report in TAP format from the Harness """
 
+import sciath.launcher
 from sciath._test_run import _TestRunStatus
 
 
@@ -15,6 +16,8 @@ def _testrun_status_to_ok_and_comment(status):  #pylint: disable=too-many-return
         return "ok", ""
     if status == _TestRunStatus.FAIL:
         return "not ok", ""
+    if status == _TestRunStatus.TIMEOUT:
+        return "not ok", "(Timeout)"
     if status == _TestRunStatus.INCOMPLETE:
         return "not ok", "(Incomplete) "
     if status == _TestRunStatus.NOT_LAUNCHED:
@@ -39,5 +42,23 @@ def print_tap(harness):
     for testrun in harness.testruns:
         test_number += 1
         ok_string, comment = _testrun_status_to_ok_and_comment(testrun.status)
-        print("%s %d %s %s" %
-              (ok_string, test_number, testrun.test.job.name, comment))
+        # Avoid creating the Tests of deactivated test runs
+        name = testrun.test.job.name if testrun.active else testrun.name
+        print("%s %d %s %s" % (ok_string, test_number, name, comment))
+        if harness.metrics and testrun.active:
+            _print_metrics(testrun)
+
+
+def _print_metrics(testrun):
+    """ Print a test run's resource usage as a TAP YAML block """
+    metrics = sciath.launcher.job_metrics(testrun.test.job, testrun.output_path)
+    if not metrics:
+        return
+    print("  ---")
+    print("  metrics:")
+    for entry in metrics:
+        prefix = "    - "
+        for key in ('elapsed', 'user', 'system', 'maxrss_kb'):
+            print("%s%s: %g" % (prefix, key, entry[key]))
+            prefix = "      "
+    print("  ...")
@@ -13,6 +13,9 @@ class Test:
     * A name
     * An implementation of :class:`Verifier`, defining how to determine success
     * A set of group tags
+    * Optionally, a number of times to run the Job when benchmarking,
+      and of warm-up runs before those (overriding those of the
+      :class:`Harness`)
 
     """
 
@@ -28,6 +31,8 @@ class Test:
             self.name = job.name
         self.verifier = sciath.verifier.ExitCodeVerifier(self)
         self.groups = set()
+        self.benchmark_repeat = None
+        self.benchmark_warmup = None
 
     def add_group(self, group):
         """ Tag the test with a space-free string """
@@ -4,11 +4,6 @@ import shlex
 import re
 import collections
 
-import sciath.test
-import sciath.job
-import sciath.task
-import sciath.verifier
-import sciath.verifier_line
 from sciath import yaml_parse
 
 
@@ -16,11 +11,85 @@ class SciATHTestFileException(Exception):
     """ Exception for an invalid SciATH test definition file"""
 
 
-def create_tests_from_file(filename):
-    """ Creates a list of SciATH tests from a YAML file """
+class _TestEntry(object):  # pylint: disable=bad-option-value,too-few-public-methods,useless-object-inheritance
+    """ A private class recording a test entry from a file, with the name and
+        groups of the Test to create from it when needed
+
+        The name may be changed before the Test is created, for example to
+        distinguish variants of a test, without changing the name of its Job.
+    """
+
+    __slots__ = ('name', 'groups', '_entry', '_filename', '_replacement_map')
+
+    def __init__(self, entry, filename, replacement_map):
+        if not isinstance(entry, dict):
+            raise SciATHTestFileException(
+                'Incorrectly formatted test entry (must be a mapping)')
+        if "name" not in entry:
+            raise SciATHTestFileException("Each test entry must specify a name")
+        if not entry["name"]:
+            raise SciATHTestFileException("Names cannot be empty")
+        self.name = entry["name"].replace(' ', '_')  # as for the Test's Job
+        self.groups = _groups_from_entry(entry)
+        self._entry = entry
+        self._filename = filename
+        self._replacement_map = replacement_map
+
+    def create_test(self):
+        """ Create the Test, with its Job and Verifier """
+        #pylint: disable=bad-option-value,raise-missing-from
+        try:
+            job = _create_job_from_entry(self._entry, self._replacement_map)
+            test = _create_test_from_entry(job, self._entry, self._filename,
+                                           self._replacement_map)
+        except SciATHTestFileException as exception:
+            raise SciATHTestFileException(
+                'Test %s in %s: %s' % (self.name, self._filename, exception))
+        test.name = self.name
+        return test
+
+
+def create_tests_from_file(filename, environment=None):
+    """ Creates a list of SciATH tests from a YAML file
+
+        Values for the environment variables named in the file are taken from
+        ``environment``, a dict from variable names (without ``$``),
+        if given, and otherwise from the process's environment.
+    """
+    return [
+        entry.create_test()
+        for entry in create_test_entries_from_file(filename, environment)
+    ]
+
+
+def create_test_entries_from_file(filename, environment=None, parse_cache=None):
+    """ Creates a list of records of test entries from a YAML file
+
+        Each has the ``name`` and ``groups`` of a Test, and a
+        ``create_test()`` method to create it, so that only the Tests
+        needed are created. Errors in the file other than in names and groups
+        are only found when a Test is created.
+
+        If ``parse_cache`` is given, its ``parse_yaml_subset_from_file``
+        method is used to parse the file, instead of that of
+        :mod:`yaml_parse`, so that a cached result may be used.
+
+        See :func:`create_tests_from_file`.
+    """
+    return create_test_entries(read_test_file(filename, parse_cache), filename,
+                               environment)
+
+
+def read_test_file(filename, parse_cache=None):
+    """ Returns the parsed contents of a YAML test file, checking that it
+        has a sequence of test entries
+
+        See :func:`create_test_entries_from_file`.
+    """
     #pylint: disable=bad-option-value,raise-missing-from
+    parser = yaml_parse if parse_cache is None else parse_cache
     try:
-        data = yaml_parse.parse_yaml_subset_from_file(filename)
+        data = parser.parse_yaml_subset_from_file(filename)
     except yaml_parse.SciATHYAMLParseException as exception:
         raise SciATHTestFileException("Error parsing file: %s" % exception)
 
@@ -28,19 +97,20 @@ def create_tests_from_file(filename):
             data['tests'], list):
         raise SciATHTestFileException(
             "File needs 'tests:' containing a sequence of test entries")
+    return data
 
-    replacement_map = _build_replacement_map(data, filename)
 
-    tests = []
-    for entry in data['tests']:
-        if not isinstance(entry, dict):
-            raise SciATHTestFileException(
-                'Incorrectly formatted test entry (must be a mapping)')
-        job = _create_job_from_entry(entry, replacement_map)
-        test = _create_test_from_entry(job, entry, filename, replacement_map)
-        tests.append(test)
+def create_test_entries(data, filename, environment=None):
+    """ Creates a list of records of test entries from the contents of a
+        test file, as returned by :func:`read_test_file`
 
-    return tests
+        See :func:`create_test_entries_from_file`.
+    """
+    replacement_map = _build_replacement_map(data, filename, environment)
+
+    return [
+        _TestEntry(entry, filename, replacement_map) for entry in data['tests']
+    ]
 
 
 def _apply_replacement_map(string, replacement_map):
@@ -50,7 +120,7 @@ def _apply_replacement_map(string, replacement_map):
     return output_string
 
 
-def _build_environment_map(data):
+def _build_environment_map(data, environment=None):
     environment_map = {}
     if 'environment' in data:
         variable_list = data['environment']
@@ -66,7 +136,10 @@ def _build_environment_map(data):
             if not re.match(r'^\w+$', variable):
                 raise SciATHTestFileException(
                     'Environment variable name not well-formed: %s' % variable)
-            value = os.getenv(variable)
+            if environment and variable in environment:
+                value = environment[variable]
+            else:
+                value = os.getenv(variable)
             if value is None:
                 raise SciATHTestFileException(
                     'Expected environment variable %s not defined.' % variable)
@@ -76,18 +149,16 @@ def _build_environment_map(data):
     return environment_map
 
 
-def _build_replacement_map(data, filename, here_marker='HERE'):
-    replacement_map = _build_environment_map(data)
+def _build_replacement_map(data,
+                           filename,
+                           environment=None,
+                           here_marker='HERE'):
+    replacement_map = _build_environment_map(data, environment)
     replacement_map[here_marker] = os.path.abspath(os.path.dirname(filename))
     return replacement_map
 
 
 def _create_job_from_entry(entry, replacement_map):
-    if "name" not in entry:
-        raise SciATHTestFileException("Each test entry must specify a name")
-    if not entry["name"]:
-        raise SciATHTestFileException("Names cannot be empty")
-
     taskinfo_names = ("command", "commands", "task", "tasks")
     taskinfo_found = False
     for name in taskinfo_names:
@@ -119,7 +190,8 @@ def _create_job_from_entry(entry, replacement_map):
                                     ranks_default=ranks_job,
                                     replacement_map=replacement_map))
 
-    job = sciath.job.Job(tasks, name=entry["name"], minimum_wall_time=time_job)
+    from sciath.job import Job  #pylint: disable=bad-option-value,import-outside-toplevel
+    job = Job(tasks, name=entry["name"], minimum_wall_time=time_job)
     return job
 
 
@@ -131,13 +203,17 @@ def _create_task_from_entry(entry, ranks_default, replacement_map):
     ranks = int(entry["ranks"]) if "ranks" in entry else ranks_default
     if ranks is None:
         ranks = 0
-    return sciath.task.Task(command, ranks=ranks)
+    from sciath.task import Task  #pylint: disable=bad-option-value,import-outside-toplevel
+    return Task(command, ranks=ranks)
 
 
 def _create_test_from_entry(job, entry, filename, replacement_map):
-    test = sciath.test.Test(job)
+    from sciath.test import Test  #pylint: disable=bad-option-value,import-outside-toplevel
+    test = Test(job)
     _populate_verifier_from_entry(test, entry, filename, replacement_map)
-    _populate_groups_from_entry(test, entry)
+    for group in _groups_from_entry(entry):
+        test.add_group(group)
+    _populate_benchmark_from_entry(test, entry)
     return test
 
 
@@ -155,9 +231,35 @@ def _get_time_from_entry(entry):
     return time
 
 
-def _populate_groups_from_entry(test, entry):
+def _expected_path(entry, filename, replacement_map):
+    expected = entry['expected']
+    expected = _apply_replacement_map(expected, replacement_map)
+    if not os.path.isabs(expected):
+        expected = os.path.join(os.path.dirname(filename), expected)
+    return expected
+
+
+def _populate_benchmark_from_entry(test, entry):
+    if 'benchmark' not in entry:
+        return
+    benchmark = entry['benchmark']
+    if not isinstance(benchmark, dict) or 'repeat' not in benchmark:
+        raise SciATHTestFileException(
+            'benchmark: should be a mapping with a repeat: count')
+    test.benchmark_repeat = int(benchmark['repeat'])
+    if test.benchmark_repeat < 1:
+        raise SciATHTestFileException('benchmark repeat: must be positive')
+    if 'warmup' in benchmark:
+        test.benchmark_warmup = int(benchmark['warmup'])
+        if test.benchmark_warmup < 0:
+            raise SciATHTestFileException(
+                'benchmark warmup: cannot be negative')
+
+
+def _groups_from_entry(entry):
     if 'group' in entry and 'groups' in entry:
         raise SciATHTestFileException('Cannot specify both group: and groups:')
+    groups = set()
     if 'group' in entry or 'groups' in entry:
         groups_raw = entry['group'] if 'group' in entry else entry['groups']
         if isinstance(groups_raw, str):
@@ -168,52 +270,109 @@ def _populate_groups_from_entry(test, entry):
             raise SciATHTestFileException(
                 'Group: or groups: fields must be a string or a sequence')
         for group in groups_list:
-            test.add_group(group)
+            if ' ' in group:
+                raise SciATHTestFileException(
+                    'Group names cannot have spaces: %s' % group)
+            groups.add(group)
+    return groups
 
 
 def _populate_verifier_from_entry(test, entry, filename, replacement_map):
+    from sciath import verifier  #pylint: disable=bad-option-value,import-outside-toplevel
     verifier_type = entry['type'] if 'type' in entry else 'text_diff'
 
     if verifier_type == 'exit_code':
-        test.verifier = sciath.verifier.ExitCodeVerifier(test)
+        test.verifier = verifier.ExitCodeVerifier(test)
         return
 
     comparison_file = entry['comparison'] if 'comparison' in entry else None
 
+    if verifier_type == 'performance':
+        _populate_performance_verifier_from_entry(test, entry, filename,
+                                                  replacement_map,
+                                                  comparison_file)
+        return
+
     # All subsequent verifiers use an expected file
     if 'expected' not in entry or not entry['expected']:
         raise SciATHTestFileException(
             'Each test entry must defined an expected file')
-    expected = entry['expected']
-    expected = _apply_replacement_map(expected, replacement_map)
-    if not os.path.isabs(expected):
-        expected = os.path.join(os.path.dirname(filename), expected)
+    expected = _expected_path(entry, filename, replacement_map)
 
     if verifier_type == 'text_diff':
-        test.verifier = sciath.verifier.ComparisonVerifier(
+        test.verifier = verifier.ComparisonVerifier(
             test, expected, comparison_file=comparison_file)
     elif verifier_type == 'float_lines':
-        test.verifier = sciath.verifier_line.LineVerifier(
-            test, expected, comparison_file=comparison_file)
-        if 'rules' not in entry:
-            raise SciATHTestFileException('rules: expected')
-        rules = entry['rules']
-        if not isinstance(rules, list):
-            raise SciATHTestFileException('rules: should contain a sequence')
-        for rule in rules:
-            if not isinstance(rule, dict):
-                raise SciATHTestFileException('Each rule should be a mapping')
-            if 'key' not in rule:
-                raise SciATHTestFileException('Each rule should have a key:')
-            key = rule['key']
-            rtol_string = rule.get('rtol', None)
-            atol_string = rule.get('atol', None)
-            rtol = float(rtol_string) if rtol_string else None
-            atol = float(atol_string) if atol_string else None
-            rule_func = sciath.verifier_line.key_and_float_rule(key,
-                                                                rel_tol=rtol,
-                                                                abs_tol=atol)
-            test.verifier.rules.append(rule_func)
+        _populate_line_verifier_from_entry(test, entry, expected,
+                                           comparison_file)
     else:
         raise SciATHTestFileException('Unrecognized verifier type %s' %
                                       verifier_type)
+
+
+def _populate_line_verifier_from_entry(test, entry, expected, comparison_file):
+    from sciath import verifier_line  #pylint: disable=bad-option-value,import-outside-toplevel
+    test.verifier = verifier_line.LineVerifier(test,
+                                               expected,
+                                               comparison_file=comparison_file)
+    if 'rules' not in entry:
+        raise SciATHTestFileException('rules: expected')
+    rules = entry['rules']
+    if not isinstance(rules, list):
+        raise SciATHTestFileException('rules: should contain a sequence')
+    for rule in rules:
+        if not isinstance(rule, dict):
+            raise SciATHTestFileException('Each rule should be a mapping')
+        if 'key' not in rule:
+            raise SciATHTestFileException('Each rule should have a key:')
+        key = rule['key']
+        rtol_string = rule.get('rtol', None)
+        atol_string = rule.get('atol', None)
+        rtol = float(rtol_string) if rtol_string else None
+        atol = float(atol_string) if atol_string else None
+        rule_func = verifier_line.key_and_float_rule(key,
+                                                     rel_tol=rtol,
+                                                     abs_tol=atol)
+        test.verifier.rules.append(rule_func)
+
+
+def _populate_performance_verifier_from_entry(test, entry, filename,
+                                              replacement_map, comparison_file):
+    #pylint: disable=bad-option-value,raise-missing-from
+    from sciath.verifier_performance import PerformanceVerifier  #pylint: disable=bad-option-value,import-outside-toplevel
+    baseline = None
+    if 'expected' in entry and entry['expected']:
+        baseline = _expected_path(entry, filename, replacement_map)
+    test.verifier = PerformanceVerifier(test,
+                                        baseline,
+                                        comparison_file=comparison_file)
+    if 'budgets' not in entry:
+        raise SciATHTestFileException('budgets: expected')
+    budgets = entry['budgets']
+    if not isinstance(budgets, list):
+        raise SciATHTestFileException('budgets: should contain a sequence')
+    for budget in budgets:
+        if not isinstance(budget, dict):
+            raise SciATHTestFileException('Each budget should be a mapping')
+        if 'metric' not in budget:
+            raise SciATHTestFileException('Each budget should have a metric:')
+        better = budget.get('better', 'lower')
+        if better not in ('lower', 'higher'):
+            raise SciATHTestFileException(
+                'better: should be lower or higher, not %s' % better)
+        if 'rtol' in budget and baseline is None:
+            raise SciATHTestFileException(
+                'A budget with rtol: requires an expected: baseline file')
+        try:
+            test.verifier.add_budget(budget['metric'],
+                                     maximum=_float_or_none(budget.get('max')),
+                                     minimum=_float_or_none(budget.get('min')),
+                                     rel_tol=_float_or_none(budget.get('rtol')),
+                                     pattern=budget.get('pattern'),
+                                     higher_is_better=better == 'higher')
+        except Exception as exception:  #pylint: disable=broad-except
+            raise SciATHTestFileException(str(exception))
+
+
+def _float_or_none(string):
+    return float(string) if string else None
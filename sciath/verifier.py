@@ -76,6 +76,32 @@ class ExitCodeVerifier(Verifier):
             passing = True
         return passing, info, report
 
+    def compare_output(self,
+                       output_path,
+                       exec_path=None,
+                       reference_output_path=None,
+                       reference_exec_path=None):
+        """ Compare exit codes with those of another run of a Job
+
+            Returns (same, report).
+        """
+        # pylint: disable=unused-argument
+        exit_codes = []
+        for path in (reference_output_path, output_path):
+            exit_code_file = os.path.join(path, self.test.job.exitcode_filename)
+            if not os.path.isfile(exit_code_file):
+                return False, [
+                    "[ReturnCodeDiff] File (" + exit_code_file + ") not found"
+                ]
+            with open(exit_code_file, 'r') as handle:
+                exit_codes.append([int(line) for line in handle.readlines()])
+        if exit_codes[0] != exit_codes[1]:
+            return False, [
+                "[ExitCodeDiff] Reference exit code(s): " + str(exit_codes[0]),
+                "[ExitCodeDiff] Output exit code(s)   : " + str(exit_codes[1])
+            ]
+        return True, []
+
     def set_exit_codes_success(self, exit_codes_success):
         """ Sets a single exit code per Task to interpret as success """
         if len(exit_codes_success) != self.test.job.number_tasks():
@@ -150,6 +176,24 @@ class ComparisonVerifier(Verifier):
             os.makedirs(os.path.dirname(self.expected_file))
             shutil.copyfile(from_file, self.expected_file)
 
+    def compare_output(self,
+                       output_path=None,
+                       exec_path=None,
+                       reference_output_path=None,
+                       reference_exec_path=None):
+        """ Compare output with that of another run of a Job, in place of
+            the expected file
+
+            Returns (same, report).
+        """
+        reference_file = self._from_file(reference_output_path,
+                                         reference_exec_path)
+        from_file = self._from_file(output_path, exec_path)
+        for path in (reference_file, from_file):
+            if not os.path.isfile(path):
+                return False, ['[Comparison] Output file missing: %s' % path]
+        return self._compare_files(reference_file, from_file)
+
     def _compare_files(self, from_file, to_file):  # pylint: disable=no-self-use
         passing = True
         report = []
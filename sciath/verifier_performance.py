@@ -0,0 +1,266 @@
+""" SciATH PerformanceVerifier class """
+import os
+import re
+
+import sciath.launcher
+from sciath.verifier import (ExitCodeVerifier,
+                             SciATHVerifierMissingFileException, Verifier)
+
+_UNITS = {'time': 's', 'memory': 'kB'}
+
+# Limits a budget may set, and their defaults
+_LIMITS = {
+    'maximum': None,
+    'minimum': None,
+    'rel_tol': None,
+    'higher_is_better': False,
+}
+
+
+class PerformanceVerifier(Verifier):
+    """ A :class:`Verifier` which checks measured quantities against budgets
+
+        Each budget names a metric:
+
+        * ``time``: the Job's wall-clock time, in seconds
+        * ``memory``: the peak resident set size of any of the Job's Tasks,
+          in kilobytes
+        * any other name, for a number extracted from an output file
+          (stdout, or a comparison file) by a regular expression. The first
+          group of the last match is used.
+
+        A budget may give an absolute ``maximum`` and/or ``minimum``, and/or
+        a relative tolerance ``rel_tol`` with respect to a baseline value,
+        recorded in a baseline file by :meth:`update_expected`. By default,
+        lower values are better, so a value may exceed its baseline by at
+        most a factor of ``1 + rel_tol``. Otherwise, it may fall short by at
+        most that factor.
+
+        ``time`` and ``memory`` are read from the metrics the Launcher records
+        when ``collect_metrics`` is set, which the :class:`Harness` does
+        automatically for tests using this verifier. Without metrics, ``time``
+        falls back to the time between the Job's start and completion,
+        if recorded.
+
+        Since measurements of a failed Job are not meaningful, exit codes are
+        also checked, as by :class:`ExitCodeVerifier`.
+    """
+
+    requires_metrics = True
+
+    def __init__(self,
+                 test,
+                 baseline_file=None,
+                 output_file=None,
+                 comparison_file=None):
+        # pylint: disable=bad-option-value,super-with-arguments
+        super(PerformanceVerifier, self).__init__(test)
+        if comparison_file and output_file:
+            raise SciATHVerifierMissingFileException(
+                "Cannot specify an output_file with a comparison_file")
+        self.baseline_file = baseline_file
+        self.comparison_file = comparison_file
+        self.output_file = output_file
+        if not output_file and not comparison_file:
+            self.output_file = self.test.job.stdout_filename
+        self.exit_code_verifier = ExitCodeVerifier(test)
+        self.budgets = []
+
+    def add_budget(self, metric, pattern=None, **limits):
+        """ Add a budget for a metric (see the class documentation)
+
+            The limits are given as keyword arguments ``maximum``,
+            ``minimum``, ``rel_tol``, and ``higher_is_better``.
+        """
+        unknown = set(limits) - set(_LIMITS)
+        if unknown:
+            raise Exception('[SciATH] unknown budget limit(s): %s' %
+                            ', '.join(sorted(unknown)))
+        if ' ' in metric:
+            raise Exception('[SciATH] metric names cannot have spaces')
+        if metric in _UNITS and pattern is not None:
+            raise Exception('[SciATH] %s is measured, so takes no pattern' %
+                            metric)
+        if metric not in _UNITS:
+            if pattern is None:
+                raise Exception('[SciATH] metric %s requires a pattern' %
+                                metric)
+            if re.compile(pattern).groups < 1:
+                raise Exception(
+                    '[SciATH] pattern for metric %s must have a group' % metric)
+        budget = dict(_LIMITS, metric=metric, pattern=pattern)
+        budget.update(limits)
+        if (budget['maximum'] is None and budget['minimum'] is None and
+                budget['rel_tol'] is None):
+            raise Exception('[SciATH] a budget for %s requires a maximum, '
+                            'minimum, or relative tolerance' % metric)
+        if budget['rel_tol'] is not None and self.baseline_file is None:
+            raise Exception(
+                '[SciATH] a relative tolerance requires a baseline file')
+        self.budgets.append(budget)
+
+    def execute(self, output_path, exec_path=None):
+        passing, info, report = self.exit_code_verifier.execute(
+            output_path, exec_path)
+        if not passing:
+            return passing, info, report
+
+        baseline = None
+        if any(budget['rel_tol'] is not None for budget in self.budgets):
+            if not os.path.isfile(self.baseline_file):
+                report.append('[Performance] Baseline file missing: %s' %
+                              self.baseline_file)
+                return False, 'baseline file not found', report
+            baseline = _read_baseline(self.baseline_file)
+
+        values = self._measure(output_path, exec_path)
+        failures = []
+        for budget in self.budgets:
+            value = values[budget['metric']]
+            if value is None:
+                failures.append('%s: not measured' % budget['metric'])
+                continue
+            failures.extend(_check_limits(budget, value))
+            if budget['rel_tol'] is not None:
+                failures.extend(self._check_baseline(budget, value, baseline))
+        report.extend('[Performance] ' + failure for failure in failures)
+        if failures:
+            return False, 'over budget', report
+        return passing, info, report
+
+    def _check_baseline(self, budget, value, baseline):
+        """ Returns descriptions of a value's failure to be within a relative
+            tolerance of its baseline
+        """
+        metric = budget['metric']
+        if metric not in baseline:
+            return ['%s: no baseline in %s' % (metric, self.baseline_file)]
+        reference = baseline[metric]
+        if budget['higher_is_better']:
+            limit = reference * (1.0 - budget['rel_tol'])
+            exceeded = value < limit
+        else:
+            limit = reference * (1.0 + budget['rel_tol'])
+            exceeded = value > limit
+        if not exceeded:
+            return []
+        unit = _UNITS.get(metric, '')
+        return [
+            '%s: %g%s is %s the limit %g%s (baseline %g%s, rtol %g)' %
+            (metric, value, unit, 'below' if budget['higher_is_better'] else
+             'above', limit, unit, reference, unit, budget['rel_tol'])
+        ]
+
+    def compare_output(self,
+                       output_path,
+                       exec_path=None,
+                       reference_output_path=None,
+                       reference_exec_path=None):
+        """ Compare exit codes with those of another run of a Job
+
+            Returns (same, report).
+        """
+        return self.exit_code_verifier.compare_output(output_path, exec_path,
+                                                      reference_output_path,
+                                                      reference_exec_path)
+
+    def update_expected(self, output_path=None, exec_path=None):
+        """ Record measured values as the baseline for relative tolerances """
+        if self.baseline_file is None:
+            return
+        values = self._measure(output_path, exec_path)
+        lines = []
+        for metric in sorted(
+                set(budget['metric']
+                    for budget in self.budgets
+                    if budget['rel_tol'] is not None)):
+            if values[metric] is None:
+                raise SciATHVerifierMissingFileException(
+                    "Cannot update: %s not measured" % metric)
+            lines.append('%s %r\n' % (metric, values[metric]))
+        directory = os.path.dirname(self.baseline_file)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        with open(self.baseline_file, 'w') as baseline_file:
+            baseline_file.writelines(lines)
+
+    def _measure(self, output_path, exec_path):
+        """ Returns a dict from each budget's metric to its value, or None """
+        values = {}
+        metrics = sciath.launcher.job_metrics(self.test.job, output_path)
+        output_lines = None
+        for budget in self.budgets:
+            metric = budget['metric']
+            if metric in _UNITS:
+                values[metric] = self._measured_value(metric, metrics,
+                                                      output_path)
+            else:
+                if output_lines is None:
+                    output_lines = self._read_output(output_path, exec_path)
+                values[metric] = _extracted_value(budget['pattern'],
+                                                  output_lines)
+        return values
+
+    def _measured_value(self, metric, metrics, output_path):
+        """ Returns the Job's time or memory, from the metrics recorded for
+            its Tasks, or None
+        """
+        if metric == 'time':
+            if metrics:
+                return sum(entry['elapsed'] for entry in metrics)
+            return sciath.launcher.job_elapsed(self.test.job, output_path)
+        if metrics:
+            return max(entry['maxrss_kb'] for entry in metrics)
+        return None
+
+    def _read_output(self, output_path, exec_path):
+        if self.comparison_file:
+            path = os.path.join(exec_path, self.comparison_file)
+        else:
+            path = os.path.join(output_path, self.output_file)
+        if not os.path.isfile(path):
+            return []
+        with open(path, 'r') as handle:
+            return handle.readlines()
+
+
+def _check_limits(budget, value):
+    """ Returns descriptions of a value's failure to be within a budget's
+        maximum and minimum
+    """
+    metric = budget['metric']
+    unit = _UNITS.get(metric, '')
+    failures = []
+    if budget['maximum'] is not None and value > budget['maximum']:
+        failures.append('%s: %g%s is above the maximum %g%s' %
+                        (metric, value, unit, budget['maximum'], unit))
+    if budget['minimum'] is not None and value < budget['minimum']:
+        failures.append('%s: %g%s is below the minimum %g%s' %
+                        (metric, value, unit, budget['minimum'], unit))
+    return failures
+
+
+def _extracted_value(pattern, lines):
+    """ Returns the number in the first group of the last match of a
+        pattern in lines of output, or None
+    """
+    value = None
+    for line in lines:
+        match = re.search(pattern, line)
+        if match:
+            try:
+                value = float(match.group(1))
+            except ValueError:
+                pass
+    return value
+
+
+def _read_baseline(filename):
+    """ Returns a dict from metric names to values, from a baseline file """
+    baseline = {}
+    with open(filename, 'r') as baseline_file:
+        for line in baseline_file:
+            fields = line.split()
+            if len(fields) == 2:
+                baseline[fields[0]] = float(fields[1])
+    return baseline
@@ -1,18 +1,16 @@
-""" A very simple, inefficient parser for a subset of YAML files
+""" A very simple parser for a subset of YAML files
 
     Generally, one would prefer to use a full-featured Python module like
     strictyaml, ruamel.yaml or PyYAML. We avoid that here because SciATH
     is intended to work out-of-the-box on as many clusters as possible.
 """
 
-from sciath.utility import DotDict
-
 
 class SciATHYAMLParseException(Exception):
     """ Exception for a test file with invalid syntax """
 
 
-def parse_yaml_subset_from_file(filename):  #pylint: disable=too-many-branches,too-many-locals
+def parse_yaml_subset_from_file(filename):
     """ Parse a subset of YAML files into a nested structure of list and dict objects
 
         All data are interpreted as strings, ignoring any trailing whitespace.
@@ -23,82 +21,76 @@ def parse_yaml_subset_from_file(filename):  #pylint: disable=too-many-branches,t
         Flow style is not supported, only block collections.
     """
     with open(filename, 'r') as input_file:
-        lines = input_file.readlines()
+        text = input_file.read()
+    return parse_yaml_subset(text, filename)
+
+
+def parse_yaml_subset(text, filename='<string>'):  #pylint: disable=too-many-branches,too-many-locals,too-many-statements
+    """ Parse a string, as :func:`parse_yaml_subset_from_file` parses a file
 
+        The filename is only used in error messages.
+    """
+    # Open collections, innermost last, as (indent, is_sequence, data)
     stack = []
-    line_number = 0
-    for line_number, line in enumerate(lines, start=1):  #pylint: disable=too-many-nested-blocks
+    prev_key = None
+    for line_number, line in enumerate(text.split('\n'), start=1):  #pylint: disable=too-many-nested-blocks
+        entries = _tokenize_line(line, filename, line_number)
+        if entries is None:
+            continue
+
         # Add content to nested structure
-        for entry in _parse_line(line, filename, line_number):
-            indent = entry.indent
-            entry_type = entry.entry_type
-            key = entry.key
-            value = entry.value
+        for indent, is_sequence, key, value in entries:
             if not stack:
                 # The first entry
-                if entry_type == 's':
-                    data = [value]
-                    prev_key = None
-                elif entry_type == 'm':
-                    data = {key: value}
-                    prev_key = key
-                stack = [
-                    DotDict(entry_type=entry_type, indent=indent, data=data)
-                ]
-            else:
-                curr = stack[-1]
-                if indent != curr.indent:
-                    if indent > curr.indent:
-                        prev = curr
-
-                        # Create a new stack frame with an empty list or dict
-                        new_data = {} if entry_type == 'm' else []
-                        stack.append(
-                            DotDict(entry_type=entry_type,
-                                    indent=indent,
-                                    data=new_data))
-                        curr = stack[-1]
-
-                        # Insert new data as value in preceding item
-                        if prev.entry_type == 's':
-                            if prev.data[-1]:
-                                _parse_error(
-                                    filename, line_number,
-                                    "Data not allowed on previous sequence line, when nesting"
-                                )
-                            prev.data[-1] = new_data
-                        else:
-                            if prev.data[prev_key]:
-                                _parse_error(
-                                    filename, line_number,
-                                    "Data not allowed on previous mapping line, when nesting"
-                                )
-                            prev.data[prev_key] = new_data
-                    else:
-                        # Unwind the stack
-                        while True:
-                            stack.pop()
-                            if not stack:
-                                _parse_error(filename, line_number,
-                                             "Invalid indentation")
-                            curr = stack[-1]
-                            if indent == curr.indent:
-                                break
-
-                # Add new entry to current list or dict
-                if entry_type != curr.entry_type:
-                    _parse_error(filename, line_number, "Invalid entry type")
-                if entry_type == 's':
-                    curr.data.append(value)
-                    prev_key = None
+                stack.append((indent, is_sequence, [value] if is_sequence else {
+                    key: value
+                }))
+                prev_key = key
+                continue
+            curr_indent, curr_is_sequence, curr_data = stack[-1]
+            if indent > curr_indent:
+                # Create a new collection, as the value of the preceding item
+                new_data = [] if is_sequence else {}
+                if curr_is_sequence:
+                    if curr_data[-1]:
+                        _parse_error(
+                            filename, line_number,
+                            "Data not allowed on previous sequence line, when nesting"
+                        )
+                    curr_data[-1] = new_data
                 else:
-                    if key in curr.data:
+                    if curr_data[prev_key]:
+                        _parse_error(
+                            filename, line_number,
+                            "Data not allowed on previous mapping line, when nesting"
+                        )
+                    curr_data[prev_key] = new_data
+                stack.append((indent, is_sequence, new_data))
+                curr_is_sequence, curr_data = is_sequence, new_data
+            elif indent < curr_indent:
+                # Unwind the stack
+                while True:
+                    stack.pop()
+                    if not stack:
                         _parse_error(filename, line_number,
-                                     "Duplicate key: %s" % key)
-                    curr.data[key] = value
-                    prev_key = key
+                                     "Invalid indentation")
+                    curr_indent, curr_is_sequence, curr_data = stack[-1]
+                    if indent == curr_indent:
+                        break
+
+            # Add new entry to current list or dict
+            if is_sequence != curr_is_sequence:
+                _parse_error(filename, line_number, "Invalid entry type")
+            if is_sequence:
+                curr_data.append(value)
+            else:
+                if key in curr_data:
+                    _parse_error(filename, line_number,
+                                 "Duplicate key: %s" % key)
+                curr_data[key] = value
+            prev_key = key
 
-    return stack[0].data
+    return stack[0][2]
 
 
 def _parse_error(filename, line_number, message):
@@ -106,55 +98,45 @@ def _parse_error(filename, line_number, message):
                                    (filename, line_number, message))
 
 
-def _compute_indent(string, filename, line_number):
-    len_string_spaces_stripped = len(string.lstrip(' '))
-    if len(string.lstrip()) != len_string_spaces_stripped:
-        _parse_error(filename, line_number, "Indent with spaces only")
-    return len(string) - len_string_spaces_stripped
-
-
-def _parse_line(line, filename, line_number):
-
-    entries = []
+def _tokenize_line(line, filename, line_number):
+    """ Returns a list of (indent, is_sequence, key, value) for each entry
+        on a line, or None for a whitespace-only or comment line
 
-    # Return immediately for whitespace-only or comment lines
-    line_lstrip = line.lstrip()
-    if line_lstrip == '' or line_lstrip.startswith('#'):
-        return entries
-
-    # Remove trailing whitespace
+        A line may have several entries, as in ``- - key: value``, where each
+        ``-`` begins a sequence entry with an empty value, at the indent of
+        the ``-``, followed by a deeper entry, at the indent of the next
+        non-space character.
+    """
     content = line.rstrip()
+    if not content:
+        return None
+    position = len(content) - len(content.lstrip(' '))
+    if content[position] == '#':
+        return None
+    if content[position].isspace():
+        if content.lstrip()[0] == '#':
+            return None
+        _parse_error(filename, line_number, "Indent with spaces only")
 
-    while content:
-        indent = _compute_indent(content, filename, line_number)
-        if content[indent] == '-':
-            entry_type = 's'
-            key = None
-            if ':' in content:
-                value = ''
-                content = content[:indent] + ' ' + content[indent + 1:]
-            else:
-                value = content[indent + 1:].strip()
-                content = None
-            entries.append(
-                DotDict(indent=indent,
-                        entry_type=entry_type,
-                        key=key,
-                        value=value))
-        elif ':' in content:
-            entry_type = 'm'
-            key, value = content.split(':', 1)
-            key = key.strip()
-            value = value.strip()
-            content = None
-            entries.append(
-                DotDict(indent=indent,
-                        entry_type=entry_type,
-                        key=key,
-                        value=value))
-        elif content.strip():
+    entries = []
+    colon = content.find(':', position)
+    while True:
+        if content[position] == '-':
+            if colon < 0:
+                entries.append(
+                    (position, True, None, content[position + 1:].strip()))
+                return entries
+            entries.append((position, True, None, ''))
+            position += 1
+            while content[position] == ' ':
+                position += 1
+            if content[position].isspace():
+                _parse_error(filename, line_number, "Indent with spaces only")
+        elif colon >= 0:
+            entries.append((position, False, content[position:colon].rstrip(),
+                            content[colon + 1:].strip()))
+            return entries
+        else:
             _parse_error(
                 filename, line_number,
                 'Non-empty, non-comment lines must start with - or contain :')
-
-    return entries
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+""" Run two suites from a single asyncio event loop (Python 3.5+) """
+from __future__ import print_function
+
+import asyncio
+import os
+
+import sciath.harness
+import sciath.launcher
+from sciath.job import Job
+from sciath.task import Task
+from sciath.test import Test
+
+
+def create_harness(prefix, sleeps):
+    tests = []
+    for index, sleep in enumerate(sleeps):
+        command = ['sh', '-c', 'sleep %s; exit %d' % (sleep, index % 2)]
+        tests.append(Test(Job(Task(command), '%s%d' % (prefix, index))))
+    harness = sciath.harness.Harness(tests)
+    harness.quiet = True
+    harness.parallel = 4
+    return harness
+
+
+async def run_suite(harness, finished):
+    async for testrun in harness.execute_async():
+        finished.append(testrun.test.name)
+    async for testrun in harness.verify_async():
+        finished.append('%s:%s' % (testrun.test.name, testrun.status))
+
+
+async def main():
+    launcher = sciath.launcher.Launcher()
+    output_path = os.path.join(os.getcwd(), 'single_output')
+    os.makedirs(output_path)
+    success, info, report, submit_data = launcher.prepare_job(
+        Job(Task(['echo', 'hello']), 'single'),
+        output_path=output_path,
+        exec_path=output_path)
+    print('submit_job_async:', await launcher.submit_job_async(submit_data))
+    print('complete:', sciath.launcher.job_complete(submit_data.job,
+                                                    output_path))
+
+    harness_a = create_harness('a', ['0.6', '0.1', '0.3'])
+    harness_b = create_harness('b', ['0.2', '0.4'])
+    finished_a = []
+    finished_b = []
+    await asyncio.gather(run_suite(harness_a, finished_a),
+                         run_suite(harness_b, finished_b))
+    print('suite a:', ' '.join(finished_a))
+    print('suite b:', ' '.join(finished_b))
+
+    harness_c = create_harness('c', ['0.1'])
+    harness_c.max_failures = 1
+    try:
+        harness_c.execute_async()
+    except Exception as exception:  # pylint: disable=broad-except
+        print(exception)
+
+
+loop = asyncio.get_event_loop()
+loop.run_until_complete(main())
+loop.close()
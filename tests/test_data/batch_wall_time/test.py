@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+""" Choose wall times and queues for batch jobs from recorded run times """
+from __future__ import print_function
+
+import json
+import os
+import subprocess
+import sys
+
+import sciath._default_templates
+import sciath.launcher
+
+INPUT_FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              'input.yml')
+CONF_FILENAME = 'batch.conf'
+
+# A "batch system" which runs jobs immediately, without blocking SciATH
+with open('template.sbatch', 'w') as template_file:
+    template_file.write(sciath._default_templates.CONTENTS_SLURM)
+sciath.launcher.Launcher.write_default_definition(CONF_FILENAME)
+with open(CONF_FILENAME, 'r') as conf_file:
+    conf = conf_file.read()
+conf = conf.replace('blocking: True', 'blocking: False')
+conf = conf.replace('template: SciATH_template_local.sh',
+                    'template: template.sbatch')
+conf += ('queueName: normal\n'
+         'shortQueueName: debug\n'
+         'shortQueueMaxTime: 30\n'
+         'wallTimeMargin: 2\n')
+with open(CONF_FILENAME, 'w') as conf_file:
+    conf_file.write(conf)
+
+with open('sciath_runs.jsonl', 'w') as database_file:
+    database_file.write(
+        json.dumps({
+            'tests': [{
+                'name': 'quick',
+                'status': 'pass',
+                'elapsed': 300.0
+            }, {
+                'name': 'slow',
+                'status': 'pass',
+                'elapsed': 3000.0
+            }]
+        }) + '\n')
+
+
+def sciath_run(*args):
+    return subprocess.check_output(
+        [sys.executable, '-m', 'sciath', '--no-colors', '-w', CONF_FILENAME] +
+        list(args),
+        universal_newlines=True)
+
+
+for line in sciath_run(INPUT_FILENAME).splitlines():
+    if line.startswith(('[Executing', '#')):
+        print(line.split(']')[0] + ']' if line.startswith('[') else line)
+for name in ('quick', 'slow', 'no_history', 'explicit_time'):
+    with open(os.path.join(name + '_output', name + '.sbatch')) as script:
+        for line in script:
+            if line.startswith(('#SBATCH --time', '#SBATCH --partition')):
+                print('%s: %s' % (name, line.strip()))
+
+# Verification records the time taken by each job
+sciath_run('-v', INPUT_FILENAME)
+with open('sciath_runs.jsonl') as database_file:
+    record = json.loads(database_file.readlines()[-1])
+for result in record['tests']:
+    print('%s: %s, time recorded: %s' %
+          (result['name'], result['status'], result['elapsed'] is not None))
+
+# A job killed by the batch system at its wall time never completes, so
+#  its wall time is recorded, and more is requested next time
+os.remove(os.path.join('slow_output', '.slow.complete'))
+os.utime(os.path.join('slow_output', '.slow.started'), (0, 0))
+for line in sciath_run('-v', INPUT_FILENAME).splitlines():
+    if line.startswith('[Timeout]'):
+        print(line)
+with open('sciath_runs.jsonl') as database_file:
+    record = json.loads(database_file.readlines()[-1])
+for result in record['tests']:
+    if result['name'] == 'slow':
+        print('%s: %s, time recorded: %s' %
+              (result['name'], result['status'], result['elapsed']))
+sciath_run(INPUT_FILENAME)
+with open(os.path.join('slow_output', 'slow.sbatch')) as script:
+    for line in script:
+        if line.startswith('#SBATCH --time'):
+            print('slow: %s' % line.strip())
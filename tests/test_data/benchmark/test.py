@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+""" Run jobs repeatedly, from fresh sandboxes, and report their run times """
+from __future__ import print_function
+
+import os
+
+import sciath.harness
+import sciath.launcher
+import sciath.test
+import sciath.test_file
+import sciath.job
+import sciath.task
+from sciath._harness_report import benchmark_report
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RUNS_FILENAME = os.path.join(os.getcwd(), 'runs.txt')
+
+for test in sciath.test_file.create_tests_from_file(
+        os.path.join(HERE, 'input.yml')):
+    print('%s: repeat %d, warmup %d' %
+          (test.name, test.benchmark_repeat, test.benchmark_warmup))
+
+
+def make_test(name, repeat=None, warmup=None):
+    # Fails if the sandbox is not fresh
+    test = sciath.test.Test(
+        sciath.job.Job(
+            sciath.task.Task([
+                'sh', '-c',
+                'test ! -e marker && touch marker && echo %s >> %s' %
+                (name, RUNS_FILENAME)
+            ]), name))
+    test.benchmark_repeat = repeat
+    test.benchmark_warmup = warmup
+    return test
+
+
+harness = sciath.harness.Harness([
+    make_test('from_harness'),
+    make_test('from_test', repeat=3, warmup=2),
+])
+harness.quiet = True
+harness.launcher = sciath.launcher.Launcher()
+harness.benchmark_repeat = 2
+harness.execute()
+harness.verify()
+
+with open(RUNS_FILENAME) as runs_file:
+    runs = runs_file.read().split()
+for testrun in harness.testruns:
+    times = testrun.benchmark_times
+    print('%s: %s, %d runs, %d timed, elapsed within times: %s' %
+          (testrun.test.name, testrun.status, runs.count(testrun.test.name),
+           len(times), min(times) <= testrun.elapsed <= max(times)))
+
+# Report with known times
+harness.testruns[0].benchmark_times = [1.0, 1.0, 1.0, 1.0]
+harness.testruns[1].benchmark_times = [1.0, 1.0, 2.0, 2.0, 2.0]
+sciath.no_colors()
+for line in benchmark_report(harness.testruns, harness.benchmark_spread):
+    print(line)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+""" Run the same tests with and without direct launch, comparing output files """
+from __future__ import print_function
+
+import os
+
+import sciath.harness
+import sciath.launcher
+import sciath.test
+import sciath.job
+import sciath.task
+
+CONF_FILENAME = 'direct.conf'
+
+sciath.launcher.Launcher.write_default_definition(CONF_FILENAME)
+with open(CONF_FILENAME, 'r') as conf_file:
+    conf = conf_file.read()
+with open(CONF_FILENAME, 'w') as conf_file:
+    conf_file.write(conf.replace('directLaunch: False', 'directLaunch: True'))
+
+
+def create_tests(suffix):
+    tests = []
+    tests.append(
+        sciath.test.Test(
+            sciath.job.Job(sciath.task.Task(['printf', 'Hello, World!\\n']),
+                           'hello' + suffix)))
+    tests.append(
+        sciath.test.Test(
+            sciath.job.Job([
+                sciath.task.Task(['sh', '-c', 'echo out; echo err >&2']),
+                sciath.task.Task(['sh', '-c', 'exit 3']),
+                sciath.task.Task(['sh', '-c', 'kill -9 $$']),
+                sciath.task.Task(['sh', '-c', 'echo more; pwd']),
+            ], 'multi' + suffix)))
+    tests.append(
+        sciath.test.Test(
+            sciath.job.Job(sciath.task.Task(['./does_not_exist']),
+                           'missing' + suffix)))
+    slow_task = sciath.task.Task(['sh', '-c', 'sleep 30'])
+    slow_task.wall_time = 0.01
+    next_task = sciath.task.Task(['sh', '-c', 'echo after'])
+    next_task.wall_time = 1
+    tests.append(
+        sciath.test.Test(sciath.job.Job([slow_task, next_task],
+                                        'slow' + suffix)))
+    return tests
+
+
+def output_files(harness):
+    files = {}
+    for testrun in harness.testruns:
+        job = testrun.test.job
+        for filename in (job.stdout_filename, job.exitcode_filename,
+                         job.complete_filename, job.timeout_filename):
+            path = os.path.join(testrun.output_path, filename)
+            if not os.path.isfile(path):
+                files[(testrun.test.name, filename)] = None
+                continue
+            with open(path) as handle:
+                files[(testrun.test.name, filename)] = handle.read()
+    return files
+
+
+harness_script = sciath.harness.Harness(create_tests('_script'))
+harness_script.launcher = sciath.launcher.Launcher()
+harness_script.execute()
+harness_script.verify()
+harness_script.report()
+
+harness_direct = sciath.harness.Harness(create_tests('_direct'))
+harness_direct.launcher = sciath.launcher.Launcher(CONF_FILENAME)
+harness_direct.execute()
+harness_direct.verify()
+harness_direct.report()
+
+files_script = output_files(harness_script)
+files_direct = output_files(harness_direct)
+print()
+for (name, filename), contents in sorted(files_direct.items()):
+    name_script = name.replace('_direct', '_script')
+    filename_script = filename.replace('_direct', '_script')
+    contents_script = files_script[(name_script, filename_script)]
+    if contents_script is not None:
+        contents_script = contents_script.replace('_script', '_direct')
+    print('%s %s: %s' %
+          (name, filename, 'same' if contents == contents_script else 'differ'))
+for testrun in harness_direct.testruns:
+    with open(
+            os.path.join(testrun.output_path,
+                         testrun.test.job.stderr_filename)) as handle:
+        print('%s stderr: %r' % (testrun.test.name, handle.read()))
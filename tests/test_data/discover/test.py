@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+""" Discover test files in directory trees, reading them in parallel """
+from __future__ import print_function
+
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def run(*args):
+    process = subprocess.Popen([sys.executable, '-m', 'sciath', '--no-colors'] +
+                               list(args),
+                               stdout=subprocess.PIPE,
+                               stderr=subprocess.STDOUT,
+                               universal_newlines=True)
+    output = process.communicate()[0]
+    print(' '.join(args).replace(HERE, '<HERE>'))
+    print('  exit code %d' % process.returncode)
+    return output.replace(HERE, '<HERE>')
+
+
+print(run('-l', '--discover', os.path.join(HERE, 'suite')))
+print(
+    run('-l', '--discover', os.path.join(HERE, 'suite'), '--discover-pattern',
+        'tests.yml'))
+output = run('-e', '-t', 'io_*', '--discover', os.path.join(HERE, 'suite'))
+print('\n'.join(line[:line.index(']') + 1]
+                for line in output.splitlines()
+                if line.startswith('[Executing ')))
+print(run('-l', '--discover', os.path.join(HERE, 'duplicates')))
+print(
+    run('-l', os.path.join(HERE, 'suite', 'io', 'tests.yml'), '--discover',
+        os.path.join(HERE, 'suite', 'io')))
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+""" Create only the tests which are selected, finding errors in those """
+from __future__ import print_function
+
+import os
+import subprocess
+import sys
+
+import sciath.harness
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+INPUT_FILE = os.path.join(HERE, 'input.yml')
+
+harness = sciath.harness.Harness()
+harness.add_tests_from_file(INPUT_FILE)
+harness.print_all_tests()
+
+# Assigning test runs replaces them, and indexes them for selection
+harness.testruns = [
+    testrun for testrun in harness.testruns if 'broken' not in testrun.groups
+]
+harness._activate_tests_from_list(['good'])  #pylint: disable=protected-access
+harness.create_active_tests()
+print([testrun.name for testrun in harness.testruns if testrun.active])
+
+# Selection uses the positions of the assigned test runs, not the old ones
+harness = sciath.harness.Harness()
+harness.add_tests_from_file(INPUT_FILE)
+harness.testruns = list(reversed(harness.testruns))
+harness._activate_tests_from_list(['good'])  #pylint: disable=protected-access
+print(', '.join(
+    '%s %s' % (testrun.name, testrun.active) for testrun in harness.testruns))
+
+for selection in (['-t', 'good'], ['-x', 'broken'], []):
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'sciath', '--no-colors', '-e'] + selection +
+        [INPUT_FILE],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        universal_newlines=True)
+    output = process.communicate()[0]
+    print(' '.join(selection))
+    print('  exit code %d' % process.returncode)
+    for line in output.splitlines():
+        if line.startswith('[Executing '):
+            print('  ' + line[:line.index(']') + 1])
+        elif 'problem' in line or line.startswith('Test '):
+            print('  ' + line.replace(HERE, '<HERE>'))
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+""" List tests, honoring a selection, without creating Tests or a Launcher """
+from __future__ import print_function
+
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Modules which listing tests should not need
+MODULES = ['sciath.launcher', 'sciath.test', 'sciath.verifier']
+
+# List tests, then report which of MODULES were imported
+SCRIPT = '''
+import sys
+from sciath import harness
+sys.argv = sys.argv[1:]
+exit_code = harness.Harness().run_from_args()
+print('imported: %%s' %% (', '.join(
+    module for module in %r if module in sys.modules) or 'none'))
+sys.exit(exit_code)
+''' % MODULES
+
+SELECTIONS = [
+    [],
+    ['-t', 'solver_*'],
+    ['-g', 'io'],
+    ['-g', 'solver and not slow', '-t', 'solver_small', '-t', 'io_mpi'],
+    ['-x', 'slow'],
+    ['-g', 'io or'],
+]
+
+for selection in SELECTIONS:
+    process = subprocess.Popen(
+        [sys.executable, '-c', SCRIPT, 'sciath', '--no-colors', '-l'] +
+        selection + [os.path.join(HERE, 'input.yml')],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        universal_newlines=True)
+    output = process.communicate()[0]
+    print(' '.join(['-l'] + selection))
+    if process.returncode:
+        # Omit the details of errors, which depend on the version of Python
+        print('  exit code %d: %s' %
+              (process.returncode, output.strip().splitlines()[0]))
+    else:
+        for line in output.splitlines():
+            print('  ' + line)
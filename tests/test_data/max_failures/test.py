@@ -0,0 +1,27 @@
+#!/usr/bin/env python
+""" Reject --max-failures with options which do not verify as jobs complete """
+from __future__ import print_function
+
+import os
+import subprocess
+import sys
+
+INPUT_FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              'input.yml')
+
+for option in ('-e', '-u'):
+    command = [
+        sys.executable, '-m', 'sciath', '--no-colors', '--max-failures', '1',
+        option, INPUT_FILENAME
+    ]
+    process = subprocess.Popen(command,
+                               stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE,
+                               stderr=subprocess.STDOUT,
+                               universal_newlines=True)
+    output = process.communicate('y\n')[0]  # Confirm updating expected files
+    print('--max-failures 1 %s' % option)
+    print('  exit code %d' % process.returncode)
+    for line in output.splitlines():
+        if 'Error' in line or line.startswith('[Executing '):
+            print('  ' + line)
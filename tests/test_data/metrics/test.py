@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+""" Record resource usage for each task, with and without direct launch """
+from __future__ import print_function
+
+import os
+
+import sciath
+import sciath.harness
+import sciath.launcher
+import sciath.test
+import sciath.job
+import sciath.task
+
+CONF_FILENAME = 'direct.conf'
+
+sciath.launcher.Launcher.write_default_definition(CONF_FILENAME)
+with open(CONF_FILENAME, 'r') as conf_file:
+    conf = conf_file.read()
+with open(CONF_FILENAME, 'w') as conf_file:
+    conf_file.write(conf.replace('directLaunch: False', 'directLaunch: True'))
+
+BUSY_LOOP = 'i=0; while [ $i -lt 20000 ]; do i=$((i+1)); done'
+
+
+def run(conf_filename, suffix):
+    harness = sciath.harness.Harness([
+        sciath.test.Test(
+            sciath.job.Job([
+                sciath.task.Task(['sh', '-c', BUSY_LOOP]),
+                sciath.task.Task(['./does_not_exist']),
+                sciath.task.Task(['sh', '-c', 'exit 3']),
+            ], 'tasks' + suffix))
+    ])
+    harness.quiet = True
+    harness.metrics = True
+    harness.launcher = sciath.launcher.Launcher(conf_filename)
+    harness.launcher.collect_metrics = True
+    harness.execute()
+    harness.verify()
+    for testrun in harness.testruns:
+        metrics = sciath.launcher.job_metrics(testrun.test.job,
+                                              testrun.output_path)
+        print('%s: %d tasks measured' % (testrun.test.name, len(metrics)))
+        print('  keys: %s' % ', '.join(sorted(metrics[0])))
+        print('  busy task CPU time > 0: %s' %
+              (metrics[0]['user'] + metrics[0]['system'] > 0))
+        print('  max RSS > 0: %s' %
+              [entry['maxrss_kb'] > 0 for entry in (metrics[0], metrics[2])])
+
+
+run(None, '_script')
+run(CONF_FILENAME, '_direct')
+
+# Wrappers are run by path, with a configured Python, if any
+SCIATH_DIRECTORY = os.path.dirname(os.path.abspath(sciath.__file__))
+with open(CONF_FILENAME, 'w') as conf_file:
+    conf_file.write(
+        conf.replace('blocking: True', 'blocking: True\n'
+                     'pythonCommand: python3 -E'))
+launcher = sciath.launcher.Launcher(CONF_FILENAME)
+launcher.collect_metrics = True
+job = sciath.job.Job([sciath.task.Task(['true'])], 'python_command')
+_, _, _, submit_data = launcher.prepare_job(job)
+with open(submit_data.launch_command[-1]) as script_file:
+    for line in script_file:
+        if '_measure.py' in line:
+            print(
+                line.replace(SCIATH_DIRECTORY,
+                             '<SCIATH>').replace(os.getcwd(), '<CWD>').strip())
+
+# A template without a line to record metrics is reported
+with open('no_measure.sh', 'w') as template_file:
+    template_file.write('$SCIATH_TASK_COMMAND\n')
+with open(CONF_FILENAME, 'w') as conf_file:
+    for line in conf.splitlines():
+        if line.startswith('template:'):
+            line = 'template: no_measure.sh'
+        conf_file.write(line + '\n')
+launcher = sciath.launcher.Launcher(CONF_FILENAME)
+launcher.collect_metrics = True
+for message in launcher.template_warnings():
+    print(message.replace(os.getcwd(), '<CWD>'))
+
+# Task wall times are enforced on the same line, so are also reported
+launcher.collect_metrics = False
+timed_task = sciath.task.Task(['true'])
+timed_task.wall_time = 1
+print(launcher.template_warnings([sciath.job.Job(sciath.task.Task(['true']))]))
+for message in launcher.template_warnings([sciath.job.Job(timed_task)]):
+    print(message.replace(os.getcwd(), '<CWD>'))
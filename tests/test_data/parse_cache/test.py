@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+""" Reuse the results of parsing unchanged test files """
+from __future__ import print_function
+
+import os
+import subprocess
+import sys
+
+os.environ['XDG_CACHE_HOME'] = os.path.abspath('cache')
+CACHE_DIRECTORY = os.path.join('cache', 'sciath', 'parsed')
+
+
+def write_input_file(name):
+    with open('input.yml', 'w') as input_file:
+        input_file.write('tests:\n')
+        input_file.write('  - name: %s\n' % name)
+        input_file.write('    command: echo %s\n' % name)
+        input_file.write('    type: exit_code\n')
+
+
+def list_tests(*args):
+    output = subprocess.check_output(
+        [sys.executable, '-m', 'sciath', '-l', 'input.yml'] + list(args),
+        universal_newlines=True)
+    entries = 0
+    if os.path.isdir(CACHE_DIRECTORY):
+        entries = len(os.listdir(CACHE_DIRECTORY))
+    print('tests: %s, cache entries: %d' % (' '.join(output.split()), entries))
+
+
+write_input_file('first')
+list_tests()
+list_tests('--parse-cache')
+list_tests('--parse-cache')
+write_input_file('second')
+list_tests('--parse-cache')
+
+# A corrupt entry is ignored, and replaced
+for name in os.listdir(CACHE_DIRECTORY):
+    with open(os.path.join(CACHE_DIRECTORY, name), 'w') as entry_file:
+        entry_file.write('not a pickle')
+list_tests('--parse-cache')
+write_input_file('first')
+list_tests('--parse-cache')
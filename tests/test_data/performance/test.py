@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+""" Check time, memory, and output metrics against budgets and a baseline """
+from __future__ import print_function
+
+import os
+import re
+import shutil
+import subprocess
+import sys
+
+shutil.copy(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'input.yml'),
+    'input.yml')
+
+
+def sciath(*args):
+    print('sciath %s' % ' '.join(args))
+    process = subprocess.Popen([sys.executable, '-m', 'sciath', '--no-colors'] +
+                               list(args),
+                               stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE,
+                               universal_newlines=True)
+    output, _ = process.communicate('y\n')  # Confirm updating expected files
+    for line in output.splitlines():
+        if line.startswith(('[Performance]', '[ExitCodeDiff]', '[within',
+                            '[over', '[crashes')):
+            # Memory use varies, so is not printed
+            print('  ' + re.sub(r'memory: \d+kB', 'memory: NkB', line))
+
+
+sciath('input.yml')
+sciath('-u', '-t', 'within_budget', 'input.yml')
+with open('within_budget.baseline') as baseline_file:
+    print(baseline_file.read().strip())
+sciath('-t', 'within_budget', 'input.yml')
+
+# Tests with budgets are run each time, not restored from a result cache
+COMMAND = [
+    sys.executable, '-m', 'sciath', '--no-colors', '--cache', '--cache-dir',
+    'cache', '-t', 'within_budget', 'input.yml'
+]
+for _ in range(2):
+    output = subprocess.check_output(COMMAND, universal_newlines=True)
+    print('within_budget restored from cache: %s' % ('[cached]' in output))
+
+with open('within_budget.baseline', 'w') as baseline_file:
+    baseline_file.write('iterations 30\n')
+sciath('-t', 'within_budget', 'input.yml')
@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+""" Profile tasks with a custom profiler, with and without direct launch """
+from __future__ import print_function
+
+import os
+import subprocess
+import sys
+
+import sciath.launcher
+from sciath._profile import output_prefix
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CONF_FILENAME = 'direct.conf'
+
+# A profiler which writes a file and then runs the command
+PROFILER = 'sh -c \'echo "profile of $*" > "$0.txt"; exec "$@"\' <output>'
+
+sciath.launcher.Launcher.write_default_definition(CONF_FILENAME)
+with open(CONF_FILENAME, 'r') as conf_file:
+    conf = conf_file.read()
+with open(CONF_FILENAME, 'w') as conf_file:
+    conf_file.write(conf.replace('directLaunch: False', 'directLaunch: True'))
+
+for args in ([], ['-w', CONF_FILENAME]):
+    print('sciath %s' % ' '.join(args))
+    command = [
+        sys.executable, '-m', 'sciath', '--no-colors', '--profile', 'custom',
+        '--profile-command', PROFILER
+    ]
+    command += [os.path.join(HERE, 'input.yml')] + args
+    output = subprocess.check_output(command, universal_newlines=True)
+    printing = False
+    for line in output.splitlines():
+        if line.startswith(('[*** Profiles', '[*** Summary')):
+            printing = line.startswith('[*** Profiles')
+        if printing and line:
+            print(line.replace(os.getcwd(), '<CWD>'))
+            if line.startswith('  '):
+                with open(line.strip()) as profile_file:
+                    print('    ' + profile_file.read().strip())
+
+print(output_prefix('name.profile.task1', {}))
+print(output_prefix('name.profile.task1', {'PMI_RANK': '3'}))
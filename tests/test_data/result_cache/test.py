@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+""" Run tests three times with a result cache, changing an input file """
+from __future__ import print_function
+
+import os
+
+import sciath.harness
+import sciath.launcher
+import sciath.test
+import sciath.job
+import sciath.task
+from sciath._result_cache import _ResultCache
+
+INPUT_FILENAME = os.path.abspath('input.txt')
+RELATIVE_FILENAME = 'relative.txt'  # named from the sandbox, two levels down
+
+
+def run(description, collect_metrics=False):
+    print('%s:' % description)
+    harness = sciath.harness.Harness([
+        sciath.test.Test(
+            sciath.job.Job(sciath.task.Task(['cat', INPUT_FILENAME]),
+                           'reads_input')),
+        sciath.test.Test(
+            sciath.job.Job(
+                sciath.task.Task(
+                    ['cat', os.path.join('..', '..', RELATIVE_FILENAME)]),
+                'reads_relative')),
+        sciath.test.Test(
+            sciath.job.Job(sciath.task.Task(['sh', '-c', 'exit 1']), 'fails')),
+    ])
+    harness.quiet = True
+    harness.launcher = sciath.launcher.Launcher()
+    harness.launcher.collect_metrics = collect_metrics
+    harness.result_cache = _ResultCache('cache')
+    harness.execute()
+    harness.verify()
+    for testrun in harness.testruns:
+        with open(
+                os.path.join(testrun.output_path,
+                             testrun.test.job.stdout_filename)) as handle:
+            stdout = handle.read()
+        print('  %s: %s, cached: %s, stdout: %r' %
+              (testrun.test.name, testrun.status, testrun.cached, stdout))
+        if collect_metrics:
+            metrics = sciath.launcher.job_metrics(testrun.test.job,
+                                                  testrun.output_path)
+            print('  %s: metrics recorded: %s' %
+                  (testrun.test.name, metrics is not None))
+
+
+with open(INPUT_FILENAME, 'w') as input_file:
+    input_file.write('first\n')
+with open(RELATIVE_FILENAME, 'w') as input_file:
+    input_file.write('first\n')
+run('Empty cache')
+run('Unchanged')
+with open(INPUT_FILENAME, 'w') as input_file:
+    input_file.write('second\n')
+run('Changed input file')
+run('Unchanged')
+with open(RELATIVE_FILENAME, 'w') as input_file:
+    input_file.write('second\n')
+run('Changed relative input file')
+run('Collecting metrics', collect_metrics=True)
+print('Cache entries: %d' % len(os.listdir('cache')))
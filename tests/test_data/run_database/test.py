@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+""" Use the run database to re-run failed tests, and resume a run """
+from __future__ import print_function
+
+import json
+import os
+import subprocess
+import sys
+
+from sciath._run_database import _RunDatabase
+
+INPUT_FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              'input.yml')
+
+
+def sciath(*args):
+    print('sciath %s' % ' '.join(args))
+    output = subprocess.check_output([sys.executable, '-m', 'sciath'] +
+                                     list(args),
+                                     universal_newlines=True)
+    for line in output.splitlines():
+        if line.startswith(('ok', 'not ok')):
+            print('  ' + line)
+        elif line.startswith(('[Executing', '[Resuming')):
+            print('  ' + line[:line.index(']') + 1])
+
+
+sciath('--no-colors', '--tap', INPUT_FILENAME)
+sciath('--no-colors', '--tap', '--rerun-failed')
+
+# Simulate a run which was interrupted after some jobs completed
+sciath('--no-colors', '-e', INPUT_FILENAME)
+os.remove(os.path.join('passes_output', '.passes.complete'))
+sciath('--no-colors', '--resume', INPUT_FILENAME)
+
+with open('sciath_runs.jsonl') as database_file:
+    records = [json.loads(line) for line in database_file]
+print('%d runs recorded' % len(records))
+for record in records:
+    print(', '.join('%s %s %s' %
+                    (test['name'], test['status'], test['elapsed'] is not None)
+                    for test in record['tests']))
+
+# Only the most recent runs are kept
+database = _RunDatabase('capped.jsonl', max_records=3)
+for run in range(5):
+    database.append({'run': run})
+print(' '.join('%d' % record['run'] for record in database.records()))
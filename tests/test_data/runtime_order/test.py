@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+""" Launch tests longest-first, given recorded run times """
+from __future__ import print_function
+
+import json
+import os
+import subprocess
+import sys
+
+INPUT_FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              'input.yml')
+
+with open('sciath_runs.jsonl', 'w') as database_file:
+    for elapsed in ((2.0, 40.0, 90.0), (1.0, 50.0, 100.0), (1.0, 60.0, 200.0)):
+        record = {
+            'tests': [{
+                'name': name,
+                'status': 'pass',
+                'elapsed': time,
+                'cached': False
+            } for name, time in zip(('short', 'medium', 'long'), elapsed)]
+        }
+        database_file.write(json.dumps(record) + '\n')
+
+output = subprocess.check_output(
+    [sys.executable, '-m', 'sciath', '--no-colors', '-j', '2', INPUT_FILENAME],
+    universal_newlines=True)
+for line in output.splitlines():
+    if line.startswith('[SciATH] Predicted'):
+        print(line)
+    elif line.startswith('[Executing'):
+        print(line[:line.index(']') + 1])
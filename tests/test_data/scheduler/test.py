@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+""" Check the order in which the internal scheduler starts work """
+from __future__ import print_function
+
+import threading
+import time
+
+from sciath._scheduler import _Scheduler
+from sciath.job import Job
+from sciath.task import Task
+
+lock = threading.Lock()
+state = {'in_use': 0, 'peak': 0}
+
+
+def run(slots, sizes, priorities=None):
+    scheduler = _Scheduler(slots)
+    started = []
+    state['peak'] = 0
+
+    def start(item):
+        name, size = item
+        started.append(name)
+
+        def work():
+            with lock:
+                state['in_use'] += min(size, slots)
+                state['peak'] = max(state['peak'], state['in_use'])
+            time.sleep(0.2)
+            with lock:
+                state['in_use'] -= min(size, slots)
+
+        return work
+
+    items = [('item%d_size%d' % (index, size), size)
+             for index, size in enumerate(sizes)]
+    priority = None
+    if priorities:
+        priority = lambda item: priorities[items.index(item)]
+    scheduler.run(items,
+                  start,
+                  slots_required=lambda item: item[1],
+                  priority=priority)
+    print('slots %d, sizes %s' % (slots, sizes))
+    if priorities:
+        print('  priorities %s' % priorities)
+    print('  started: %s' % ', '.join(started))
+    print('  peak slots in use: %d' % state['peak'])
+
+
+run(1, [1, 4, 2])  # in order, one at a time
+run(4, [1, 1, 4, 2, 2, 1])  # largest first
+run(4, [3, 3, 1])  # backfill while a large item waits
+run(4, [8, 1])  # oversized items run on their own
+run(4, [1, 2, 1], [1, 5, 10])  # highest priority first
+
+
+def predict(slots, items):
+    print('slots %d, (slots, duration) %s: makespan %g' %
+          (slots, items, _Scheduler(slots).predict_makespan(
+              items, lambda item: item[0], lambda item: item[1])))
+
+
+predict(1, [(1, 10), (1, 3), (1, 3), (1, 4)])
+predict(2, [(1, 10), (1, 3), (1, 3), (1, 4)])
+predict(2, [(1, 1), (2, 5), (1, 1)])
+predict(4, [(3, 2), (3, 2), (1, 3)])
+
+task_a = Task(['true'], ranks=4, threads=2)
+task_b = Task(['true'], ranks=2, threads=3)
+print('cores required: %d' % Job([task_a, task_b], 'a').cores_required())
+print('cores required: %d' % Job(Task(['true'], ranks=0), 'b').cores_required())
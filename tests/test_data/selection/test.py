@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+""" Select tests by name, glob, regular expression, and group expression """
+from __future__ import print_function
+
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+SELECTIONS = [
+    ['-t', 'io_serial,solver_small'],
+    ['-t', 'solver_*'],
+    ['-t', 'solver_[ms]*', '-t', 'io_mpi'],
+    ['-t', 're:.*_(mpi|serial)'],
+    ['-g', 'solver'],
+    ['-g', 'mpi and not slow'],
+    ['-g', 'not (solver or io)'],
+    ['-g', 'slow', '-g', 'mpi', '-x', 'io'],
+    ['-t', 'solver_*', '-g', 'not slow'],
+    ['-g', 'mpi and'],
+    ['-t', 're:solver_('],
+]
+
+for selection in SELECTIONS:
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'sciath', '--no-colors', '-e'] + selection +
+        [os.path.join(HERE, 'input.yml')],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        universal_newlines=True)
+    output = process.communicate()[0]
+    print(' '.join(selection))
+    if process.returncode:
+        # Omit the details of errors, which depend on the version of Python
+        print('  exit code %d: %s' %
+              (process.returncode, output.strip().rsplit(':', 1)[0]))
+    else:
+        print('  ' + ' '.join(line[len('[Executing '):line.index(']')]
+                              for line in output.splitlines()
+                              if line.startswith('[Executing ')))
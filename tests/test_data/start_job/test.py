@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+""" Start several jobs at once with Launcher.start_job() and wait on them """
+from __future__ import print_function
+
+import os
+import time
+
+import sciath.launcher
+from sciath.job import Job
+from sciath.task import Task
+
+launcher = sciath.launcher.Launcher()
+cwd = os.getcwd()
+
+handles = []
+for index in range(4):
+    job = Job(Task(['sh', '-c', 'sleep 0.5; pwd']), 'job%d' % index)
+    exec_path = os.path.join(cwd, 'exec%d' % index)
+    output_path = os.path.join(cwd, 'output%d' % index)
+    for path in (exec_path, output_path):
+        os.makedirs(path)
+    success, info, report, submit_data = launcher.prepare_job(
+        job, output_path=output_path, exec_path=exec_path)
+    handles.append(launcher.start_job(submit_data))
+
+print('Working directory unchanged: %s' % (os.getcwd() == cwd))
+print('Running after start: %s' % [handle.poll() is None for handle in handles])
+
+time_start = time.time()
+for handle in handles:
+    print(handle.job.name, handle.wait())
+print('Overlapped: %s' % (time.time() - time_start < 1.5))
+print('Result on polling again: %s' % (handles[0].poll(),))
+
+for handle in handles:
+    launched = sciath.launcher.job_launched(handle.job, handle.output_path)
+    complete = sciath.launcher.job_complete(handle.job, handle.output_path)
+    with open(os.path.join(handle.output_path,
+                           handle.job.stdout_filename)) as stdout_file:
+        stdout_matches = stdout_file.read().strip() == handle.exec_path
+    print(handle.job.name, launched, complete, stdout_matches)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+""" Kill a task which ignores SIGTERM, when its job exceeds its wall time """
+from __future__ import print_function
+
+import errno
+import os
+import signal
+import time
+
+import sciath.harness
+import sciath.launcher
+import sciath.test
+import sciath.job
+import sciath.task
+
+PID_FILENAME = os.path.abspath('task.pid')
+
+
+def running(pid):
+    try:
+        os.kill(pid, 0)
+    except OSError as error:
+        return error.errno != errno.ESRCH
+    return True
+
+
+# The task's wall time is enforced by a wrapper, in its own process group
+task = sciath.task.Task(
+    ['sh', '-c',
+     'trap "" TERM; echo $$ > %s; exec sleep 30' % PID_FILENAME])
+task.wall_time = 1
+job = sciath.job.Job(task, 'ignores_term')
+job.wall_time = 0.02
+
+harness = sciath.harness.Harness([sciath.test.Test(job)])
+harness.quiet = True
+harness.launcher = sciath.launcher.Launcher()
+harness.execute()
+harness.verify()
+print('%s: %s' % (harness.testruns[0].name, harness.testruns[0].status))
+
+with open(PID_FILENAME) as pid_file:
+    task_pid = int(pid_file.read())
+deadline = time.time() + 5.0
+while running(task_pid) and time.time() < deadline:
+    time.sleep(0.1)
+print('task still running: %s' % running(task_pid))
+if running(task_pid):
+    os.kill(task_pid, signal.SIGKILL)
@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+""" Record a trace of the time spent in each phase of work """
+from __future__ import print_function
+
+import json
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+output = subprocess.check_output([
+    sys.executable, '-m', 'sciath', '--no-colors', '-j', '2', '--trace',
+    'trace.json',
+    os.path.join(HERE, 'input.yml')
+],
+                                 universal_newlines=True)
+# Print the summary without its times, and with phases in a fixed order
+summary = output[output.index('[*** Trace'):output.index('Trace written')]
+summary = summary.splitlines()
+print('\n'.join(
+    line.split(':')[0]
+    for line in summary[1:]
+    if line and not line.startswith(' ')))
+print('phases: %s' % ', '.join(
+    sorted(line.split()[0] for line in summary if line.startswith('  '))))
+
+with open('trace.json') as trace_file:
+    trace = json.load(trace_file)
+spans = set()
+for event in trace['traceEvents']:
+    if event['ph'] == 'X':
+        assert event['dur'] >= 0 and event['ts'] >= 0
+        spans.add((event['cat'], event['name'],
+                   event['args'].get('test', event['args'].get('file'))))
+for span in sorted(spans):
+    print(
+        '%s %s %s' %
+        (span[0], span[1], span[2].replace(HERE, '<HERE>') if span[2] else ''))
+print('thread names: %s' % ', '.join(
+    sorted(event['args']['name']
+           for event in trace['traceEvents']
+           if event['ph'] == 'M')[:1]))
@@ -0,0 +1 @@
+echo "result 1"
@@ -0,0 +1,2 @@
+sleep 0.3
+echo "result 1"
@@ -0,0 +1 @@
+echo "value 2"
@@ -0,0 +1,29 @@
+#!/usr/bin/env python
+""" Run tests with two builds, and compare run times and output """
+from __future__ import print_function
+
+import os
+import re
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+output = subprocess.check_output([
+    sys.executable, '-m', 'sciath', '--no-colors', '-t', 'same,differs',
+    '--variant-a', 'BUILD_DIR=' + os.path.join(HERE, 'build_a'), '--variant-b',
+    'BUILD_DIR=' + os.path.join(HERE, 'build_b'),
+    os.path.join(HERE, 'input.yml')
+],
+                                 universal_newlines=True)
+
+# Print the comparison and summary, without varying times and spacing
+printing = False
+for line in output.splitlines():
+    if line.startswith('[*** Variant Comparison'):
+        printing = True
+    elif line.startswith('Report written'):
+        printing = False
+    if printing:
+        line = re.sub(r'\d+\.\d+', 'N', line.replace(HERE, '<HERE>'))
+        print(' '.join(line.split()))
@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+""" Parse malformed and unusual inputs, printing results or errors """
+from __future__ import print_function
+
+import pprint
+
+from sciath import yaml_parse
+
+INPUTS = [
+    'a: 1\nb:\n  - x\n  -y\n  -\n    - z\n',
+    '- - a: b\n    c: d\n  - e\n-- f\n- : g\n',
+    '-a: 1\n  b: 2\n',
+    'a: 1\n\t# an indented comment\n',
+    'a: 1\n\tb: 2\n',
+    '- \ta: 1\n',
+    'a: 1\nb\n',
+    'a: 1\n  b: 2\n',
+    '- x\n  - y\n',
+    'a:\n  b: 1\n c: 2\n',
+    'a: 1\n- b\n',
+    'a: 1\na: 2\n',
+    'a:\n  - b: 1\n    b: 2\n',
+    '   a: 1\n   b:\n     c\n',
+    'a: 1\n- \tb: 1\n',
+    'a: 1\r\nb:\r\n  - c # d\r\n',
+]
+
+for text in INPUTS:
+    print(repr(text))
+    try:
+        pprint.PrettyPrinter(width=8192).pprint(
+            yaml_parse.parse_yaml_subset(text, 'input.yml'))
+    except yaml_parse.SciATHYAMLParseException as exception:
+        print(exception)